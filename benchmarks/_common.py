@@ -0,0 +1,112 @@
+import asyncio
+import time
+import typing as t
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+
+SendMethod = t.Callable[[zmq_asyncio.Socket], t.Awaitable]
+
+
+async def pub_sub_throughput(
+    *,
+    ctx: zmq_asyncio.Context,
+    address: str,
+    send: SendMethod,
+    messages: int,
+    bind_pub: bool = True
+) -> tuple[float, float]:
+    """
+    Publishes `messages` messages with given `send` coroutine function over
+    PUB/SUB pair connected via `address` and waits until subscriber receives
+    all of them.
+
+    Returns:
+        Tuple of messages per second measured on publisher side only and
+        end to end (until subscriber received the last message)
+
+    """
+    publisher = ctx.socket(zmq.PUB)
+    subscriber = ctx.socket(zmq.SUB)
+    for socket in (publisher, subscriber):
+        socket.setsockopt(zmq.SNDHWM, 0)
+        socket.setsockopt(zmq.RCVHWM, 0)
+        socket.setsockopt(zmq.LINGER, 0)
+    subscriber.subscribe('')
+    if bind_pub:
+        publisher.bind(address)
+        subscriber.connect(address)
+    else:
+        subscriber.bind(address)
+        publisher.connect(address)
+    await asyncio.sleep(0.2)    # Slow joiner
+
+    async def receive():
+        for _ in range(messages):
+            await subscriber.recv_multipart(copy=False)
+
+    receiver = asyncio.create_task(receive())
+    start = time.perf_counter()
+    for _ in range(messages):
+        await send(publisher)
+    sent = time.perf_counter() - start
+    await receiver
+    received = time.perf_counter() - start
+
+    publisher.close()
+    subscriber.close()
+    return messages / sent, messages / received
+
+
+async def round_trip_latency(
+    *,
+    ctx: zmq_asyncio.Context,
+    address: str,
+    messages: int,
+    payload: bytes = b'\x00' * 16
+) -> float:
+    """
+    Measures mean round trip time of DEALER/ROUTER ping-pong over `address`.
+
+    Returns:
+        Mean round trip time in microseconds
+
+    """
+    server = ctx.socket(zmq.ROUTER)
+    client = ctx.socket(zmq.DEALER)
+    for socket in (server, client):
+        socket.setsockopt(zmq.LINGER, 0)
+    server.bind(address)
+    client.connect(address)
+
+    async def echo():
+        for _ in range(messages):
+            await server.send_multipart(await server.recv_multipart(copy=False), copy=False)
+
+    echoing = asyncio.create_task(echo())
+    await client.send(payload)
+    await client.recv()     # Warm up the connection
+    start = time.perf_counter()
+    for _ in range(messages - 1):
+        await client.send(payload)
+        await client.recv(copy=False)
+    elapsed = time.perf_counter() - start
+    await echoing
+
+    server.close()
+    client.close()
+    return elapsed / (messages - 1) * 1e6
+
+
+def report(
+    name: str,
+    rates: tuple[float, ...],
+    baseline: tuple[float, ...] | None = None,
+    width: int = 32
+):
+    line = f"{name:<{width}}"
+    for i, rate in enumerate(rates):
+        line += f" {rate:>12,.0f} msg/s"
+        line += f" ({rate / baseline[i]:5.2f}x)" if baseline else " " * 9
+    print(line)
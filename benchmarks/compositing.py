@@ -0,0 +1,86 @@
+"""
+Measures frame compositing time of `Compositor` with one layer per blend
+mode over overlapping LED ranges - static layers (blending only), animated
+layers and animated layers crossfading to new patterns - against the frame
+budget.
+"""
+import itertools
+import timeit
+
+import click
+
+from deimic_pi.devices.led_driver import rendering
+from deimic_pi.devices.led_driver.compositing import BlendMode, Compositor
+from deimic_pi.devices.led_driver.patterns import ConstColorPattern, RainbowPattern
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+
+def composite(settings: Settings, animated: bool, fade: float = 0.0) -> Compositor:
+    compositor = Compositor(settings)
+    length = settings.led_driver.strip_length
+    for index, mode in enumerate(BlendMode):
+        compositor.set_pattern(
+            index,
+            ConstColorPattern(settings, color=(index / 4, 1.0, 1.0)),
+            mode=mode.value,
+            opacity=0.75,
+            start=index * length // 8
+        )
+    compositor.step(0.0)
+    if animated:
+        for index in range(len(BlendMode)):
+            compositor.set_pattern(
+                index,
+                RainbowPattern(settings, period=1.0 + index, fps=60.0),
+                fade=fade
+            )
+    return compositor
+
+
+def measure(name: str, compositor: Compositor, frames: int, budget: float):
+    clock = itertools.count(1)
+    elapsed = timeit.timeit(lambda: compositor.step(next(clock) * budget), number=frames) / frames
+    print(
+        f"{name:<24} {elapsed * 1e3:>9.3f} ms/frame {1 / elapsed:>10,.0f} fps"
+        f" ({elapsed / budget:6.1%} of budget)"
+    )
+
+
+@click.command()
+@click.option(
+    '--length',
+    '-l',
+    'length',
+    default=1000,
+    show_default=True,
+    type=int,
+    help="Number of LEDs in the strip")
+@click.option(
+    '--frames',
+    '-n',
+    'frames',
+    default=200,
+    show_default=True,
+    type=int,
+    help="Number of frames composited per variant")
+@click.option(
+    '--fps',
+    'fps',
+    default=60.0,
+    show_default=True,
+    type=float,
+    help="Frame rate setting the frame budget")
+def execute(length: int, frames: int, fps: float):
+    settings = Settings(led_driver=LedDriverSettings(strip_length=length, frame_cache_bytes=0))
+    budget = 1 / fps
+    print(
+        f"{length} LEDs, {len(BlendMode)} layers, {budget * 1e3:.1f} ms budget,"
+        f" rendering backend: {rendering.BACKEND}"
+    )
+    measure("static layers", composite(settings, False), frames, budget)
+    measure("animated layers", composite(settings, True), frames, budget)
+    measure("crossfading layers", composite(settings, True, fade=3600.0), frames, budget)
+
+
+if __name__ == '__main__':
+    execute()
@@ -0,0 +1,144 @@
+"""
+Compares throughput of internal messages forwarded between devices by
+Python-level SUB/PUB loop running on the event loop with the Bridge's libzmq
+XSUB/XPUB proxy thread (with and without capture socket).
+"""
+import asyncio
+import time
+
+import click
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+from benchmarks._common import report
+from deimic_pi.devices import DeviceType
+from deimic_pi.devices.bridge.proxy import InternalProxy
+
+
+MESSAGE = [DeviceType.LED_DRIVER.topic, b'', b'PATTERN', b'{"name": "ConstColorPattern"}']
+
+
+def _socket(ctx: zmq_asyncio.Context, socket_type: int) -> zmq_asyncio.Socket:
+    socket = ctx.socket(socket_type)
+    socket.setsockopt(zmq.SNDHWM, 0)
+    socket.setsockopt(zmq.RCVHWM, 0)
+    socket.setsockopt(zmq.LINGER, 0)
+    return socket
+
+
+async def python_forwarder(ctx: zmq_asyncio.Context, frontend: str, backend: str):
+    listener = _socket(ctx, zmq.SUB)
+    listener.bind(frontend)
+    listener.subscribe(b'')
+    broadcaster = _socket(ctx, zmq.PUB)
+    broadcaster.bind(backend)
+    try:
+        while True:
+            await broadcaster.send_multipart(await listener.recv_multipart(copy=False), copy=False)
+    finally:
+        listener.close()
+        broadcaster.close()
+
+
+async def forwarded_throughput(
+    ctx: zmq_asyncio.Context,
+    frontend: str,
+    backend: str,
+    messages: int
+) -> tuple[float, float]:
+    publisher = _socket(ctx, zmq.PUB)
+    publisher.connect(frontend)
+    subscriber = _socket(ctx, zmq.SUB)
+    subscriber.connect(backend)
+    subscriber.subscribe(DeviceType.LED_DRIVER.topic)
+    await asyncio.sleep(0.3)    # Slow joiner, subscription forwarding
+
+    async def receive():
+        for _ in range(messages):
+            await subscriber.recv_multipart(copy=False)
+
+    receiver = asyncio.create_task(receive())
+    start = time.perf_counter()
+    for _ in range(messages):
+        await publisher.send_multipart(MESSAGE)
+    sent = time.perf_counter() - start
+    await receiver
+    received = time.perf_counter() - start
+
+    publisher.close()
+    subscriber.close()
+    return messages / sent, messages / received
+
+
+async def run(messages: int, port: int):
+    ctx = zmq_asyncio.Context()
+    results = {}
+
+    forwarder = asyncio.create_task(python_forwarder(
+        ctx,
+        f'tcp://127.0.0.1:{port}',
+        f'tcp://127.0.0.1:{port + 1}'
+    ))
+    await asyncio.sleep(0.1)
+    results['python forwarding'] = await forwarded_throughput(
+        ctx,
+        f'tcp://127.0.0.1:{port}',
+        f'tcp://127.0.0.1:{port + 1}',
+        messages
+    )
+    forwarder.cancel()
+    await asyncio.gather(forwarder, return_exceptions=True)
+
+    for i, capture in enumerate((False, True), start=1):
+        proxy = InternalProxy(ctx, name=f'bench-proxy-{i}', capture=capture)
+        proxy.frontend.bind(f'tcp://127.0.0.1:{port + 2 * i}')
+        proxy.backend.bind(f'tcp://127.0.0.1:{port + 2 * i + 1}')
+        proxy.start()
+        observer = None
+        if capture:
+            capture_socket = _socket(ctx, zmq.SUB)
+            capture_socket.connect(proxy.capture_addr)
+            capture_socket.subscribe(b'')
+            observer = asyncio.create_task(proxy.observe(capture_socket))
+        results[f"libzmq proxy{' + capture' if capture else ''}"] = await forwarded_throughput(
+            ctx,
+            f'tcp://127.0.0.1:{port + 2 * i}',
+            f'tcp://127.0.0.1:{port + 2 * i + 1}',
+            messages
+        )
+        if observer is not None:
+            observer.cancel()
+            await asyncio.gather(observer, return_exceptions=True)
+            capture_socket.close()
+        proxy.close()
+    ctx.term()
+
+    print(f"{'forwarding':<32} {'send':>18}{'':9} {'end to end':>18}")
+    baseline = results['python forwarding']
+    for name, rates in results.items():
+        report(name, rates, baseline if rates is not baseline else None)
+
+
+@click.command()
+@click.option(
+    '--messages',
+    '-n',
+    'messages',
+    default=100000,
+    show_default=True,
+    type=int,
+    help="Number of messages forwarded per variant")
+@click.option(
+    '--port',
+    '-p',
+    'port',
+    default=45100,
+    show_default=True,
+    type=int,
+    help="First TCP port used by the benchmark")
+def execute(messages: int, port: int):
+    asyncio.run(run(messages, port))
+
+
+if __name__ == '__main__':
+    execute()
@@ -0,0 +1,60 @@
+"""
+Compares frame rendering time of rainbow pattern computed pixel by pixel
+with `colorsys` and with vectorized `RainbowPattern` (NumPy frame buffer and
+pure-Python fallback).
+"""
+import colorsys
+import timeit
+
+import click
+
+from deimic_pi.devices.led_driver import rendering
+from deimic_pi.devices.led_driver.patterns import RainbowPattern
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+
+def per_pixel(length: int):
+    frame = [(0, 0, 0)] * length
+
+    def step(time_elapsed: float):
+        for index in range(length):
+            r, g, b = colorsys.hsv_to_rgb((index / length + time_elapsed / 5.0) % 1.0, 1.0, 1.0)
+            frame[index] = int(r * 255), int(g * 255), int(b * 255)
+    return step
+
+
+def measure(name: str, step, frames: int, baseline: float = None) -> float:
+    elapsed = timeit.timeit(lambda: step(0.5), number=frames) / frames
+    line = f"{name:<24} {elapsed * 1e3:>9.3f} ms/frame {1 / elapsed:>10,.0f} fps"
+    if baseline:
+        line += f" ({baseline / elapsed:6.1f}x)"
+    print(line)
+    return elapsed
+
+
+@click.command()
+@click.option(
+    '--length',
+    '-l',
+    'length',
+    default=1000,
+    show_default=True,
+    type=int,
+    help="Number of LEDs in the strip")
+@click.option(
+    '--frames',
+    '-n',
+    'frames',
+    default=200,
+    show_default=True,
+    type=int,
+    help="Number of frames rendered per variant")
+def execute(length: int, frames: int):
+    settings = Settings(led_driver=LedDriverSettings(strip_length=length))
+    print(f"{length} LEDs, rendering backend: {rendering.BACKEND}")
+    baseline = measure("colorsys per pixel", per_pixel(length), frames)
+    measure("RainbowPattern", RainbowPattern(settings).step, frames, baseline)
+
+
+if __name__ == '__main__':
+    execute()
@@ -0,0 +1,95 @@
+"""
+Compares per-frame `send_parts` path with batched `MessageEncoder` path on
+inproc PUB/SUB pair, using `DeimicStateUpdateInfo`-like message.
+"""
+import asyncio
+
+import click
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+import deimic_pi.messages as base
+from benchmarks._common import pub_sub_throughput, report
+
+
+PARTS = [
+    (base.MessagePartType.STRING, base.MessageType.STATE_UPDATE),
+    b'',
+    (base.MessagePartType.STRING, "DEIMIC"),
+    b'',
+    (base.MessagePartType.PYOBJ, "I"),
+    (base.MessagePartType.PYOBJ, "3"),
+    (base.MessagePartType.PYOBJ, "4"),
+    (base.MessagePartType.PYOBJ, "1"),
+]
+
+
+async def send_parts_per_frame(
+    *,
+    socket: zmq_asyncio.Socket,
+    parts: base.MessageParts
+):
+    """Previous `send_parts` implementation - one awaited send per part."""
+    for i, part in enumerate(parts):
+        if isinstance(part, tuple):
+            part_type, part_payload = part
+        else:
+            part_type, part_payload = base.MessagePartType.RAW, part
+
+        match part_type or base.MessagePartType.RAW:
+            case base.MessagePartType.RAW:
+                send_method = socket.send
+            case base.MessagePartType.PYOBJ:
+                send_method = socket.send_pyobj
+            case base.MessagePartType.STRING:
+                send_method = socket.send_string
+            case base.MessagePartType.JSON:
+                send_method = socket.send_json
+        await send_method(part_payload, zmq.SNDMORE if i < len(parts)-1 else 0)
+
+
+async def run(messages: int):
+    ctx = zmq_asyncio.Context()
+    encoder = base.MessageEncoder(prefix=PARTS[:4])
+
+    per_frame = await pub_sub_throughput(
+        ctx=ctx,
+        address='inproc://bench-per-frame',
+        send=lambda socket: send_parts_per_frame(socket=socket, parts=PARTS),
+        messages=messages
+    )
+    batched = await pub_sub_throughput(
+        ctx=ctx,
+        address='inproc://bench-batched',
+        send=lambda socket: base.send_parts(socket=socket, parts=PARTS),
+        messages=messages
+    )
+    prefixed = await pub_sub_throughput(
+        ctx=ctx,
+        address='inproc://bench-prefixed',
+        send=lambda socket: encoder.send(socket=socket, parts=PARTS[4:]),
+        messages=messages
+    )
+    ctx.term()
+
+    print(f"{'':<32} {'send':>18}{'':9} {'end to end':>18}")
+    report("per-frame send_parts", per_frame)
+    report("batched send_parts", batched, per_frame)
+    report("batched with encoded prefix", prefixed, per_frame)
+
+
+@click.command()
+@click.option(
+    '--messages',
+    '-n',
+    'messages',
+    default=50000,
+    show_default=True,
+    type=int,
+    help="Number of messages sent per path")
+def execute(messages: int):
+    asyncio.run(run(messages))
+
+
+if __name__ == '__main__':
+    execute()
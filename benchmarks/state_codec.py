@@ -0,0 +1,64 @@
+"""
+Compares size and encode/decode throughput of pickled PYOBJ state update
+frames with single `MessagePartType.STATE` binary frame.
+"""
+import pickle
+import timeit
+
+import click
+
+import deimic_pi.messages as base
+from deimic_pi.codecs import StateUpdate, StateUpdateCodec
+from deimic_pi.types import DeimicComponentType
+
+
+UPDATE = StateUpdate(DeimicComponentType.INPUT, 3, 4, 1)
+
+
+def encode_pyobj(update: StateUpdate) -> list[bytes]:
+    return [
+        base.encode_part((base.MessagePartType.PYOBJ, field))
+        for field in update
+    ]
+
+
+def decode_pyobj(frames: list[bytes]) -> StateUpdate:
+    return StateUpdate(*(pickle.loads(frame) for frame in frames))
+
+
+def encode_state(update: StateUpdate) -> list[bytes]:
+    return [base.encode_part((base.MessagePartType.STATE, update))]
+
+
+def decode_state(frames: list[bytes]) -> StateUpdate:
+    return StateUpdateCodec.decode(frames[0])
+
+
+def measure(name: str, encode, decode, number: int):
+    frames = encode(UPDATE)
+    assert decode(frames) == UPDATE
+    encoding = number / timeit.timeit(lambda: encode(UPDATE), number=number)
+    decoding = number / timeit.timeit(lambda: decode(frames), number=number)
+    print(
+        f"{name:<8} {len(frames):>6} {sum(map(len, frames)):>6} B"
+        f" {encoding:>14,.0f}/s {decoding:>14,.0f}/s"
+    )
+
+
+@click.command()
+@click.option(
+    '--number',
+    '-n',
+    'number',
+    default=200000,
+    show_default=True,
+    type=int,
+    help="Number of encode/decode calls per codec")
+def execute(number: int):
+    print(f"{'codec':<8} {'frames':>6} {'size':>8} {'encode':>16} {'decode':>16}")
+    measure("PYOBJ", encode_pyobj, decode_pyobj, number)
+    measure("STATE", encode_state, decode_state, number)
+
+
+if __name__ == '__main__':
+    execute()
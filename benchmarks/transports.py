@@ -0,0 +1,94 @@
+"""
+Compares latency and throughput of the transports devices may use to reach
+the Bridge: TCP over loopback, ipc and inproc (devices sharing context).
+"""
+import asyncio
+import os
+import tempfile
+
+import click
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+import deimic_pi.messages as base
+from benchmarks._common import pub_sub_throughput, report, round_trip_latency
+from deimic_pi.codecs import StateUpdate
+from deimic_pi.types import DeimicComponentType
+
+
+ENCODER = base.MessageEncoder(prefix=[
+    (base.MessagePartType.STRING, base.MessageType.STATE_UPDATE),
+    b'',
+])
+PARTS = [(base.MessagePartType.STATE, StateUpdate(DeimicComponentType.INPUT, 3, 4, 1))]
+
+
+async def run(messages: int, round_trips: int, port: int):
+    ctx = zmq_asyncio.Context()
+    ipc_dir = tempfile.mkdtemp(prefix='deimic_pi-bench-')
+    transports = {
+        'tcp': lambda i: f'tcp://127.0.0.1:{port + i}',
+        'inproc': lambda i: f'inproc://bench-{i}',
+    }
+    if zmq.has('ipc'):
+        transports['ipc'] = lambda i: f"ipc://{os.path.join(ipc_dir, str(i))}"
+
+    results = {}
+    for i, (name, address) in enumerate(transports.items()):
+        results[name] = (
+            await round_trip_latency(
+                ctx=ctx,
+                address=address(2 * i),
+                messages=round_trips
+            ),
+            await pub_sub_throughput(
+                ctx=ctx,
+                address=address(2 * i + 1),
+                send=lambda socket: ENCODER.send(socket=socket, parts=PARTS),
+                messages=messages
+            )
+        )
+    ctx.term()
+
+    print(f"{'transport':<10} {'round trip':>14} {'send':>18}{'':9} {'end to end':>18}")
+    baseline = results['tcp'][1]
+    for name, (latency, rates) in results.items():
+        report(
+            f"{name:<10} {latency:>11.1f} us",
+            rates,
+            baseline if name != 'tcp' else None,
+            width=0
+        )
+
+
+@click.command()
+@click.option(
+    '--messages',
+    '-n',
+    'messages',
+    default=50000,
+    show_default=True,
+    type=int,
+    help="Number of messages published per transport")
+@click.option(
+    '--round-trips',
+    '-r',
+    'round_trips',
+    default=5000,
+    show_default=True,
+    type=int,
+    help="Number of round trips per transport")
+@click.option(
+    '--port',
+    '-p',
+    'port',
+    default=45000,
+    show_default=True,
+    type=int,
+    help="First TCP port used by the benchmark")
+def execute(messages: int, round_trips: int, port: int):
+    asyncio.run(run(messages, round_trips, port))
+
+
+if __name__ == '__main__':
+    execute()
@@ -6,6 +6,7 @@ import click
 
 from deimic_pi.devices.bridge import Bridge
 from deimic_pi.devices.bridge.settings import Settings, BridgeSettings
+from deimic_pi.log import setup_logging, stop_logging
 from deimic_pi.types import Port
 
 
@@ -32,8 +33,12 @@ def execute(inter_broadcaster_port, inter_listener_port):
         inter_broadcaster_port=inter_broadcaster_port,
         inter_listener_port=inter_listener_port
     )
+    setup_logging(settings.log)
     bridge = Bridge(settings)
-    asyncio.run(bridge.execute())
+    try:
+        asyncio.run(bridge.execute())
+    finally:
+        stop_logging()
 
 
 if __name__ == '__main__':
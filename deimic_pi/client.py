@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import struct
+import typing as t
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+import deimic_pi.messages as base
+from deimic_pi.codecs import StateUpdate, TimedStateUpdate, decode_timed_state_updates
+from deimic_pi.log import get_logger
+from deimic_pi.messages import MessagePartType, MessageView, ReplyStatus
+
+if t.TYPE_CHECKING:
+    from deimic_pi.settings import Settings
+
+_log = get_logger(__name__)
+
+
+class BridgeRequestError(Exception):
+    """
+    Error reply received from the Bridge.
+    """
+
+
+class BridgeClient:
+    """
+    Asynchronous client of the Bridge's external requests socket.
+
+    Uses DEALER socket, so any number of requests may be in flight at once -
+    replies are matched with requests by request id.
+    """
+    _REQUEST_ID = struct.Struct('!Q')
+
+    def __init__(self, socket: zmq_asyncio.Socket, *, timeout: float = 5.0):
+        self.socket = socket
+        self.timeout = timeout
+        self._request_ids = itertools.count()
+        self._pending: dict[bytes, asyncio.Future | asyncio.Queue] = {}
+        self._reader: asyncio.Task | None = None
+
+    @classmethod
+    def connect(
+        cls,
+        settings: 'Settings',
+        *,
+        ctx: zmq_asyncio.Context = None,
+        **kwargs
+    ) -> 'BridgeClient':
+        ctx = ctx or zmq_asyncio.Context.instance()
+        socket = ctx.socket(zmq.DEALER)
+        socket.connect(settings.bridge_addr(settings.extern_req_port))
+        return cls(socket, **kwargs)
+
+    async def request(
+        self,
+        command: str,
+        args: dict[str, t.Any] = None,
+        *,
+        timeout: float = None
+    ) -> MessageView:
+        """
+        Sends request and waits for its reply.
+
+        Params:
+            - command: Request command name
+            - args: Command arguments
+            - timeout: Seconds to wait for reply, client's default if None
+
+        Returns:
+            Reply payload frames
+
+        Raises:
+            - BridgeRequestError: Bridge replied with an error
+            - asyncio.TimeoutError: No reply in time
+
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        request_id = self._open_request()
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self._send(request_id, command, args, timeout)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def stream(
+        self,
+        command: str,
+        args: dict[str, t.Any] = None,
+        *,
+        timeout: float = None
+    ) -> t.AsyncGenerator[tuple[ReplyStatus, MessageView], None]:
+        """
+        Sends request and yields its streamed reply parts.
+
+        Params:
+            - command: Request command name
+            - args: Command arguments
+            - timeout: Seconds to wait for each reply part, client's default
+                if None
+
+        Returns:
+            Async iterator of statuses and payload frames of every
+            `ReplyStatus.PART` reply and the final reply
+
+        Raises:
+            - BridgeRequestError: Bridge replied with an error
+            - asyncio.TimeoutError: No reply part in time
+
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        request_id = self._open_request()
+        replies = self._pending[request_id] = asyncio.Queue()
+        try:
+            await self._send(request_id, command, args, timeout)
+            while True:
+                status, payload = await asyncio.wait_for(replies.get(), timeout)
+                if status == ReplyStatus.ERROR:
+                    raise BridgeRequestError(payload.string(0))
+                yield ReplyStatus(status), payload
+                if status != ReplyStatus.PART:
+                    return
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _open_request(self) -> bytes:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+        return self._REQUEST_ID.pack(next(self._request_ids))
+
+    async def _send(
+        self,
+        request_id: bytes,
+        command: str,
+        args: dict[str, t.Any] | None,
+        timeout: float
+    ):
+        await base.send_parts(
+            socket=self.socket,
+            parts=[
+                b'',
+                request_id,
+                (MessagePartType.STRING, command),
+                (MessagePartType.JSON, {**(args or {}), 'timeout': timeout})
+            ]
+        )
+
+    async def _read(self):
+        while True:
+            message = await MessageView.recv(self.socket)
+            # Reply frames: [b'', request_id, status, *payload]
+            pending = self._pending.get(message[1])
+            if pending is None:
+                continue    # Reply to timed out request
+            status = message.string(2)
+            payload = MessageView(message.frames[3:])
+            if isinstance(pending, asyncio.Queue):
+                pending.put_nowait((status, payload))
+            elif pending.done():
+                continue
+            elif status == ReplyStatus.ERROR:
+                pending.set_exception(BridgeRequestError(payload.string(0)))
+            else:
+                pending.set_result(payload)
+
+    async def snapshot(
+        self,
+        components: str = "",
+        *,
+        names: list[str] = None,
+        tag: str = None
+    ) -> list[StateUpdate]:
+        """
+        Returns last known states of components given by filter
+        (`<type>[-<address>[-<number>]]`), names or tag.
+        """
+        if names is not None:
+            args = {'names': names}
+        elif tag is not None:
+            args = {'tag': tag}
+        else:
+            args = {'components': components}
+        return (await self.request('SNAPSHOT', args)).states(0)
+
+    async def components(self, tag: str = None) -> list[dict[str, t.Any]]:
+        return (await self.request('COMPONENTS', {'tag': tag} if tag else {})).json(0)
+
+    async def write(self, address: int, number: int, value: int, *, priority: int = 0):
+        await self.request('DEIMIC_WRITE', {
+            'address': address,
+            'number': number,
+            'value': value,
+            'priority': priority
+        })
+
+    async def write_component(self, component: str, value: int, *, priority: int = 0):
+        await self.request('DEIMIC_WRITE', {
+            'component': component,
+            'value': value,
+            'priority': priority
+        })
+
+    async def history(
+        self,
+        component: str,
+        since: float,
+        until: float = None,
+        *,
+        points: int = 300
+    ) -> dict[str, t.Any]:
+        """
+        Returns states history of component (name or
+        `<type>-<address>-<number>`) between given times (seconds since the
+        epoch), downsampled by the Bridge to at most given number of
+        min/max/last/count buckets.
+        """
+        return (await self.request('HISTORY', {
+            'component': component,
+            'since': since,
+            'until': until,
+            'points': points
+        })).json(0)
+
+    async def replay(
+        self,
+        since: float = None,
+        until: float = None,
+        *,
+        speed: float = 0.0,
+        timeout: float = None
+    ) -> t.AsyncGenerator[TimedStateUpdate, None]:
+        """
+        Replays journaled state updates received between given times
+        (seconds since the epoch) at given speed relative to the original
+        pace (0 - as fast as possible).
+        """
+        replies = self.stream(
+            'REPLAY',
+            {'since': since, 'until': until, 'speed': speed},
+            timeout=timeout
+        )
+        async for status, payload in replies:
+            if status == ReplyStatus.PART:
+                for record in decode_timed_state_updates(payload.frames[0]):
+                    yield record
+
+    async def heartbeat(self, interval: float):
+        """
+        Tells the Bridge the client is alive and will send next heartbeat
+        within given interval (seconds).
+        """
+        await self.request('HEARTBEAT', {'interval': interval})
+
+    async def keepalive(self, interval: float):
+        """
+        Sends heartbeat every given interval (seconds).
+        """
+        while True:
+            try:
+                await self.heartbeat(interval)
+            except (BridgeRequestError, asyncio.TimeoutError) as error:
+                _log.warning("Heartbeat not acknowledged by the Bridge: %r", error)
+            await asyncio.sleep(interval)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        self.socket.close()
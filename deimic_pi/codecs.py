@@ -0,0 +1,178 @@
+import struct
+import typing as t
+
+from deimic_pi.types import DeimicComponentType
+
+
+class StateUpdate(t.NamedTuple):
+    component_type: DeimicComponentType
+    address: int
+    number: int
+    state: int
+
+
+class StateUpdateCodec:
+    """
+    Fixed-layout binary encoding of single Deimic component state update.
+
+    Frame layout (network byte order, 10 bytes):
+        - version: unsigned char
+        - component_type: char (`DeimicComponentType` value)
+        - address: unsigned short
+        - number: unsigned short
+        - state: signed int
+    """
+    VERSION = 1
+    STRUCT = struct.Struct('!BcHHi')
+    SIZE = STRUCT.size
+    # Ranges of the fields, as fit in the layout
+    ADDRESS_RANGE = NUMBER_RANGE = range(0, 2**16)
+    STATE_RANGE = range(-2**31, 2**31)
+
+    @classmethod
+    def validate(cls, update: StateUpdate) -> StateUpdate:
+        """
+        Checks whether state update fits in the frame layout.
+
+        Raises:
+            - ValueError: Unknown component type or field out of its range
+        """
+        component_type, address, number, state = update
+        DeimicComponentType(component_type)
+        for name, value, value_range in (
+            ('address', address, cls.ADDRESS_RANGE),
+            ('number', number, cls.NUMBER_RANGE),
+            ('state', state, cls.STATE_RANGE),
+        ):
+            if value not in value_range:
+                raise ValueError(
+                    f"State update {name} out of range"
+                    f" [{value_range.start}, {value_range.stop - 1}]: {value}"
+                )
+        return update
+
+    @classmethod
+    def encode(cls, update: StateUpdate) -> bytes:
+        """
+        Raises:
+            - ValueError: Unknown component type or field out of its range
+        """
+        component_type, address, number, state = update
+        try:
+            return cls.STRUCT.pack(
+                cls.VERSION,
+                DeimicComponentType(component_type).value.encode('ascii'),
+                address,
+                number,
+                state
+            )
+        except struct.error as error:
+            raise ValueError(f"Invalid state update {tuple(update)}: {error}") from error
+
+    @classmethod
+    def encode_many(cls, updates: t.Iterable[StateUpdate] | bytes) -> bytes:
+        if isinstance(updates, (bytes, bytearray, memoryview)):
+            return updates
+        return b''.join(cls.encode(update) for update in updates)
+
+    @classmethod
+    def decode(cls, frame: bytes | memoryview) -> StateUpdate:
+        version, component_type, address, number, state = cls.STRUCT.unpack(frame)
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported state update frame version: {version}")
+        return StateUpdate(
+            DeimicComponentType(component_type.decode('ascii')),
+            address,
+            number,
+            state
+        )
+
+    @classmethod
+    def decode_many(cls, frame: bytes | memoryview) -> list[StateUpdate]:
+        if len(frame) % cls.SIZE:
+            raise ValueError(f"Invalid state updates frame size: {len(frame)}")
+        return [
+            cls.decode(frame[offset:offset + cls.SIZE])
+            for offset in range(0, len(frame), cls.SIZE)
+        ]
+
+
+class TimedStateUpdate(t.NamedTuple):
+    timestamp: int      # Nanoseconds since the epoch
+    update: StateUpdate
+
+
+class TimedStateUpdateCodec:
+    """
+    Fixed-layout binary encoding of state update with time it was received
+    at, used by the Bridge's journal records and replays.
+
+    Frame layout (network byte order, 18 bytes):
+        - timestamp: signed long long (nanoseconds since the epoch)
+        - update: `StateUpdateCodec` frame
+    """
+    STRUCT = struct.Struct(f'!q{StateUpdateCodec.SIZE}s')
+    SIZE = STRUCT.size
+
+    @classmethod
+    def encode(cls, timestamp: int, update: StateUpdate | bytes) -> bytes:
+        if not isinstance(update, (bytes, bytearray, memoryview)):
+            update = StateUpdateCodec.encode(update)
+        return cls.STRUCT.pack(timestamp, update)
+
+    @classmethod
+    def decode(cls, frame: bytes | memoryview) -> TimedStateUpdate:
+        timestamp, update = cls.STRUCT.unpack(frame)
+        return TimedStateUpdate(timestamp, StateUpdateCodec.decode(update))
+
+    @classmethod
+    def decode_many(cls, frame: bytes | memoryview) -> list[TimedStateUpdate]:
+        if len(frame) % cls.SIZE:
+            raise ValueError(f"Invalid timed state updates frame size: {len(frame)}")
+        return [
+            cls.decode(frame[offset:offset + cls.SIZE])
+            for offset in range(0, len(frame), cls.SIZE)
+        ]
+
+
+def decode_state_update(frame: bytes | memoryview | t.Any) -> StateUpdate:
+    """
+    Decodes state update sent as `MessagePartType.STATE` frame.
+
+    Params:
+        - frame: Received frame, its bytes or memoryview
+
+    Returns:
+        Decoded state update
+
+    """
+    return StateUpdateCodec.decode(getattr(frame, 'buffer', frame))
+
+
+def decode_state_updates(frame: bytes | memoryview | t.Any) -> list[StateUpdate]:
+    """
+    Decodes state updates sent as `MessagePartType.STATES` frame (e.g.
+    state snapshot).
+
+    Params:
+        - frame: Received frame, its bytes or memoryview
+
+    Returns:
+        List of decoded state updates
+
+    """
+    return StateUpdateCodec.decode_many(getattr(frame, 'buffer', frame))
+
+
+def decode_timed_state_updates(frame: bytes | memoryview | t.Any) -> list[TimedStateUpdate]:
+    """
+    Decodes timed state updates (e.g. journal replay chunk).
+
+    Params:
+        - frame: Received frame, its bytes or memoryview
+
+    Returns:
+        List of decoded timed state updates
+
+    """
+    return TimedStateUpdateCodec.decode_many(getattr(frame, 'buffer', frame))
@@ -1,36 +1,342 @@
+import asyncio
 import json
 import os
+import typing as t
 from os.path import isfile
 from pathlib import Path
 
 import zmq
+import zmq.asyncio as zmq_asyncio
 
+import deimic_pi.messages as base
+from deimic_pi.devices.bridge.cache import ComponentKey, StateCache
+from deimic_pi.devices.bridge.component_map import ComponentMap, ComponentMapLoader
+from deimic_pi.devices.bridge.conflation import Conflator
+from deimic_pi.devices.bridge.framing import DeimicFrameParser
+from deimic_pi.devices.bridge.gathering import Gatherer
 from deimic_pi.devices.bridge.handlers import BridgePoller
+from deimic_pi.devices.bridge.history import HistoryStore
+from deimic_pi.devices.bridge.journal import Journal
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+from deimic_pi.devices.bridge.presence import PeerKind, PresenceTracker
+from deimic_pi.devices.bridge.proxy import InternalProxy
+from deimic_pi.devices.bridge.queues import (
+    DeimicQueueStats,
+    DeimicRequest,
+    DeimicRequestQueue
+)
+from deimic_pi.devices.bridge.requests import RequestEngine
 from deimic_pi.devices.bridge.settings import Settings
 from deimic_pi.devices import Device, DeviceType
+from deimic_pi.log import get_logger
+
+_log = get_logger(__name__)
 
 
 class Bridge(Device):
     DEVICE_TYPE = DeviceType.BRIDGE
     POLLER_CLS = BridgePoller
 
-    deimic_requests_queue = []
-
-    def __init__(self, settings: Settings):
-        super().__init__(settings)
+    def __init__(self, settings: Settings, *, ctx: zmq_asyncio.Context = None):
+        super().__init__(settings, ctx=ctx)
 
+        # STREAM sockets support only TCP transport
         self.deimic_stream = self.create_socket(zmq.STREAM)
         self.deimic_stream.bind(f'tcp://*:{self.settings.deimic_port}')
 
+        self.internal_proxy: InternalProxy | None = None
         self.inter_broadcaster = self.create_socket(zmq.PUB)
-        self.inter_broadcaster.bind(f'tcp://*:{self.settings.inter_broadcaster_port}')
-
         self.inter_listener = self.create_socket(zmq.SUB)
-        self.inter_listener.bind(f'tcp://*:{self.settings.inter_listener_port}')
-        self.inter_listener.subscribe('')
+        if self.settings.bridge.internal_proxy:
+            # Proxy takes over internal ports and the Bridge attaches to it
+            # via inproc like any other device
+            self.internal_proxy = InternalProxy(
+                self._ctx,
+                name=f'deimic_pi-proxy-{self.identity}',
+                capture=self.settings.bridge.internal_proxy_capture
+            )
+            self.bind(self.internal_proxy.backend, self.settings.inter_broadcaster_port)
+            self.bind(self.internal_proxy.frontend, self.settings.inter_listener_port)
+            self.internal_proxy.start()
+            self.inter_broadcaster.connect(
+                self.settings.inproc_addr_form.format(port=self.settings.inter_listener_port)
+            )
+            self.inter_listener.connect(
+                self.settings.inproc_addr_form.format(port=self.settings.inter_broadcaster_port)
+            )
+        else:
+            self.bind(self.inter_broadcaster, self.settings.inter_broadcaster_port)
+            self.bind(self.inter_listener, self.settings.inter_listener_port)
+        self.inter_listener.subscribe(DeviceType.BRIDGE.topic)
 
         self.extern_listener = self.create_socket(zmq.ROUTER)
-        self.extern_listener.bind(f'tcp://*:{self.settings.extern_req_port}')
+        self.bind(self.extern_listener, self.settings.extern_req_port)
+
+        # XPUB passes every subscription to the Bridge, so late joiners can
+        # be sent state snapshot instantly
+        self.extern_broadcaster = self.create_socket(zmq.XPUB)
+        self.extern_broadcaster.setsockopt(zmq.XPUB_VERBOSE, 1)
+        self.bind(self.extern_broadcaster, self.settings.extern_bcst_port)
+
+        # Open STREAM connections and live Deimics requests are routed to
+        self.deimic_connections: set[bytes] = set()
+        self.deimic_identities: set[bytes] = set()
+        self.deimic_parsers: dict[bytes, DeimicFrameParser] = {}
+        self.deimic_requests: dict[bytes, DeimicRequestQueue] = {}
+        self.state_cache = StateCache()
+        self.history = (
+            HistoryStore(self.settings.bridge.history_resolutions)
+            if self.settings.bridge.history_resolutions
+            else None
+        )
+
+        self.component_map_loader = ComponentMapLoader(self.settings.bridge.deimic_map_file)
+        # Invalid map file is logged and the Bridge starts with empty map
+        self.reload_component_map()
+
+        self.presence = PresenceTracker(
+            self,
+            tick=self.settings.bridge.presence_tick,
+            slots=self.settings.bridge.presence_slots
+        )
+        self.gatherer = Gatherer()
+        self.request_engine = RequestEngine(
+            self,
+            concurrency=self.settings.bridge.requests_concurrency
+        )
+        self.conflator = (
+            Conflator(
+                window=self.settings.bridge.conflation_window,
+                exempt=self.resolve_conflation_exempt()
+            )
+            if self.settings.bridge.conflation_window
+            else None
+        )
+        self.journal = (
+            Journal(
+                self.settings.bridge.journal_dir,
+                segment_records=self.settings.bridge.journal_segment_records,
+                max_bytes=self.settings.bridge.journal_max_bytes,
+                max_age=self.settings.bridge.journal_max_age,
+                queue_size=self.settings.bridge.journal_queue_size
+            )
+            if self.settings.bridge.journal_dir
+            else None
+        )
+        if self.journal is not None:
+            self.journal.start()
+
+    def close(self):
+        if getattr(self, 'journal', None) is not None:
+            self.journal.close()
+            self.journal = None
+        if getattr(self, 'internal_proxy', None) is not None:
+            self.internal_proxy.close()
+            self.internal_proxy = None
+        super().close()
+
+    @property
+    def component_map(self) -> ComponentMap:
+        return self.component_map_loader.map
+
+    def resolve_conflation_exempt(self) -> set[ComponentKey]:
+        """
+        Resolves components exempt from conflation with the current
+        component map. Unknown components are skipped, they may appear in
+        reloaded map.
+        """
+        exempt = set()
+        for component in self.settings.bridge.conflation_exempt:
+            try:
+                exempt.add(self.component_map.resolve(component))
+            except KeyError:
+                _log.warning("Unknown component exempt from conflation: %s", component)
+        return exempt
+
+    def reload_component_map(self) -> bool:
+        """
+        Reloads component map if its file changed, together with everything
+        resolved with it.
+
+        Returns:
+            Whether the map was reloaded
+
+        """
+        try:
+            if not self.component_map_loader.reload_if_changed():
+                return False
+        except (OSError, ValueError) as error:
+            _log.error(
+                "Failed to load components map from '%s': %s",
+                self.component_map_loader.path,
+                error
+            )
+            return False
+        _log.info(
+            "Loaded components map: %d components from '%s'",
+            len(self.component_map),
+            self.component_map_loader.path
+        )
+        # Conflator doesn't exist yet on the initial load
+        if getattr(self, 'conflator', None) is not None:
+            self.conflator.exempt = self.resolve_conflation_exempt()
+        return True
+
+    async def watch_component_map(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_component_map()
+
+    def deimic_parser(self, identity: bytes) -> DeimicFrameParser:
+        """
+        Returns stream parser of given Deimic identity, creating it if needed.
+        """
+        try:
+            return self.deimic_parsers[identity]
+        except KeyError:
+            parser = self.deimic_parsers[identity] = DeimicFrameParser(
+                delimiter=self.settings.bridge.deimic_delimiter,
+                field_delimiter=self.settings.bridge.deimic_field_delimiter,
+                max_buffer=self.settings.bridge.deimic_max_buffer
+            )
+            return parser
+
+    def disconnect_deimic(self, identity: bytes):
+        """
+        Forgets the Deimic of given identity together with its stream parser
+        and pending requests.
+        """
+        self.deimic_identities.discard(identity)
+        self.deimic_parsers.pop(identity, None)
+        self.deimic_requests.pop(identity, None)
+
+    def evict_peer(self, kind: PeerKind, peer_id: str):
+        """
+        Drops state kept for peer which left or expired. Deimic is
+        disconnected (its identity, stream parser and pending requests are
+        forgotten) unless its connection is still open - quiet Deimic keeps
+        its queued requests. Pending gatherings stop awaiting replies of
+        evicted device and in-flight requests of evicted client are
+        cancelled.
+        """
+        match kind:
+            case PeerKind.DEIMIC:
+                identity = bytes.fromhex(peer_id)
+                if identity not in self.deimic_connections:
+                    self.disconnect_deimic(identity)
+            case PeerKind.DEVICE:
+                self.gatherer.abandon(peer_id)
+            case PeerKind.CLIENT:
+                self.request_engine.cancel(bytes.fromhex(peer_id))
+
+    def enqueue_deimic_request(
+        self,
+        request: DeimicRequest,
+        *,
+        identity: bytes = None,
+        priority: int = 0
+    ):
+        """
+        Queues request to be sent to the Deimic of given identity (or to all
+        connected Deimics if identity is None) on its next READY poll.
+        """
+        identities = [identity] if identity is not None else self.deimic_identities
+        for identity in identities:
+            self.deimic_requests.setdefault(
+                identity,
+                DeimicRequestQueue()
+            ).put(request, priority)
+
+    def deimic_queue_stats(self) -> dict[bytes, DeimicQueueStats]:
+        return {
+            identity: queue.stats
+            for identity, queue in self.deimic_requests.items()
+        }
+
+    async def execute(self):
+        tasks = [super().execute(), self.presence.execute()]
+        if self.conflator is not None:
+            tasks.append(self.conflator.execute(self.publish_state_updates))
+        if self.internal_proxy is not None and self.internal_proxy.capture_addr is not None:
+            capture = self.create_socket(zmq.SUB)
+            capture.connect(self.internal_proxy.capture_addr)
+            capture.subscribe(b'')
+            tasks.append(self.internal_proxy.observe(capture))
+        if self.settings.bridge.deimic_map_reload_interval:
+            tasks.append(self.watch_component_map(self.settings.bridge.deimic_map_reload_interval))
+        await asyncio.gather(*tasks)
+
+    async def publish_state_updates(self, updates: list[DeimicStateUpdateInfo]):
+        await DeimicStateUpdateInfo.send_batch(
+            updates,
+            socket=self.extern_broadcaster,
+            device=self
+        )
+
+    async def publish_internal(
+        self,
+        signature: int,
+        parts: base.MessageParts,
+        *,
+        request_id: bytes = b''
+    ):
+        """
+        Publishes internal request to all the devices matching given
+        signature. Parts are encoded once and sent under topic of each
+        targeted device type. Devices reply only to requests with non-empty
+        `request_id`.
+        """
+        frames = base.MessageEncoder().encode(parts)
+        for topic in DeviceType.route(signature):
+            await self.inter_broadcaster.send_multipart(
+                [topic, request_id, *frames],
+                copy=False
+            )
+
+    async def gather_internal(
+        self,
+        signature: int,
+        parts: base.MessageParts,
+        *,
+        deadline: float,
+        quorum: int = None
+    ) -> tuple[dict[str, t.Any], bool]:
+        """
+        Scatters internal request to all the devices matching given signature
+        and gathers their replies.
+
+        Params:
+            - signature: Targeted devices signature
+            - parts: Request parts
+            - deadline: Seconds to wait for replies
+            - quorum: Number of replies to return after (or once it can't
+                be reached), wait for the whole deadline if None
+
+        Returns:
+            Tuple of replies by device id (partial if deadline passed) and
+            flag telling whether the quorum was reached
+
+        """
+        # Devices known alive are awaited, so gathering doesn't wait for
+        # quorum which can't be reached after they leave
+        awaited = [
+            peer_id
+            for (kind, peer_id), info in self.presence.peers.items()
+            if kind is PeerKind.DEVICE
+            and DeviceType.__members__.get(info.get('device_type'), DeviceType.UNKNOWN) & signature
+        ]
+        request_id, gathering = self.gatherer.open(quorum, awaited)
+        await self.publish_internal(signature, parts, request_id=request_id)
+        return await self.gatherer.wait(request_id, gathering, deadline)
 
-        self.extern_broadcaster = self.create_socket(zmq.PUB)
-        self.extern_broadcaster.bind(f'tcp://*:{self.settings.extern_bcst_port}')
+    def bind(self, socket: zmq_asyncio.Socket, port: int):
+        """
+        Binds socket on TCP port, on its inproc counterpart used by devices
+        sharing the Bridge's context and on ipc endpoint (if enabled) used
+        by devices running on the same host.
+        """
+        socket.bind(f'tcp://*:{port}')
+        socket.bind(self.settings.inproc_addr_form.format(port=port))
+        if (ipc_addr := self.settings.ipc_addr(port)) is not None:
+            os.makedirs(self.settings.ipc_dir, exist_ok=True)
+            socket.bind(ipc_addr)
@@ -0,0 +1,62 @@
+import typing as t
+
+from deimic_pi.codecs import StateUpdate, StateUpdateCodec
+from deimic_pi.topics import ComponentFilter, matches
+from deimic_pi.types import DeimicComponentType
+
+
+ComponentKey = tuple[DeimicComponentType, int, int]
+
+
+class StateCache:
+    """
+    Last known state of every Deimic component.
+
+    States are kept as encoded `StateUpdateCodec` records in one contiguous
+    buffer (one slot per component), so full snapshot is a single copy of
+    the buffer, ready to be sent as `MessagePartType.STATES` frame.
+    """
+    def __init__(self):
+        self._slots: dict[ComponentKey, int] = {}
+        self._records = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def update(self, update: StateUpdate):
+        record = StateUpdateCodec.encode(update)
+        key = (update.component_type, update.address, update.number)
+        offset = self._slots.get(key)
+        if offset is None:
+            self._slots[key] = len(self._records)
+            self._records += record
+        else:
+            self._records[offset:offset + StateUpdateCodec.SIZE] = record
+
+    def get(self, key: ComponentKey) -> StateUpdate | None:
+        offset = self._slots.get(key)
+        if offset is None:
+            return None
+        return StateUpdateCodec.decode(
+            self._records[offset:offset + StateUpdateCodec.SIZE]
+        )
+
+    def snapshot_of(self, keys: t.Iterable[ComponentKey]) -> bytes:
+        records = memoryview(self._records)
+        size = StateUpdateCodec.SIZE
+        return b''.join(
+            records[offset:offset + size]
+            for offset in map(self._slots.get, keys)
+            if offset is not None
+        )
+
+    def snapshot(self, components: ComponentFilter = None) -> bytes:
+        if components is None or components == (None, None, None):
+            return bytes(self._records)
+        records = memoryview(self._records)
+        size = StateUpdateCodec.SIZE
+        return b''.join(
+            records[offset:offset + size]
+            for key, offset in self._slots.items()
+            if matches(key, components)
+        )
@@ -0,0 +1,183 @@
+import json
+import marshal
+import os
+import struct
+import typing as t
+from pathlib import Path
+
+from deimic_pi.devices.bridge.cache import ComponentKey
+from deimic_pi.types import DeimicComponentType
+
+
+def parse_component_key(value: str) -> ComponentKey:
+    """
+    Parses component written as `<type>-<address>-<number>` (e.g. `I-3-4`).
+    """
+    component_type, address, number = value.split('-')
+    return DeimicComponentType(component_type), int(address), int(number)
+
+
+class Component(t.NamedTuple):
+    name: str
+    key: ComponentKey
+    tags: tuple[str, ...] = ()
+
+
+class ComponentMap:
+    """
+    Indexed, immutable map of named Deimic components.
+
+    Map file is JSON object with `components` list, each component given as
+    `{"name": ..., "type": "O"|"I", "address": ..., "number": ...,
+    "tags": [...]}`.
+    """
+    def __init__(self, components: t.Iterable[Component] = ()):
+        self.components: tuple[Component, ...] = tuple(components)
+        self._by_name: dict[str, Component] = {}
+        self._by_key: dict[ComponentKey, Component] = {}
+        self._by_tag: dict[str, tuple[Component, ...]] = {}
+
+        tagged: dict[str, list[Component]] = {}
+        for component in self.components:
+            self._by_name[component.name] = component
+            self._by_key[component.key] = component
+            for tag in component.tags:
+                tagged.setdefault(tag, []).append(component)
+        self._by_tag = {tag: tuple(components) for tag, components in tagged.items()}
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def get(self, name: str) -> Component | None:
+        return self._by_name.get(name)
+
+    def name_of(self, key: ComponentKey) -> str | None:
+        component = self._by_key.get(key)
+        return component.name if component is not None else None
+
+    def tagged(self, tag: str) -> tuple[Component, ...]:
+        return self._by_tag.get(tag, ())
+
+    def resolve(self, component: str) -> ComponentKey:
+        """
+        Resolves component given by name or as `<type>-<address>-<number>`.
+
+        Raises:
+            - KeyError: Unknown component
+
+        """
+        found = self._by_name.get(component)
+        if found is not None:
+            return found.key
+        try:
+            return parse_component_key(component)
+        except ValueError:
+            raise KeyError(component) from None
+
+    @classmethod
+    def from_json(cls, data: dict[str, t.Any] | list) -> 'ComponentMap':
+        components = data.get('components', []) if isinstance(data, dict) else data
+        return cls(
+            Component(
+                str(component['name']),
+                (
+                    DeimicComponentType(component['type']),
+                    int(component['address']),
+                    int(component['number'])
+                ),
+                tuple(str(tag) for tag in component.get('tags', ()))
+            )
+            for component in components
+        )
+
+    def compile(self) -> bytes:
+        return marshal.dumps(tuple(
+            (name, component_type.value, address, number, tags)
+            for name, (component_type, address, number), tags in self.components
+        ))
+
+    @classmethod
+    def from_compiled(cls, data: bytes) -> 'ComponentMap':
+        return cls(
+            Component(name, (DeimicComponentType(component_type), address, number), tags)
+            for name, component_type, address, number, tags in marshal.loads(data)
+        )
+
+
+class ComponentMapLoader:
+    """
+    Loads component map from JSON file, caching its compiled form next to
+    it (`<file>.bin`), and reloads it when the file changes.
+
+    Compiled cache is valid only for the JSON file of the same modification
+    time and size. Reloaded map replaces the current one at once, so readers
+    always see complete map.
+    """
+    _HEADER = struct.Struct('!4sBqq')
+    _MAGIC = b'DPCM'
+    _VERSION = 1
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.compiled_path = self.path.with_name(self.path.name + '.bin')
+        self.map = ComponentMap()
+        self._stamp: tuple[int, int] | None = None
+
+    def _current_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        """
+        Returns:
+            True if map was (re)loaded
+
+        Raises:
+            - OSError: Map file couldn't be read
+            - ValueError: Invalid map file, current map is kept
+
+        """
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        # Stamp is taken up front, so invalid file is reported once, not on
+        # every check until it changes
+        self._stamp = stamp
+        self.map = self._load(stamp) if stamp is not None else ComponentMap()
+        return True
+
+    def _load(self, stamp: tuple[int, int]) -> ComponentMap:
+        compiled = self._load_compiled(stamp)
+        if compiled is not None:
+            return compiled
+        with open(self.path) as file:
+            try:
+                component_map = ComponentMap.from_json(json.load(file))
+            except (KeyError, TypeError, AttributeError) as error:
+                raise ValueError(f"Invalid component: {error!r}") from error
+        self._store_compiled(stamp, component_map)
+        return component_map
+
+    def _load_compiled(self, stamp: tuple[int, int]) -> ComponentMap | None:
+        try:
+            with open(self.compiled_path, 'rb') as file:
+                data = file.read()
+            magic, version, mtime_ns, size = self._HEADER.unpack_from(data)
+            if (magic, version, (mtime_ns, size)) != (self._MAGIC, self._VERSION, stamp):
+                return None
+            return ComponentMap.from_compiled(data[self._HEADER.size:])
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            return None
+
+    def _store_compiled(self, stamp: tuple[int, int], component_map: ComponentMap):
+        temporary_path = self.compiled_path.with_name(self.compiled_path.name + '.tmp')
+        try:
+            with open(temporary_path, 'wb') as file:
+                file.write(self._HEADER.pack(self._MAGIC, self._VERSION, *stamp))
+                file.write(component_map.compile())
+            os.replace(temporary_path, self.compiled_path)
+        except OSError:
+            pass
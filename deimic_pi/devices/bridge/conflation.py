@@ -0,0 +1,66 @@
+import asyncio
+import typing as t
+from dataclasses import dataclass
+
+from deimic_pi.devices.bridge.cache import ComponentKey
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+
+
+@dataclass
+class ConflationStats:
+    received: int = 0
+    published: int = 0
+    coalesced: int = 0
+
+
+class Conflator:
+    """
+    Coalesces state updates of each component within a time window, so only
+    the latest state per component is published at the end of the window.
+
+    Updates of `exempt` components are never coalesced.
+    """
+    def __init__(
+        self,
+        *,
+        window: float,
+        exempt: t.Iterable[ComponentKey] = ()
+    ):
+        self.window = window
+        self.exempt = set(exempt)
+        self.stats = ConflationStats()
+        self._pending: dict[ComponentKey, DeimicStateUpdateInfo] = {}
+
+    def push(self, update: DeimicStateUpdateInfo) -> bool:
+        """
+        Puts update into the current window.
+
+        Returns:
+            False if update is exempt from conflation and should be
+            published immediately, otherwise True
+
+        """
+        key = (update.component_type, update.address, update.number)
+        self.stats.received += 1
+        if key in self.exempt:
+            self.stats.published += 1
+            return False
+        if key in self._pending:
+            self.stats.coalesced += 1
+        self._pending[key] = update
+        return True
+
+    def drain(self) -> list[DeimicStateUpdateInfo]:
+        updates = list(self._pending.values())
+        self._pending.clear()
+        self.stats.published += len(updates)
+        return updates
+
+    async def execute(
+        self,
+        publish: t.Callable[[list[DeimicStateUpdateInfo]], t.Awaitable]
+    ):
+        while True:
+            await asyncio.sleep(self.window / 1000)
+            if self._pending:
+                await publish(self.drain())
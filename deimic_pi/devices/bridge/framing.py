@@ -0,0 +1,65 @@
+class DeimicFrameParser:
+    """
+    Incremental parser of raw TCP stream received from single Deimic
+    identity.
+
+    TCP may merge several messages into one STREAM frame or split one
+    message across frames, so received data is accumulated in reusable
+    buffer and cut into complete messages on `delimiter`. Each message is
+    split into fields on `field_delimiter`.
+
+    Empty `delimiter` disables framing - each received frame is treated as
+    exactly one message.
+    """
+    def __init__(
+        self,
+        *,
+        delimiter: str = '\n',
+        field_delimiter: str = '-',
+        max_buffer: int = 4096
+    ):
+        self.delimiter = delimiter.encode('ascii')
+        self.field_delimiter = field_delimiter
+        self.max_buffer = max_buffer
+
+        self._buffer = bytearray()
+        self.discarded = 0
+
+    def feed(self, data: bytes | memoryview) -> list[list[str]]:
+        """
+        Feeds parser with received data.
+
+        Params:
+            - data: Data received in single STREAM frame
+
+        Returns:
+            List of all messages completed by given data, each as list of
+            message fields
+
+        """
+        if not self.delimiter:
+            return [self._split(bytes(data))] if data else []
+
+        buffer = self._buffer
+        buffer += data
+        end = buffer.rfind(self.delimiter)
+        if end < 0:
+            if len(buffer) > self.max_buffer:
+                # No delimiter in sight - drop garbage instead of growing
+                self.discarded += len(buffer)
+                buffer.clear()
+            return []
+
+        complete = bytes(buffer[:end])
+        del buffer[:end + len(self.delimiter)]
+        return [
+            self._split(message)
+            for message in complete.split(self.delimiter)
+            if message
+        ]
+
+    def reset(self):
+        self._buffer.clear()
+
+    def _split(self, message: bytes) -> list[str]:
+        return message.decode('ascii', 'replace').strip().split(self.field_delimiter)
@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import struct
+import typing as t
+
+
+class Gathering:
+    """
+    Replies collected for single scattered internal request.
+
+    Gathering with quorum is done once the quorum is reached or once it
+    can't be reached anymore - awaited devices (those known alive when the
+    request was scattered) left and the rest of them together with replies
+    received so far are too few.
+    """
+    __slots__ = ('replies', 'quorum', 'awaited', 'done')
+
+    def __init__(self, quorum: int | None, awaited: t.Iterable[str] = ()):
+        self.replies: dict[str, t.Any] = {}
+        self.quorum = quorum
+        self.awaited = set(awaited)
+        self.done = asyncio.Event()
+
+    @property
+    def complete(self) -> bool:
+        return self.quorum is not None and len(self.replies) >= self.quorum
+
+    def add(self, device_id: str, result: t.Any):
+        self.replies[device_id] = result
+        self.awaited.discard(device_id)
+        if self.complete:
+            self.done.set()
+
+    def abandon(self, device_id: str):
+        """
+        Stops awaiting reply of device which left.
+        """
+        if device_id not in self.awaited:
+            return
+        self.awaited.discard(device_id)
+        if self.quorum is not None and len(self.replies) + len(self.awaited) < self.quorum:
+            self.done.set()
+
+
+class Gatherer:
+    """
+    Correlates internal devices replies with scattered requests by request
+    id.
+    """
+    _REQUEST_ID = struct.Struct('!Q')
+
+    def __init__(self):
+        self._request_ids = itertools.count(1)
+        self._pending: dict[bytes, Gathering] = {}
+
+    def open(self, quorum: int = None, awaited: t.Iterable[str] = ()) -> tuple[bytes, Gathering]:
+        request_id = self._REQUEST_ID.pack(next(self._request_ids))
+        gathering = self._pending[request_id] = Gathering(quorum, awaited)
+        return request_id, gathering
+
+    def close(self, request_id: bytes):
+        self._pending.pop(request_id, None)
+
+    def abandon(self, device_id: str):
+        """
+        Stops awaiting replies of device which left in all pending
+        gatherings.
+        """
+        for gathering in self._pending.values():
+            gathering.abandon(device_id)
+
+    def collect(self, request_id: bytes, device_id: str, result: t.Any) -> bool:
+        """
+        Adds reply to its gathering.
+
+        Returns:
+            False if reply doesn't belong to any pending gathering (e.g. it
+            came after deadline)
+
+        """
+        gathering = self._pending.get(request_id)
+        if gathering is None:
+            return False
+        gathering.add(device_id, result)
+        return True
+
+    async def wait(
+        self,
+        request_id: bytes,
+        gathering: Gathering,
+        deadline: float
+    ) -> tuple[dict[str, t.Any], bool]:
+        """
+        Waits until gathering reaches its quorum or deadline passes.
+
+        Returns:
+            Tuple of replies by device id and flag telling whether the quorum
+            was reached
+
+        """
+        try:
+            await asyncio.wait_for(gathering.done.wait(), deadline)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.close(request_id)
+        return dict(gathering.replies), gathering.complete
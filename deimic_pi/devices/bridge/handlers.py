@@ -1,36 +1,38 @@
 import enum
 import typing as t
 
-from deimic_pi import types
+from deimic_pi import topics, types
+from deimic_pi.devices import DeviceType
 from deimic_pi.devices.bridge import messages
+from deimic_pi.devices.bridge.presence import PeerKind
+from deimic_pi.devices.bridge.queues import DeimicRequestQueue
+from deimic_pi.log import get_logger
 import deimic_pi.messages as base
 from deimic_pi.messages import MessagePartType
 
 if t.TYPE_CHECKING:
     from deimic_pi.devices.bridge import Bridge
 
+_log = get_logger(__name__)
+
 
 class DeimicHandler(base.MessageHandler):
     class DeimicMessageType(str, enum.Enum):
-        OUTPUT = types.DeimicComponentType.OUTPUT 
-        INPUT = types.DeimicComponentType.INPUT
+        OUTPUT = types.DeimicComponentType.OUTPUT.value
+        INPUT = types.DeimicComponentType.INPUT.value
         READY = "READY"
         REQUEST = "REQUEST"
 
     class ComponentUpdateInfo(base.MessageHandler):
         # Default values for kwargs, cause to: https://youtrack.jetbrains.com/issue/PY-41433
         @classmethod
-        async def handle(
+        async def handle_message(
             cls,
             *,
             device: 'Bridge',
-            handling: t.AsyncGenerator[
-                bytes | list | str | int | float | dict,
-                MessagePartType,
-                None
-            ],
+            message: base.MessageView,
             identity: bytes = None,
-            payload: base.Payload = None,
+            payloads: list[base.Payload] = None,
             **kwargs
         ):
             if not isinstance(identity, bytes):
@@ -39,136 +41,247 @@ class DeimicHandler(base.MessageHandler):
                     f" '{identity}' [{type(identity)}]"
                 )
 
-            if payload is None or len(payload) != 3:
-                raise ValueError(
-                    f"Invalid payload format: '{payload}' [{type(payload)}]"
-                )
+            updates = []
+            for payload in payloads or ():
+                try:
+                    updates.append(messages.DeimicStateUpdateInfo.from_payload(
+                        payload=payload,
+                        received_from=identity
+                    ))
+                except ValueError:
+                    _log.warning("Invalid payload format: '%s' [%s]", payload, type(payload))
 
-            await messages.DeimicStateUpdateInfo.from_payload(
-                payload=payload,
-                received_from=identity
-            ).send(
-                socket=device.extern_broadcaster,
-                device=device
-            )
+            for update in updates:
+                device.state_cache.update(update.update)
+            if updates and (device.journal is not None or device.history is not None):
+                states = [update.update for update in updates]
+                if device.journal is not None:
+                    device.journal.append(states)
+                if device.history is not None:
+                    device.history.add(states)
+            if device.conflator is not None:
+                updates = [
+                    update
+                    for update in updates
+                    if not device.conflator.push(update)
+                ]
+            if updates:
+                await device.publish_state_updates(updates)
 
     class ApplicationForRequests(base.MessageHandler):
+        NO_REQUESTS = "NO_REQUESTS"
+
         # Default values for kwargs, cause to: https://youtrack.jetbrains.com/issue/PY-41433
         @classmethod
-        async def handle(
+        async def handle_message(
             cls,
             *,
             device: 'Bridge',
-            handling: base.Handling,
+            message: base.MessageView,
             identity: bytes = None,
             **kwargs
         ):
-            print(f"Detected readiness for requests from Deimic[{identity}]")
+            _log.debug("Detected readiness for requests from Deimic[%s]", identity)
+
+            # Whole batch of pending requests is sent in one framed reply,
+            # so single poll carries as many requests as possible
+            settings = device.settings.bridge
+            queue = device.deimic_requests.setdefault(identity, DeimicRequestQueue())
+            # Unterminated requests can't be told apart, so without
+            # delimiter single request is sent per poll
+            requests = queue.drain(settings.deimic_requests_batch if settings.deimic_delimiter else 1)
+            if not requests:
+                _log.debug("No request in queue for Deimic[%s]", identity)
+            reply = "".join(
+                request.encode(settings.deimic_field_delimiter) + settings.deimic_delimiter
+                for request in requests
+            ) or cls.NO_REQUESTS + settings.deimic_delimiter
 
             await base.send_parts(
                 socket=device.deimic_stream,
                 parts=[
                     identity,
-                    (MessagePartType.STRING, ":3")
+                    (MessagePartType.STRING, reply)
                 ]
             )
 
-            # if device.deimic_requests_queue.empty():
-            #     print(f"No request in queue for Deimic[{identity}]")
-            #     base.send_parts(
-            #         socket=device.deimic_stream,
-            #         parts=[
-            #             identity,
-            #             (MessagePartType.STRING, "NO_REQUESTS")
-            #         ]
-            #     )
-            # base.send_parts(
-            #     socket=device.deimic_stream,
-            #     parts=[
-            #         identity,
-            #         (MessagePartType.STRING, device.deimic_requests_queue.get())
-            #     ]
-            # )
-
     class Request(base.MessageHandler):
         # Default values for kwargs, cause to: https://youtrack.jetbrains.com/issue/PY-41433
         @classmethod
-        async def handle(
+        async def handle_message(
             cls,
             *,
             device: 'Bridge',
-            handling: base.Handling,
+            message: base.MessageView,
             identity: bytes = None,
             payload: base.Payload = None,
             **kwargs
         ):
-            print(f"Received request message from Deimic[{identity}]: {payload}")
+            _log.info("Received request message from Deimic[%s]: %s", identity, payload)
 
     @classmethod
-    async def handle(
+    async def handle_message(
         cls,
         *,
         device: 'Bridge',
-        handling: base.Handling,
+        message: base.MessageView,
         **kwargs
     ):
-        identity: bytes = await anext(handling)
-        payload: list[str] = (await handling.asend(base.MessagePartType.STRING)).split('-')
-        # TODO: Replace `-` delimiter with `|`
-        # payload: list[str] = handling.send(base.MessagePartType.STRING).split('|')
-
-        message_type = payload.pop(0)
-        match message_type:
-            case "":
-                print(f"Received empty message from Deimic[{identity}]. Probably it's start/end of connection.")
-                return
-            case cls.DeimicMessageType.OUTPUT | cls.DeimicMessageType.INPUT:
-                await cls.ComponentUpdateInfo.handle(
-                    device=device,
-                    handling=handling,
-                    identity=identity,
-                    payload=[message_type, *payload]
-                )
-            case cls.DeimicMessageType.READY:
-                await cls.ApplicationForRequests.handle(
-                    device=device,
-                    handling=handling,
-                    identity=identity,
-                    payload=payload
+        identity: bytes = message[0]
+        data = message.frames[1].buffer
+        if not data:
+            _log.info("Received empty message from Deimic[%s]. Probably it's start/end of connection.", identity)
+            if identity in device.deimic_connections:
+                device.deimic_connections.discard(identity)
+                await device.presence.left(PeerKind.DEIMIC, identity.hex())
+                device.disconnect_deimic(identity)
+            else:
+                device.deimic_connections.add(identity)
+                device.deimic_identities.add(identity)
+                await device.presence.seen(
+                    PeerKind.DEIMIC,
+                    identity.hex(),
+                    device.settings.bridge.deimic_liveness
                 )
-            case cls.DeimicMessageType.REQUEST:
-                await cls.Request.handle(
+            return
+
+        # Any message keeps the Deimic alive, also one evicted on expiry
+        # but still connected
+        device.deimic_identities.add(identity)
+        await device.presence.seen(
+            PeerKind.DEIMIC,
+            identity.hex(),
+            device.settings.bridge.deimic_liveness
+        )
+
+        # State updates are handed to the broadcaster in batches, flushed
+        # before any other message to keep messages order
+        updates: list[base.Payload] = []
+        for payload in device.deimic_parser(identity).feed(data):
+            message_type = payload.pop(0)
+            if message_type in (cls.DeimicMessageType.OUTPUT, cls.DeimicMessageType.INPUT):
+                updates.append([message_type, *payload])
+                continue
+
+            if updates:
+                await cls.ComponentUpdateInfo.handle_message(
                     device=device,
-                    handling=handling,
+                    message=message,
                     identity=identity,
-                    payload=payload
+                    payloads=updates
                 )
-            case _:
-                print(f"Message of type `{message_type}` cannot be interpreted. Message payload: {payload}")
+                updates = []
+
+            match message_type:
+                case cls.DeimicMessageType.READY:
+                    await cls.ApplicationForRequests.handle_message(
+                        device=device,
+                        message=message,
+                        identity=identity,
+                        payload=payload
+                    )
+                case cls.DeimicMessageType.REQUEST:
+                    await cls.Request.handle_message(
+                        device=device,
+                        message=message,
+                        identity=identity,
+                        payload=payload
+                    )
+                case _:
+                    _log.warning(
+                        "Message of type `%s` cannot be interpreted. Message payload: %s",
+                        message_type,
+                        payload
+                    )
+
+        if updates:
+            await cls.ComponentUpdateInfo.handle_message(
+                device=device,
+                message=message,
+                identity=identity,
+                payloads=updates
+            )
 
 
 class InternalRepliesHandler(base.MessageHandler):
     @classmethod
-    async def handle(
+    async def handle_message(
         cls,
         *,
         device: 'Bridge',
-        handling: base.Handling,
+        message: base.MessageView,
         **kwargs
     ):
-        pass
+        # Reply frames: [BRIDGE topic, request_id, device_id, result],
+        # heartbeat frames: [BRIDGE topic, b'', HEARTBEAT, device_id,
+        # device_type, interval]
+        if message[0] != DeviceType.BRIDGE.topic or len(message) < 4:
+            return
+        # Malformed frame is dropped (`json.JSONDecodeError` and
+        # `UnicodeDecodeError` are `ValueError`s too)
+        try:
+            if not message[1]:
+                if len(message) >= 6 and message.string(2) == base.MessageType.HEARTBEAT:
+                    device_id = message.string(3)
+                    device_type = message.string(4)
+                    liveness = float(message.string(5)) * device.settings.heartbeat_liveness
+                    await device.presence.seen(
+                        PeerKind.DEVICE,
+                        device_id,
+                        liveness,
+                        device_type=device_type
+                    )
+                return
+            device_id, result = message.string(2), message.json(3)
+        except ValueError as error:
+            _log.warning("Dropped malformed internal reply: %s", error)
+            return
+        device.gatherer.collect(message[1], device_id, result)
 
 
 class ExternalRequestsHandler(base.MessageHandler):
     @classmethod
-    def handle(
+    async def handle_message(
+        cls,
+        *,
+        device: 'Bridge',
+        message: base.MessageView,
+        **kwargs
+    ):
+        # Requests are executed in their own tasks, so slow request doesn't
+        # hold the socket
+        device.request_engine.submit(message)
+
+
+class SubscriptionsHandler(base.MessageHandler):
+    @classmethod
+    async def handle_message(
         cls,
         *,
         device: 'Bridge',
-        handling: base.Handling,
+        message: base.MessageView,
         **kwargs
     ):
-        pass
+        # XPUB subscription message is `\x01` (subscribe) or `\x00`
+        # (unsubscribe) followed by the topic. Subscribing snapshot topic
+        # (or its prefix) triggers snapshot of the subscribed components.
+        subscription = message[0]
+        if subscription[:1] != b'\x01':
+            return
+        topic = subscription[1:]
+        try:
+            message_type, components = topics.parse_topic(topic)
+        except (KeyError, ValueError):
+            message_type, components = None, None
+        if topic and message_type is not base.MessageType.SNAPSHOT:
+            return
+        await messages.DeimicStateSnapshot(
+            device.state_cache.snapshot(components),
+            topic=topic or topics.state_topic(message_type=base.MessageType.SNAPSHOT)
+        ).send(
+            socket=device.extern_broadcaster,
+            device=device
+        )
 
 
 class BridgePoller(base.Poller):
@@ -177,3 +290,4 @@ class BridgePoller(base.Poller):
         self.register(device.deimic_stream, DeimicHandler)
         self.register(device.inter_listener, InternalRepliesHandler)
         self.register(device.extern_listener, ExternalRequestsHandler)
+        self.register(device.extern_broadcaster, SubscriptionsHandler)
@@ -0,0 +1,150 @@
+import time
+import typing as t
+from array import array
+
+from deimic_pi.codecs import StateUpdate
+from deimic_pi.devices.bridge.cache import ComponentKey
+
+# Downsampled bucket: (start in seconds since the epoch, min, max, last, count)
+Bucket = tuple[float, int, int, int, int]
+
+
+class HistorySeries:
+    """
+    Ring of fixed-duration min/max/last/count buckets of single component's
+    states at single resolution.
+
+    Buckets are kept in parallel typed arrays (24 bytes per bucket). Slot of
+    a bucket is its number (`timestamp // resolution`) modulo capacity, so
+    updates are O(1) and stale slots are recognized by their bucket number.
+    """
+    __slots__ = ('resolution', 'capacity', 'numbers', 'minimum', 'maximum', 'last', 'count')
+
+    def __init__(self, resolution: float, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.numbers = array('q', [-1]) * capacity
+        self.minimum = array('i', [0]) * capacity
+        self.maximum = array('i', [0]) * capacity
+        self.last = array('i', [0]) * capacity
+        self.count = array('I', [0]) * capacity
+
+    @property
+    def span(self) -> float:
+        return self.resolution * self.capacity
+
+    def add(self, timestamp: float, state: int):
+        number = int(timestamp // self.resolution)
+        slot = number % self.capacity
+        if self.numbers[slot] != number:
+            self.numbers[slot] = number
+            self.minimum[slot] = self.maximum[slot] = self.last[slot] = state
+            self.count[slot] = 1
+            return
+        if state < self.minimum[slot]:
+            self.minimum[slot] = state
+        elif state > self.maximum[slot]:
+            self.maximum[slot] = state
+        self.last[slot] = state
+        self.count[slot] += 1
+
+    def buckets(self, since: float, until: float, *, merge: int = 1) -> list[Bucket]:
+        """
+        Returns non-empty buckets of given time range, merging every `merge`
+        consecutive buckets into one.
+        """
+        first = max(int(since // self.resolution), int(until // self.resolution) - self.capacity + 1)
+        last = int(until // self.resolution)
+        merged: list[list] = []
+        for number in range(first, last + 1):
+            slot = number % self.capacity
+            if self.numbers[slot] != number:
+                continue
+            group = number // merge
+            if merged and merged[-1][0] == group:
+                bucket = merged[-1]
+                bucket[1] = min(bucket[1], self.minimum[slot])
+                bucket[2] = max(bucket[2], self.maximum[slot])
+                bucket[3] = self.last[slot]
+                bucket[4] += self.count[slot]
+            else:
+                merged.append([
+                    group,
+                    self.minimum[slot],
+                    self.maximum[slot],
+                    self.last[slot],
+                    self.count[slot]
+                ])
+        resolution = self.resolution * merge
+        return [(group * resolution, *values) for group, *values in merged]
+
+
+class HistoryStore:
+    """
+    Downsampled history of Deimic components' states.
+
+    Every component gets a series per configured resolution (allocated on
+    its first update), so queries of any time range are answered from the
+    finest series covering it, already reduced to a bounded number of
+    points.
+    """
+    def __init__(self, resolutions: t.Iterable[tuple[float, int]]):
+        self.resolutions = sorted(resolutions)
+        self._series: dict[ComponentKey, list[HistorySeries]] = {}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, key: ComponentKey) -> bool:
+        return key in self._series
+
+    def add(self, updates: t.Iterable[StateUpdate], timestamp: float = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for component_type, address, number, state in updates:
+            key = (component_type, address, number)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [
+                    HistorySeries(resolution, capacity)
+                    for resolution, capacity in self.resolutions
+                ]
+            for resolution_series in series:
+                resolution_series.add(timestamp, state)
+
+    def query(
+        self,
+        key: ComponentKey,
+        since: float,
+        until: float = None,
+        *,
+        points: int = 300
+    ) -> tuple[float, list[Bucket]]:
+        """
+        Returns downsampled states of given component.
+
+        Params:
+            - key: Component key
+            - since: Range start in seconds since the epoch
+            - until: Range end in seconds since the epoch, now if None
+            - points: Maximal number of returned buckets
+
+        Returns:
+            Tuple of buckets' resolution in seconds and buckets of the range
+            (empty buckets are left out)
+
+        Raises:
+            - KeyError: No history of given component
+
+        """
+        series = self._series[key]
+        until = time.time() if until is None else until
+        duration = max(until - since, 0.0)
+        # Finest series covering the whole range, the coarsest otherwise
+        chosen = next(
+            (candidate for candidate in series if candidate.span >= duration),
+            series[-1]
+        )
+        # Aligned groups of `merge` buckets - at most `points` of them fit
+        # in the range
+        merge = max(-(-int(duration // chosen.resolution) // max(points - 1, 1)), 1)
+        return chosen.resolution * merge, chosen.buckets(since, until, merge=merge)
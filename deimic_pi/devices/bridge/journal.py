@@ -0,0 +1,375 @@
+import asyncio
+import bisect
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from deimic_pi.codecs import StateUpdate, StateUpdateCodec, TimedStateUpdateCodec
+from deimic_pi.log import get_logger
+
+_log = get_logger(__name__)
+
+_TIMESTAMP = struct.Struct('!q')
+RECORD_SIZE = TimedStateUpdateCodec.SIZE
+
+
+class JournalSegment:
+    """
+    Single journal file of preallocated fixed-size records
+    (`TimedStateUpdateCodec` layout), memory-mapped as a whole.
+
+    File name is the first record's timestamp and the segment's sequence
+    number (`<timestamp>-<sequence>`), so segments sort by time and
+    segments started at the same time (e.g. batch overflowing a segment)
+    don't collide. Records are appended in timestamp order and unused slots are zeroed, so
+    number of written records is recovered after restart by binary search
+    for the first empty slot and records of given time are found the same
+    way.
+    """
+    SUFFIX = '.journal'
+
+    def __init__(self, path: Path, *, capacity: int = None):
+        self.path = path
+        timestamp, _, sequence = path.stem.partition('-')
+        self.first_timestamp = int(timestamp)
+        self.sequence = int(sequence or 0)
+        exists = path.exists()
+        with open(path, 'a+b') as file:
+            if not exists:
+                file.truncate(capacity * RECORD_SIZE)
+            size = os.fstat(file.fileno()).st_size
+            self.capacity = size // RECORD_SIZE
+            self._mmap = mmap.mmap(file.fileno(), size)
+        self.count = self._bisect_empty() if exists else 0
+
+    @classmethod
+    def create(
+        cls,
+        directory: Path,
+        timestamp: int,
+        sequence: int,
+        *,
+        capacity: int
+    ) -> 'JournalSegment':
+        return cls(directory / f'{timestamp:020d}-{sequence:010d}{cls.SUFFIX}', capacity=capacity)
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap.closed
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def size(self) -> int:
+        return self.capacity * RECORD_SIZE
+
+    @property
+    def last_timestamp(self) -> int:
+        return self.timestamp_at(self.count - 1) if self.count else self.first_timestamp
+
+    def timestamp_at(self, index: int) -> int:
+        return _TIMESTAMP.unpack_from(self._mmap, index * RECORD_SIZE)[0]
+
+    def _bisect_empty(self) -> int:
+        low, high = 0, self.capacity
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp_at(middle):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def bisect(self, timestamp: int) -> int:
+        """
+        Returns index of the first written record not older than given
+        timestamp (nanoseconds).
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def append(self, record: bytes):
+        offset = self.count * RECORD_SIZE
+        self._mmap[offset:offset + RECORD_SIZE] = record
+        # Count is published after the record is in place, so readers never
+        # see half-written records
+        self.count += 1
+
+    def records(self, start: int, stop: int) -> bytes:
+        return self._mmap[start * RECORD_SIZE:stop * RECORD_SIZE]
+
+    def flush(self):
+        if not self.closed:
+            self._mmap.flush()
+
+    def close(self):
+        self.flush()
+        self._mmap.close()
+
+    def delete(self):
+        self._mmap.close()
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class JournalStats:
+    appended: int = 0
+    written: int = 0
+    # Batches dropped because the writer did not keep up
+    dropped: int = 0
+    # Batches failed to be written
+    failed: int = 0
+    segments: int = 0
+    size: int = 0
+
+
+class Journal:
+    """
+    Append-only journal of Deimic component state updates.
+
+    Updates are timestamped and queued on the event loop thread - encoding
+    and writing to memory-mapped segment files happens on a background
+    writer thread, so journaling adds no latency to broadcasting. Segments
+    are rotated when full and the oldest ones are deleted when the journal
+    exceeds `max_bytes` or their records get older than `max_age` seconds.
+    """
+    RETENTION_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        segment_records: int,
+        max_bytes: int = None,
+        max_age: float = None,
+        queue_size: int = 1024
+    ):
+        self.directory = Path(directory)
+        self.segment_records = segment_records
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = JournalStats()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segments: list[JournalSegment] = []
+        for path in self.directory.glob(f'*{JournalSegment.SUFFIX}'):
+            if path.stat().st_size < RECORD_SIZE:
+                # Left by segment creation interrupted before preallocation,
+                # can't be memory-mapped
+                _log.warning("Removing empty journal segment '%s'", path)
+                path.unlink()
+                continue
+            self._segments.append(JournalSegment(path))
+        self._segments.sort(key=lambda segment: (segment.first_timestamp, segment.sequence))
+        self._sequence = self._segments[-1].sequence + 1 if self._segments else 0
+        # Time index of segments: first timestamps in the segments' order
+        self._index = [segment.first_timestamp for segment in self._segments]
+        self._last_timestamp = self._segments[-1].last_timestamp if self._segments else 0
+        # Guards the segments list against retention running while reading
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[int, list[StateUpdate]] | None] = queue.Queue(queue_size)
+        self._writer = threading.Thread(target=self._write, name='deimic_pi-journal', daemon=True)
+        self._update_stats()
+
+    def start(self):
+        self._writer.start()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+
+    def append(self, updates: list[StateUpdate]):
+        """
+        Queues updates received at the same time to be written. Never
+        blocks - batch is dropped (and counted) if the writer's queue is
+        full.
+        """
+        try:
+            self._queue.put_nowait((time.time_ns(), updates))
+        except queue.Full:
+            self.stats.dropped += 1
+        else:
+            self.stats.appended += len(updates)
+
+    def _write(self):
+        next_retention = time.monotonic() + self.RETENTION_INTERVAL
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.RETENTION_INTERVAL)
+            except queue.Empty:
+                batch = ()
+            if batch is None:
+                break
+            try:
+                if batch:
+                    self._write_batch(*batch)
+                if time.monotonic() >= next_retention:
+                    next_retention = time.monotonic() + self.RETENTION_INTERVAL
+                    self._apply_retention()
+            except Exception:
+                # Writer keeps running, so single failure (e.g. full disk)
+                # doesn't stop journaling for good
+                self.stats.failed += 1
+                _log.exception("Journal write failed")
+
+    def _write_batch(self, timestamp: int, updates: list[StateUpdate]):
+        # Keeps timestamps ordered even if the wall clock steps back
+        timestamp = self._last_timestamp = max(timestamp, self._last_timestamp)
+        # Encoded up front, so invalid update drops the batch before any of
+        # it is written
+        records = [
+            TimedStateUpdateCodec.encode(timestamp, StateUpdateCodec.encode(update))
+            for update in updates
+        ]
+        for record in records:
+            self._segment_for(timestamp).append(record)
+        self.stats.written += len(records)
+
+    def _segment_for(self, timestamp: int) -> JournalSegment:
+        if self._segments and not self._segments[-1].full:
+            return self._segments[-1]
+        segment = JournalSegment.create(
+            self.directory,
+            timestamp,
+            self._sequence,
+            capacity=self.segment_records
+        )
+        self._sequence += 1
+        with self._lock:
+            if self._segments:
+                self._segments[-1].flush()
+            self._segments.append(segment)
+            self._index.append(segment.first_timestamp)
+        self._apply_retention()
+        return segment
+
+    def _apply_retention(self):
+        expired_before = time.time_ns() - int(self.max_age * 1e9) if self.max_age else None
+        with self._lock:
+            # The segment being written is never deleted
+            while len(self._segments) > 1 and (
+                (
+                    self.max_bytes is not None
+                    and sum(segment.size for segment in self._segments) > self.max_bytes
+                ) or (
+                    expired_before is not None
+                    and self._segments[0].last_timestamp < expired_before
+                )
+            ):
+                self._segments.pop(0).delete()
+                self._index.pop(0)
+        self._update_stats()
+
+    def _update_stats(self):
+        self.stats.segments = len(self._segments)
+        self.stats.size = sum(segment.size for segment in self._segments)
+
+    def read(
+        self,
+        since: int = None,
+        until: int = None,
+        *,
+        chunk_records: int = 256
+    ) -> t.Iterator[bytes]:
+        """
+        Reads journaled records of given time range.
+
+        Params:
+            - since: Timestamp (ns) of the oldest record to read, from the
+                journal's beginning if None
+            - until: Timestamp (ns) records are read up to (exclusive), to
+                the journal's end if None
+            - chunk_records: Maximal number of records in a chunk
+
+        Returns:
+            Iterator of chunks of `TimedStateUpdateCodec` records
+
+        """
+        with self._lock:
+            # Segments started at `since` may be preceded by one ending with
+            # records of the same time
+            first = max(bisect.bisect_left(self._index, since) - 1, 0) if since else 0
+            segments = self._segments[first:]
+        for segment in segments:
+            if until is not None and segment.first_timestamp >= until:
+                return
+            with self._lock:
+                if segment.closed:
+                    continue    # Deleted by retention meanwhile
+                start = segment.bisect(since) if since else 0
+                stop = segment.bisect(until) if until is not None else segment.count
+            for offset in range(start, stop, chunk_records):
+                with self._lock:
+                    if segment.closed:
+                        break
+                    chunk = segment.records(offset, min(offset + chunk_records, stop))
+                yield chunk
+
+    async def replay(
+        self,
+        since: int = None,
+        until: int = None,
+        *,
+        speed: float = 0.0,
+        chunk_records: int = 256,
+        idle: float = None
+    ) -> t.AsyncGenerator[bytes, None]:
+        """
+        Reads journaled records of given time range paced as they were
+        received.
+
+        Params:
+            - since: Timestamp (ns) of the oldest record to replay
+            - until: Timestamp (ns) records are replayed up to (exclusive)
+            - speed: Replay speed relative to the original pace (e.g. 2.0
+                replays twice as fast), 0 replays as fast as possible
+            - chunk_records: Maximal number of records in a chunk
+            - idle: Longest pause (seconds) without yielding, empty chunk is
+                yielded after it (e.g. to keep streamed reply alive), pauses
+                aren't limited if None
+
+        Returns:
+            Async iterator of chunks of `TimedStateUpdateCodec` records
+
+        """
+        loop = asyncio.get_running_loop()
+        origin = started = None
+        for chunk in self.read(since, until, chunk_records=chunk_records):
+            if not speed:
+                yield chunk
+                await asyncio.sleep(0)
+                continue
+            pending = 0
+            for offset in range(0, len(chunk), RECORD_SIZE):
+                timestamp = _TIMESTAMP.unpack_from(chunk, offset)[0]
+                if origin is None:
+                    origin, started = timestamp, loop.time()
+                due = started + (timestamp - origin) / 1e9 / speed
+                if due > loop.time():
+                    if offset > pending:
+                        yield chunk[pending:offset]
+                        pending = offset
+                    while idle is not None and due - loop.time() > idle:
+                        await asyncio.sleep(idle)
+                        yield b''
+                    await asyncio.sleep(max(due - loop.time(), 0))
+            if pending < len(chunk):
+                yield chunk[pending:]
@@ -1,22 +1,32 @@
-import abc
+import asyncio
+import functools
 import typing as t
 
 import zmq.asyncio as zmq_asyncio
 
 import deimic_pi.messages as base
-from deimic_pi import types
+from deimic_pi import topics, types
+from deimic_pi.codecs import StateUpdate, StateUpdateCodec
+from deimic_pi.log import get_logger
 
 if t.TYPE_CHECKING:
     from deimic_pi.devices.device import Device
 
 
+_log = get_logger(__name__)
+
+_state_topic = functools.lru_cache(maxsize=4096)(topics.state_topic)
+
+
 class DeimicStateUpdateInfo(base.MessageBearer):
+    _encoder = base.MessageEncoder()
+
     def __init__(
         self,
         component_type: types.DeimicComponentType,
         address: int,
         number: int,
-        new_state: base.PayloadPart,
+        new_state: int,
         received_from: bytes = None
     ):
         self.received_from = received_from
@@ -25,10 +35,15 @@ class DeimicStateUpdateInfo(base.MessageBearer):
         self.number = number
         self.new_state = new_state
 
+    @property
+    def topic(self) -> bytes:
+        return _state_topic(self.component_type, self.address, self.number)
+
     @classmethod
-    @abc.abstractmethod
     async def from_handling(cls, handling: base.Handling) -> 'DeimicStateUpdateInfo':
-        raise NotImplementedError()
+        _ = await anext(handling)   # Component state topic
+        update = await handling.asend(base.MessagePartType.STATE)
+        return cls(*update)
 
     @classmethod
     def from_payload(
@@ -37,25 +52,111 @@ class DeimicStateUpdateInfo(base.MessageBearer):
         received_from: bytes,
         payload: base.Payload
     ) -> 'DeimicStateUpdateInfo':
-        return cls(*payload, received_from=received_from)
+        """
+        Raises:
+            - ValueError: Invalid payload, e.g. field out of range of the
+                state update frame (see `StateUpdateCodec.validate`)
+        """
+        component_type, address, number, new_state = payload
+        update = StateUpdateCodec.validate(StateUpdate(
+            types.DeimicComponentType(component_type),
+            int(address),
+            int(number),
+            int(new_state)
+        ))
+        return cls(*update, received_from=received_from)
 
-    async def send(self, socket: zmq_asyncio.Socket, device: 'Device'):
-        print(
-            f"Received Deimic[{self.received_from}] component state update:"
-            f" '{self.component_type} {self.address}-{self.number}'"
-            f" ({self.new_state})"
+    @property
+    def update(self) -> StateUpdate:
+        return StateUpdate(
+            self.component_type,
+            self.address,
+            self.number,
+            self.new_state
+        )
+
+    @property
+    def parts(self) -> base.MessageParts:
+        return [
+            self.topic,
+            (base.MessagePartType.STATE, self.update)
+        ]
+
+    def _log_received(self):
+        _log.debug(
+            "Received Deimic[%s] component state update: '%s %s-%s' (%s)",
+            self.received_from,
+            self.component_type.value,
+            self.address,
+            self.number,
+            self.new_state
         )
-        await base.send_parts(
+
+    async def send(self, socket: zmq_asyncio.Socket, device: 'Device'):
+        self._log_received()
+        await self._encoder.send(socket=socket, parts=self.parts)
+
+    @classmethod
+    async def send_batch(
+        cls,
+        updates: t.Iterable['DeimicStateUpdateInfo'],
+        socket: zmq_asyncio.Socket,
+        device: 'Device'
+    ):
+        """
+        Sends updates as separate messages (each under its own component
+        topic). All of them are encoded up front and queued on the socket
+        at once, awaited together.
+        """
+        messages = []
+        for update in updates:
+            update._log_received()
+            messages.append(cls._encoder.encode(update.parts))
+        await asyncio.gather(*(
+            socket.send_multipart(frames, copy=False)
+            for frames in messages
+        ))
+
+
+class DeimicStateSnapshot(base.MessageBearer):
+    _encoder = base.MessageEncoder()
+
+    def __init__(
+        self,
+        states: bytes,
+        topic: bytes = topics.state_topic(message_type=base.MessageType.SNAPSHOT),
+        received_from: bytes = None
+    ):
+        self.received_from = received_from
+        self.topic = topic
+        self.states = states
+
+    @classmethod
+    async def from_handling(cls, handling: base.Handling) -> 'DeimicStateSnapshot':
+        topic = await anext(handling)
+        states = await handling.asend(base.MessagePartType.RAW)
+        return cls(states, topic=topic)
+
+    @classmethod
+    def from_payload(
+        cls,
+        *,
+        received_from: bytes,
+        payload: base.Payload
+    ) -> 'DeimicStateSnapshot':
+        return cls(*payload, received_from=received_from)
+
+    async def send(
+        self,
+        socket: zmq_asyncio.Socket,
+        device: 'Device',
+        envelope: base.Frames = None
+    ):
+        await self._encoder.send(
             socket=socket,
             parts=[
-                (base.MessagePartType.STRING, base.MessageType.STATE_UPDATE),
-                b'',
-
-                (base.MessagePartType.STRING, "DEIMIC"),
-                b'',
-                (base.MessagePartType.PYOBJ, self.component_type),
-                (base.MessagePartType.PYOBJ, self.address),
-                (base.MessagePartType.PYOBJ, self.number),
-                (base.MessagePartType.PYOBJ, self.new_state)
-            ]
+                self.topic,
+                (base.MessagePartType.STATES, self.states)
+            ],
+            envelope=envelope
         )
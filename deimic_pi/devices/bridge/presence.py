@@ -0,0 +1,104 @@
+import enum
+import typing as t
+from dataclasses import dataclass
+
+import deimic_pi.messages as base
+from deimic_pi import topics
+from deimic_pi.log import get_logger
+from deimic_pi.messages import MessagePartType, MessageType
+from deimic_pi.timers import TimerWheel
+
+if t.TYPE_CHECKING:
+    from deimic_pi.devices.bridge import Bridge
+
+_log = get_logger(__name__)
+
+
+class PeerKind(str, enum.Enum):
+    DEIMIC = 'DEIMIC'
+    DEVICE = 'DEVICE'
+    CLIENT = 'CLIENT'
+
+
+Peer = tuple[PeerKind, str]
+
+
+@dataclass
+class PresenceStats:
+    joined: int = 0
+    left: int = 0
+    expired: int = 0
+    alive: int = 0
+
+
+class PresenceTracker:
+    """
+    Liveness of the Bridge's peers - Deimics (any message counts), internal
+    devices and external clients (heartbeats).
+
+    Every message from a peer re-arms its expiry on the timer wheel. Peers
+    not heard from in time are evicted from the Bridge and both joining and
+    leaving are published to external subscribers as presence events
+    (`MessageType.PRESENCE` topic, JSON payload).
+    """
+    _TOPIC = topics.MESSAGE_TYPE_CODES[MessageType.PRESENCE]
+
+    def __init__(self, device: 'Bridge', *, tick: float, slots: int):
+        self.device = device
+        self.wheel: TimerWheel[Peer] = TimerWheel(tick=tick, slots=slots)
+        self.peers: dict[Peer, dict[str, t.Any]] = {}
+        self.stats = PresenceStats()
+
+    async def seen(self, kind: PeerKind, peer_id: str, timeout: float, **info):
+        """
+        Marks peer alive for given timeout (seconds), announcing it if it's
+        new.
+        """
+        peer = (kind, peer_id)
+        if self.wheel.touch(peer, timeout):
+            self.peers[peer] = info
+            self.stats.joined += 1
+            self.stats.alive = len(self.peers)
+            await self.publish(peer, True)
+
+    async def left(self, kind: PeerKind, peer_id: str):
+        """
+        Forgets peer which left gracefully.
+        """
+        peer = (kind, peer_id)
+        if peer not in self.peers:
+            return
+        self.wheel.cancel(peer)
+        self.stats.left += 1
+        await self._evict(peer)
+
+    async def expire(self, peers: list[Peer]):
+        for peer in peers:
+            _log.info("%s %s expired", peer[0].value, peer[1])
+            self.stats.expired += 1
+            await self._evict(peer)
+
+    async def _evict(self, peer: Peer):
+        self.device.evict_peer(*peer)
+        await self.publish(peer, False)
+        if peer not in self.wheel:     # Not back meanwhile
+            self.peers.pop(peer, None)
+        self.stats.alive = len(self.peers)
+
+    async def publish(self, peer: Peer, present: bool):
+        kind, peer_id = peer
+        await base.send_parts(
+            socket=self.device.extern_broadcaster,
+            parts=[
+                self._TOPIC,
+                (MessagePartType.JSON, {
+                    'kind': kind.value,
+                    'id': peer_id,
+                    'present': present,
+                    **self.peers.get(peer, {}),
+                })
+            ]
+        )
+
+    async def execute(self):
+        await self.wheel.execute(self.expire)
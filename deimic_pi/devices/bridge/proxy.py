@@ -0,0 +1,102 @@
+import threading
+from dataclasses import dataclass
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+
+@dataclass
+class ProxyStats:
+    # Counted from the capture socket, if enabled
+    messages: int = 0
+    bytes: int = 0
+    subscriptions: int = 0
+
+
+class InternalProxy:
+    """
+    Steerable libzmq XSUB/XPUB proxy forwarding internal traffic in
+    a background thread, without touching Python per message.
+
+    Devices' publishers connect to the frontend (XSUB) and their subscribers
+    to the backend (XPUB). Subscriptions are forwarded upstream, so
+    publishers send only topics somebody subscribed. Copy of the traffic may
+    be published on the capture socket for observing it off the hot path.
+
+    Proxy sockets are created in the caller's thread (so binding errors are
+    raised there) and handed over to the proxy thread on start.
+    """
+    def __init__(self, ctx: zmq_asyncio.Context, *, name: str, capture: bool = False):
+        self.name = name
+        self.stats = ProxyStats()
+        self._ctx = zmq.Context.shadow(ctx.underlying)
+        self.frontend = self._ctx.socket(zmq.XSUB)
+        self.backend = self._ctx.socket(zmq.XPUB)
+
+        self.capture_addr = f'inproc://{name}-capture' if capture else None
+        self._capture = None
+        if self.capture_addr is not None:
+            self._capture = self._ctx.socket(zmq.PUB)
+            self._capture.bind(self.capture_addr)
+
+        control_addr = f'inproc://{name}-control'
+        self._control = self._ctx.socket(zmq.PAIR)
+        self._control.bind(control_addr)
+        self._proxy_control = self._ctx.socket(zmq.PAIR)
+        self._proxy_control.connect(control_addr)
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    @property
+    def sockets(self) -> list[zmq.Socket]:
+        return [
+            socket
+            for socket in (
+                self.frontend,
+                self.backend,
+                self._capture,
+                self._control,
+                self._proxy_control
+            )
+            if socket is not None
+        ]
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            zmq.proxy_steerable(self.frontend, self.backend, self._capture, self._proxy_control)
+        except zmq.ContextTerminated:
+            pass
+
+    def pause(self):
+        self._control.send(b'PAUSE')
+
+    def resume(self):
+        self._control.send(b'RESUME')
+
+    def close(self):
+        if self._thread.is_alive():
+            self._control.send(b'TERMINATE')
+            self._thread.join()
+        for socket in self.sockets:
+            socket.close(linger=0)
+
+    async def observe(self, capture: zmq_asyncio.Socket):
+        """
+        Counts traffic published on the capture socket.
+
+        Params:
+            - capture: SUB socket connected to `capture_addr`
+
+        """
+        while True:
+            frames = await capture.recv_multipart(copy=False)
+            # Internal messages are multipart, (un)subscriptions forwarded
+            # upstream are single frame starting with 0 or 1 byte
+            if len(frames) == 1 and frames[0].bytes[:1] in (b'\x00', b'\x01'):
+                self.stats.subscriptions += 1
+                continue
+            self.stats.messages += 1
+            self.stats.bytes += sum(len(frame.buffer) for frame in frames)
@@ -0,0 +1,97 @@
+import heapq
+import itertools
+import time
+import typing as t
+from dataclasses import dataclass
+
+from deimic_pi.types import DeimicComponentType
+
+
+class DeimicRequest(t.NamedTuple):
+    address: int
+    number: int
+    value: int
+    component_type: DeimicComponentType = DeimicComponentType.OUTPUT
+
+    @property
+    def key(self) -> tuple[DeimicComponentType, int, int]:
+        return self.component_type, self.address, self.number
+
+    def encode(self, field_delimiter: str = '-') -> str:
+        return field_delimiter.join((
+            DeimicComponentType(self.component_type).value,
+            str(self.address),
+            str(self.number),
+            str(self.value)
+        ))
+
+
+@dataclass
+class DeimicQueueStats:
+    enqueued: int = 0
+    deduplicated: int = 0
+    delivered: int = 0
+    depth: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+
+    @property
+    def wait_time_mean(self) -> float:
+        return self.wait_time_total / self.delivered if self.delivered else 0.0
+
+
+class DeimicRequestQueue:
+    """
+    Outbound requests queue of single Deimic identity.
+
+    Requests are drained in order of priority (higher first) and then
+    arrival. Pending write to the same component is replaced by the newer
+    one (keeping the higher priority and the original enqueue time), so the
+    Deimic gets only the latest value.
+    """
+    def __init__(self):
+        self.stats = DeimicQueueStats()
+        # Heap entries: [-priority, sequence, enqueue time, request or None]
+        self._heap: list[list] = []
+        self._pending: dict[tuple, list] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, request: DeimicRequest, priority: int = 0):
+        self.stats.enqueued += 1
+        entry = self._pending.get(request.key)
+        if entry is not None:
+            self.stats.deduplicated += 1
+            if -entry[0] >= priority:
+                entry[3] = request
+                return
+            # Higher priority - invalidate old entry and push new one
+            entry[3] = None
+            priority_entry = [-priority, next(self._sequence), entry[2], request]
+        else:
+            priority_entry = [-priority, next(self._sequence), time.monotonic(), request]
+        self._pending[request.key] = priority_entry
+        heapq.heappush(self._heap, priority_entry)
+        self.stats.depth = len(self._pending)
+
+    def drain(self, limit: int) -> list[DeimicRequest]:
+        """
+        Takes up to `limit` pending requests out of the queue.
+        """
+        requests = []
+        now = time.monotonic()
+        while self._heap and len(requests) < limit:
+            _, _, enqueued_at, request = heapq.heappop(self._heap)
+            if request is None:
+                continue
+            del self._pending[request.key]
+            requests.append(request)
+
+            wait_time = now - enqueued_at
+            self.stats.wait_time_total += wait_time
+            self.stats.wait_time_max = max(self.stats.wait_time_max, wait_time)
+        self.stats.delivered += len(requests)
+        self.stats.depth = len(self._pending)
+        return requests
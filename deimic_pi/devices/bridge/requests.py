@@ -0,0 +1,372 @@
+import asyncio
+import typing as t
+from dataclasses import dataclass
+
+import deimic_pi.messages as base
+from deimic_pi import topics
+from deimic_pi.codecs import TimedStateUpdateCodec
+from deimic_pi.devices.bridge.cache import ComponentKey
+from deimic_pi.devices.bridge.presence import PeerKind
+from deimic_pi.devices.bridge.queues import DeimicRequest
+from deimic_pi.log import get_logger
+from deimic_pi.messages import MessagePartType, ReplyStatus
+from deimic_pi.types import DeimicComponentType
+
+if t.TYPE_CHECKING:
+    from deimic_pi.devices.bridge import Bridge
+
+_log = get_logger(__name__)
+
+
+class RequestError(Exception):
+    """
+    Error of external request reported back to the client.
+    """
+
+
+class RequestContext:
+    """
+    External request received on the Bridge's ROUTER socket.
+
+    Request frames: `[identity, b'', request_id, command, args]`, where
+    `args` is optional JSON object. Reply frames: `[identity, b'',
+    request_id, status, *payload]`. Commands streaming their results send
+    any number of `ReplyStatus.PART` replies before the final one - each of
+    them restarts request's timeout.
+    """
+    __slots__ = (
+        'device', 'message', 'identity', 'request_id', 'command', 'args', 'timeout', 'scope'
+    )
+
+    def __init__(self, device: 'Bridge', message: base.MessageView):
+        if len(message) < 4 or message[1]:
+            raise RequestError("Invalid request format")
+        self.device = device
+        self.message = message
+        self.identity: bytes = message[0]
+        self.request_id: bytes = message[2]
+        self.command: str = message.string(3)
+        self.args: dict[str, t.Any] = message.json(4) if len(message) > 4 else {}
+        if not isinstance(self.args, dict):
+            raise RequestError("Request arguments must be JSON object")
+        self.timeout: float = self.args.pop('timeout', device.settings.bridge.requests_timeout)
+        # Timeout of the running command
+        self.scope: asyncio.Timeout | None = None
+
+    async def reply(self, status: ReplyStatus, parts: base.MessageParts = ()):
+        if status == ReplyStatus.PART and self.scope is not None:
+            self.scope.reschedule(asyncio.get_running_loop().time() + self.timeout)
+        await base.send_parts(
+            socket=self.device.extern_listener,
+            parts=[
+                self.identity,
+                b'',
+                self.request_id,
+                (MessagePartType.STRING, status),
+                *parts
+            ]
+        )
+
+
+RequestCommand = t.Callable[[RequestContext], t.Awaitable[base.MessageParts | None]]
+
+_commands: dict[str, RequestCommand] = dict()
+
+
+def _request_command(name: str):
+    def register(command: RequestCommand) -> RequestCommand:
+        _commands.update({name: command})
+        return command
+    return register
+
+
+def get_command(name: str) -> RequestCommand | None:
+    return _commands.get(name)
+
+
+@dataclass
+class RequestEngineStats:
+    received: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    in_flight: int = 0
+
+
+class RequestEngine:
+    """
+    Executes external requests concurrently.
+
+    Every request runs in its own task, so clients may pipeline many
+    requests and replies are correlated by request id. Number of requests
+    executed at once (toward the Deimic and internal devices) is limited by
+    `concurrency`, each request is limited by its own timeout (streaming
+    requests by timeout between their replies).
+    """
+    def __init__(self, device: 'Bridge', *, concurrency: int):
+        self.device = device
+        self.stats = RequestEngineStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # In-flight requests by client identity
+        self._tasks: dict[bytes, set[asyncio.Task]] = {}
+
+    def submit(self, message: base.MessageView):
+        self.stats.received += 1
+        identity = message[0]
+        task = asyncio.create_task(self._execute(message))
+        self._tasks.setdefault(identity, set()).add(task)
+        task.add_done_callback(lambda done: self._forget(identity, done))
+
+    def _forget(self, identity: bytes, task: asyncio.Task):
+        tasks = self._tasks.get(identity)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._tasks[identity]
+
+    def cancel(self, identity: bytes):
+        """
+        Cancels in-flight requests of given client (e.g. one which left),
+        as their replies have nowhere to go.
+        """
+        for task in self._tasks.get(identity, ()):
+            task.cancel()
+
+    async def _execute(self, message: base.MessageView):
+        try:
+            context = RequestContext(self.device, message)
+        except (RequestError, ValueError) as error:
+            self.stats.failed += 1
+            _log.warning("Dropped invalid external request: %s", error)
+            return
+
+        self.stats.in_flight += 1
+        try:
+            command = get_command(context.command)
+            if command is None:
+                raise RequestError(f"Unknown command: {context.command}")
+            async with self._semaphore:
+                async with asyncio.timeout(context.timeout) as context.scope:
+                    parts = await command(context)
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            await context.reply(ReplyStatus.ERROR, [(MessagePartType.STRING, "Request timed out")])
+        except RequestError as error:
+            self.stats.failed += 1
+            await context.reply(ReplyStatus.ERROR, [(MessagePartType.STRING, str(error))])
+        except Exception as error:
+            self.stats.failed += 1
+            _log.exception("External request %s failed", context.command)
+            await context.reply(ReplyStatus.ERROR, [(MessagePartType.STRING, repr(error))])
+        else:
+            self.stats.completed += 1
+            await context.reply(ReplyStatus.OK, parts or [])
+        finally:
+            self.stats.in_flight -= 1
+
+
+def _resolve(context: RequestContext, component: str) -> ComponentKey:
+    try:
+        return context.device.component_map.resolve(component)
+    except KeyError:
+        raise RequestError(f"Unknown component: {component}")
+
+
+@_request_command('SNAPSHOT')
+async def snapshot(context: RequestContext) -> base.MessageParts:
+    cache = context.device.state_cache
+    if 'names' in context.args:
+        states = cache.snapshot_of(
+            _resolve(context, name) for name in context.args['names']
+        )
+    elif 'tag' in context.args:
+        states = cache.snapshot_of(
+            component.key
+            for component in context.device.component_map.tagged(context.args['tag'])
+        )
+    else:
+        states = cache.snapshot(
+            topics.parse_component_filter(context.args.get('components', ''))
+        )
+    return [(MessagePartType.STATES, states)]
+
+
+@_request_command('COMPONENTS')
+async def components(context: RequestContext) -> base.MessageParts:
+    component_map = context.device.component_map
+    return [(MessagePartType.JSON, [
+        {
+            'name': component.name,
+            'type': component_type.value,
+            'address': address,
+            'number': number,
+            'tags': component.tags,
+            'topic': topics.state_topic(component_type, address, number).hex(),
+        }
+        for component in (
+            component_map.tagged(context.args['tag'])
+            if 'tag' in context.args
+            else component_map.components
+        )
+        for component_type, address, number in [component.key]
+    ])]
+
+
+@_request_command('DEIMIC_WRITE')
+async def deimic_write(context: RequestContext) -> base.MessageParts:
+    try:
+        if 'component' in context.args:
+            component_type, address, number = _resolve(context, context.args['component'])
+        else:
+            component_type = DeimicComponentType.OUTPUT
+            address, number = int(context.args['address']), int(context.args['number'])
+        request = DeimicRequest(
+            address=address,
+            number=number,
+            value=int(context.args['value']),
+            component_type=component_type
+        )
+    except (KeyError, TypeError, ValueError):
+        raise RequestError(
+            "DEIMIC_WRITE requires component (name) or integer address and"
+            " number, and integer value"
+        )
+    context.device.enqueue_deimic_request(
+        request,
+        priority=int(context.args.get('priority', 0))
+    )
+    return [(MessagePartType.JSON, {'queued': len(context.device.deimic_identities)})]
+
+
+@_request_command('INTERNAL')
+async def internal(context: RequestContext) -> base.MessageParts:
+    try:
+        signature = int(context.args['signature'])
+        parts = [str(part) for part in context.args['request']]
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("INTERNAL requires integer signature and request parts list")
+    await context.device.publish_internal(
+        signature,
+        [(MessagePartType.STRING, part) for part in parts]
+    )
+
+
+@_request_command('GATHER')
+async def gather(context: RequestContext) -> base.MessageParts:
+    try:
+        signature = int(context.args['signature'])
+        parts = [str(part) for part in context.args['request']]
+        quorum = context.args.get('quorum')
+        quorum = int(quorum) if quorum is not None else None
+        deadline = float(context.args.get('deadline', context.timeout / 2))
+    except (KeyError, TypeError, ValueError):
+        raise RequestError(
+            "GATHER requires integer signature, request parts list and"
+            " optionally integer quorum and deadline in seconds"
+        )
+    if deadline >= context.timeout:
+        raise RequestError("GATHER deadline must be shorter than request timeout")
+    replies, complete = await context.device.gather_internal(
+        signature,
+        [(MessagePartType.STRING, part) for part in parts],
+        deadline=deadline,
+        quorum=quorum
+    )
+    return [(MessagePartType.JSON, {'replies': replies, 'complete': complete})]
+
+
+@_request_command('STATS')
+async def stats(context: RequestContext) -> base.MessageParts:
+    device = context.device
+    return [(MessagePartType.JSON, {
+        'requests': vars(device.request_engine.stats),
+        'deimic_queues': {
+            identity.hex(): {**vars(queue_stats), 'wait_time_mean': queue_stats.wait_time_mean}
+            for identity, queue_stats in device.deimic_queue_stats().items()
+        },
+        'conflation': vars(device.conflator.stats) if device.conflator else None,
+        'journal': vars(device.journal.stats) if device.journal else None,
+        'presence': vars(device.presence.stats),
+        'internal_proxy': vars(device.internal_proxy.stats) if device.internal_proxy else None,
+    })]
+
+
+def _timestamp(value: float | None) -> int | None:
+    return int(float(value) * 1e9) if value is not None else None
+
+
+@_request_command('REPLAY')
+async def replay(context: RequestContext) -> base.MessageParts:
+    journal = context.device.journal
+    if journal is None:
+        raise RequestError("Journal is disabled")
+    try:
+        since = _timestamp(context.args.get('since'))
+        until = _timestamp(context.args.get('until'))
+        speed = float(context.args.get('speed', 0.0))
+    except (TypeError, ValueError):
+        raise RequestError(
+            "REPLAY requires since and until as seconds since the epoch and"
+            " speed as number"
+        )
+    if speed < 0:
+        raise RequestError("REPLAY speed must not be negative")
+    records = 0
+    # Paced replay pausing longer than the timeout reports it's still alive
+    # with empty parts
+    async for chunk in journal.replay(since, until, speed=speed, idle=context.timeout / 2):
+        records += len(chunk) // TimedStateUpdateCodec.SIZE
+        await context.reply(ReplyStatus.PART, [(MessagePartType.RAW, chunk)])
+    return [(MessagePartType.JSON, {'records': records})]
+
+
+@_request_command('HISTORY')
+async def history(context: RequestContext) -> base.MessageParts:
+    store = context.device.history
+    if store is None:
+        raise RequestError("History is disabled")
+    try:
+        key = _resolve(context, context.args['component'])
+        since = float(context.args['since'])
+        until = context.args.get('until')
+        until = float(until) if until is not None else None
+        points = int(context.args.get('points', 300))
+    except (KeyError, TypeError, ValueError):
+        raise RequestError(
+            "HISTORY requires component (name or `<type>-<address>-<number>`),"
+            " since and optionally until as seconds since the epoch and"
+            " integer points"
+        )
+    if points < 2:
+        raise RequestError("HISTORY requires at least 2 points")
+    try:
+        resolution, buckets = store.query(key, since, until, points=points)
+    except KeyError:
+        resolution, buckets = None, []
+    return [(MessagePartType.JSON, {
+        'resolution': resolution,
+        'fields': ['time', 'min', 'max', 'last', 'count'],
+        'buckets': buckets,
+    })]
+
+
+@_request_command('HEARTBEAT')
+async def heartbeat(context: RequestContext) -> base.MessageParts:
+    settings = context.device.settings
+    try:
+        interval = float(context.args.get('interval', settings.heartbeat_interval))
+    except (TypeError, ValueError):
+        raise RequestError("HEARTBEAT interval must be number of seconds")
+    await context.device.presence.seen(
+        PeerKind.CLIENT,
+        context.identity.hex(),
+        interval * settings.heartbeat_liveness
+    )
+
+
+@_request_command('PEERS')
+async def peers(context: RequestContext) -> base.MessageParts:
+    return [(MessagePartType.JSON, [
+        {'kind': kind.value, 'id': peer_id, **info}
+        for (kind, peer_id), info in context.device.presence.peers.items()
+    ])]
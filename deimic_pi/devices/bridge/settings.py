@@ -12,6 +12,55 @@ class BridgeSettings(BaseModel):
         "deimic_pi",
         "map.json"
     )
+    # Seconds between map file change checks, None disables reloading
+    deimic_map_reload_interval: float | None = 2.0
+
+    # Terminator of Deimic messages in TCP stream, empty treats every
+    # received frame as one message (Deimics not terminating messages)
+    deimic_delimiter: str = ''
+    deimic_field_delimiter: str = '-'
+    deimic_max_buffer: int = 4096
+    # Maximal number of requests sent in reply to single READY poll
+    deimic_requests_batch: int = 16
+
+    # External requests executed at once and default request timeout (s)
+    requests_concurrency: int = 32
+    requests_timeout: float = 5.0
+
+    # Conflation window in milliseconds, None disables conflation
+    conflation_window: float | None = None
+    # Components (names or `<type>-<address>-<number>`) with every edge
+    # delivered
+    conflation_exempt: list[str] = []
+
+    # Directory of state updates journal, None disables journaling
+    journal_dir: Path | None = None
+    # Records (18 bytes each) preallocated in single journal segment file
+    journal_segment_records: int = 65536
+    # Journal retention - total size in bytes and age of records in
+    # seconds, None disables the limit
+    journal_max_bytes: int | None = 64 * 2**20
+    journal_max_age: float | None = None
+    # Batches of updates waiting for the journal writer thread
+    journal_queue_size: int = 1024
+
+    # Seconds of Deimic silence (it polls READY periodically) after which
+    # it's considered disconnected
+    deimic_liveness: float = 10.0
+    # Resolution (s) and size of the peers liveness timer wheel
+    presence_tick: float = 0.1
+    presence_slots: int = 512
+
+    # Forward internal traffic by libzmq XSUB/XPUB proxy thread, so devices
+    # may publish to each other directly, and copy the traffic to capture
+    # socket counted by the Bridge
+    internal_proxy: bool = False
+    internal_proxy_capture: bool = False
+
+    # Downsampled states history as (bucket seconds, buckets kept) per
+    # resolution - 10 minutes by second, a day by minute and a week by 15
+    # minutes by default; empty list disables history
+    history_resolutions: list[tuple[float, int]] = [(1.0, 600), (60.0, 1440), (900.0, 672)]
 
 
 class Settings(base.Settings):
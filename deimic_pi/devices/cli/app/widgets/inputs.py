@@ -29,7 +29,9 @@ class TextInput(Widget):
             if value is not None
             else ""
         )
-        log(f"{self} - Title changed to: {value}")
+        # Parts are passed to the log apart, so they are formatted only if
+        # the app writes the log
+        log(self, "- Title changed to:", value)
 
     @title.setter
     def title(self, value: str):
@@ -51,7 +53,7 @@ class TextInput(Widget):
             if value is not None
             else ""
         )
-        log(f"{self} - Content changed to: {value}")
+        log(self, "- Content changed to:", value)
 
     @content.setter
     def content(self, value: str | None):
@@ -75,7 +77,7 @@ class TextInput(Widget):
         if value > len(self.content):
             raise ValueError("Cursor position cannot exceed the text length.")
         self._cursor = value
-        log(f"{self} - Cursor moved to: {value}")
+        log(self, "- Cursor moved to:", value)
 
     @cursor.setter
     def cursor(self, value: int):
@@ -116,7 +118,7 @@ class TextInput(Widget):
             if value is not None
             else ""
         )
-        log(f"{self} - Hint changed to: {value}")
+        log(self, "- Hint changed to:", value)
 
     @hint.setter
     def hint(self, value: str | None):
@@ -213,7 +215,7 @@ class TextInput(Widget):
             if self.title_style
             else self.title
         )
-        log(f"{self} - New display_title rendered: {self._display_content}")
+        log(self, "- New display_title rendered:", self._display_title)
 
     def render_content(self):
         if self._focused or self.content:
@@ -245,7 +247,7 @@ class TextInput(Widget):
                     f"[/{self.hint_style}]",
                 ]
             self._display_content = "".join(content)
-        log(f"{self} - New display_content rendered: {self._display_content}")
+        log(self, "- New display_content rendered:", self._display_content)
 
     def render(self) -> RenderableType:
         return Panel(
@@ -1,8 +1,15 @@
+import asyncio
+
 import zmq
+import zmq.asyncio as zmq_asyncio
 
+from deimic_pi import topics
+from deimic_pi.client import BridgeClient
+from deimic_pi.codecs import StateUpdate
 from deimic_pi.devices.cli.handlers import CLIPoller
 from deimic_pi.devices.cli.settings import Settings
 from deimic_pi.devices import Device, DeviceType
+from deimic_pi.messages import MessageType
 
 
 class CLITool(Device):
@@ -11,21 +18,41 @@ class CLITool(Device):
 
     def __init__(
         self,
-        settings: Settings
+        settings: Settings,
+        *,
+        ctx: zmq_asyncio.Context = None
     ):
-        super().__init__(settings)
+        super().__init__(settings, ctx=ctx)
 
+        self.component_states: dict[topics.ComponentFilter, int] = {}
         self.monitor_socket = self.create_socket(zmq.SUB)
-        # TODO: Implement monitor filters
+        for components in self.settings.cli_tool.monitor_filters or [""]:
+            self.monitor(topics.parse_component_filter(components))
         self.monitor_socket.connect(
-            self.settings.bridge_addr_form.format(
-                port=self.settings.extern_bcst_port
-            )
+            self.settings.bridge_addr(self.settings.extern_bcst_port)
         )
 
-        self.request_socket = self.create_socket(zmq.REQ)
+        self.request_socket = self.create_socket(zmq.DEALER)
         self.request_socket.connect(
-            self.settings.bridge_addr_form.format(
-                port=self.settings.extern_req_port
-            )
+            self.settings.bridge_addr(self.settings.extern_req_port)
+        )
+        self.client = BridgeClient(self.request_socket)
+
+    async def execute(self):
+        await asyncio.gather(
+            super().execute(),
+            self.client.keepalive(self.settings.heartbeat_interval)
         )
+
+    def monitor(self, components: topics.ComponentFilter):
+        """
+        Subscribes state updates and snapshot of given components slice.
+        """
+        for message_type in (MessageType.STATE_UPDATE, MessageType.SNAPSHOT):
+            self.monitor_socket.subscribe(
+                topics.state_topic(*components, message_type=message_type)
+            )
+
+    def update_states(self, updates: list[StateUpdate]):
+        for component_type, address, number, state in updates:
+            self.component_states[component_type, address, number] = state
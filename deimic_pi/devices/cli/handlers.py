@@ -1,7 +1,7 @@
 import enum
 import typing as t
 
-from deimic_pi import types
+from deimic_pi import topics, types
 from deimic_pi.devices.cli import messages
 import deimic_pi.messages as base
 from deimic_pi.messages import MessagePartType, PayloadPart
@@ -12,14 +12,19 @@ if t.TYPE_CHECKING:
 
 class MonitorHandler(base.MessageHandler):
     @classmethod
-    async def handle(
+    async def handle_message(
         cls,
         *,
         device: 'CLITool',
-        handling: base.Handling,
+        message: base.MessageView,
         **kwargs
     ):
-        pass
+        message_type, _ = topics.parse_topic(message[0])
+        match message_type:
+            case base.MessageType.STATE_UPDATE:
+                device.update_states([message.state(1)])
+            case base.MessageType.SNAPSHOT:
+                device.update_states(message.states(1))
 
 
 class CLIPoller(base.Poller):
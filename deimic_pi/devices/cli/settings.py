@@ -3,7 +3,8 @@ from deimic_pi import settings as base
 
 
 class CLIToolSettings(BaseModel):
-    pass
+    # Monitored components (`<type>[-<address>[-<number>]]`), all if empty
+    monitor_filters: list[str] = []
 
 
 class Settings(base.Settings):
@@ -1,10 +1,13 @@
 import abc
+import asyncio
 import enum
+import struct
 import typing as t
+import uuid
 
 import zmq.asyncio as zmq_asyncio
 
-from deimic_pi.messages import Poller
+from deimic_pi.messages import MessagePartType, MessageType, Poller, send_parts
 from deimic_pi.settings import Settings
 
 if t.TYPE_CHECKING:
@@ -36,11 +39,30 @@ class DeviceType(enum.IntFlag):
             Signatures set
 
         """
-        return {
-            prefix
-            for prefix in range(DeviceType.UNKNOWN, DeviceType.ALL)
-            if prefix & self
-        }
+        return _FAMILIAR_SIGNATURES[self]
+
+    @property
+    def topic(self) -> bytes:
+        """
+        Fixed-width binary topic of internal messages targeted at the device
+        type. Being fixed-width, it doesn't prefix-match any other topic.
+        """
+        return _SIGNATURE.pack(self)
+
+    @classmethod
+    def route(cls, signature: int) -> tuple[bytes, ...]:
+        """
+        Returns topics, which message targeted at devices of given signature
+        has to be published on - one per device type in the signature.
+
+        Params:
+            - signature: Targeted devices signature
+
+        Returns:
+            Topics tuple
+
+        """
+        return _ROUTES[signature]
 
     @classmethod
     def keys(cls):
@@ -65,6 +87,31 @@ class DeviceType(enum.IntFlag):
         return sum(devices)
 
 
+_SIGNATURE = struct.Struct('!B')
+
+_DEVICE_TYPES = tuple(
+    device_type
+    for device_type in DeviceType.values()
+    if device_type.bit_count() == 1
+)
+_FAMILIAR_SIGNATURES: dict[int, frozenset[int]] = {
+    device_type: frozenset(
+        signature
+        for signature in range(DeviceType.UNKNOWN, DeviceType.ALL + 1)
+        if signature & device_type
+    )
+    for device_type in range(DeviceType.UNKNOWN, DeviceType.ALL + 1)
+}
+_ROUTES: dict[int, tuple[bytes, ...]] = {
+    signature: tuple(
+        device_type.topic
+        for device_type in _DEVICE_TYPES
+        if device_type & signature
+    )
+    for signature in range(DeviceType.UNKNOWN, DeviceType.ALL + 1)
+}
+
+
 _T_Settings = t.Union[
     'BridgeSettings',
     'LedDriverSettings'
@@ -78,32 +125,78 @@ class Device(abc.ABC):
 
     Each inheriting class must define its own `DEVICE_TYPE` and `POLLER_CLS`
     attributes
+
+    Devices running in one process may share single context given via `ctx`
+    parameter. Device doesn't terminate context it doesn't own.
     """
     DEVICE_TYPE: DeviceType
     POLLER_CLS: t.Type[Poller]
 
-    _sockets: list[zmq_asyncio.Socket] = []
-
-    def __init__(self, settings: _T_Settings):
+    def __init__(
+        self,
+        settings: _T_Settings,
+        *,
+        ctx: zmq_asyncio.Context = None
+    ):
         self.settings = settings
-
-        self._ctx = zmq_asyncio.Context()
+        self.identity: str = (
+            settings.device_id
+            or f'{self.DEVICE_TYPE.name.lower()}-{uuid.uuid4().hex[:8]}'
+        )
+
+        self._sockets: list[zmq_asyncio.Socket] = []
+        self._own_ctx = ctx is None
+        self._ctx = (
+            ctx
+            if ctx is not None
+            else zmq_asyncio.Context(io_threads=settings.io_threads)
+        )
 
     def create_socket(self, socket_type: int, **kwargs) -> zmq_asyncio.Socket:
         socket = self._ctx.socket(socket_type, **kwargs)
         self._sockets.append(socket)
         return socket
 
-    def __del__(self):
+    def close(self):
         for socket in self._sockets:
             socket.close()
-        self._ctx.term()
+        self._sockets.clear()
+        if self._own_ctx and not self._ctx.closed:
+            self._ctx.term()
+
+    def __del__(self):
+        self.close()
 
     async def execute(self):
         poller = self.POLLER_CLS(device=self)
         while True:
             await poller.handle()
 
+    async def send_heartbeats(self, socket: zmq_asyncio.Socket):
+        """
+        Publishes the device's heartbeat to the Bridge every
+        `heartbeat_interval` seconds.
+
+        Heartbeat frames: `[BRIDGE topic, b'', HEARTBEAT, device_id,
+        device_type, interval]`.
+
+        Params:
+            - socket: Socket connected to the Bridge's internal listener
+
+        """
+        interval = self.settings.heartbeat_interval
+        parts = [
+            DeviceType.BRIDGE.topic,
+            b'',
+            (MessagePartType.STRING, MessageType.HEARTBEAT),
+            (MessagePartType.STRING, self.identity),
+            (MessagePartType.STRING, self.DEVICE_TYPE.name),
+            (MessagePartType.STRING, str(interval)),
+        ]
+        while True:
+            await send_parts(socket=socket, parts=parts)
+            await asyncio.sleep(interval)
+
 
 class DeimicCompatibleDevice(Device):
     connected_deimic: str | None = None
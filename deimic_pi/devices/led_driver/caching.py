@@ -0,0 +1,176 @@
+import json
+import threading
+import typing as t
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from deimic_pi.devices.led_driver.patterns import PatternBearer
+from deimic_pi.devices.led_driver.rendering import Frame, np
+from deimic_pi.log import get_logger
+
+_log = get_logger(__name__)
+
+SequenceKey = tuple[type, str, int]
+
+
+@dataclass
+class FrameCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    # Sequences too big for the budget, rendered live
+    oversized: int = 0
+    sequences: int = 0
+    size: int = 0
+
+
+class FrameSequence:
+    """
+    Frames of one period of a periodic pattern, stored contiguously -
+    `(frames, n, 3)` uint8 array (one bytearray without NumPy).
+    """
+    __slots__ = ('frames', 'length', 'interval', 'data')
+
+    def __init__(self, frames: int, length: int, interval: int):
+        self.frames = frames
+        self.length = length
+        self.interval = interval
+        self.data = (
+            np.empty((frames, length, 3), dtype=np.uint8)
+            if np is not None
+            else bytearray(frames * length * 3)
+        )
+
+    @staticmethod
+    def size_of(frames: int, length: int) -> int:
+        return frames * length * 3
+
+    @property
+    def size(self) -> int:
+        return self.size_of(self.frames, self.length)
+
+    def index_at(self, time_elapsed: float) -> int:
+        return round(time_elapsed * 1000 / self.interval) % self.frames
+
+    def store(self, index: int, frame: Frame):
+        if np is not None:
+            self.data[index] = frame
+        else:
+            size = self.length * 3
+            self.data[index * size:(index + 1) * size] = frame.buffer
+
+    def freeze(self):
+        if np is not None:
+            self.data.flags.writeable = False
+
+    def load(self, index: int, frame: Frame) -> Frame:
+        """
+        Returns frame of given index - read-only view of the sequence with
+        NumPy, given frame filled with its copy otherwise.
+        """
+        if np is not None:
+            return self.data[index]
+        size = self.length * 3
+        frame.buffer[:] = self.data[index * size:(index + 1) * size]
+        return frame
+
+
+class CachedPattern(PatternBearer):
+    """
+    Plays back precomputed frame sequence of a periodic pattern.
+    """
+    def __init__(self, pattern: PatternBearer, sequence: FrameSequence):
+        self.pattern = pattern
+        self.sequence = sequence
+        self.length = pattern.length
+        self.frame = pattern.frame
+
+    def step(self, time_elapsed: float) -> int:
+        self.frame = self.sequence.load(self.sequence.index_at(time_elapsed), self.frame)
+        return self.sequence.interval
+
+    def close(self):
+        self.pattern.close()
+
+
+class FrameCache:
+    """
+    LRU cache of periodic patterns' frame sequences within byte budget.
+
+    Sequences are keyed by pattern class, its keyword arguments and strip
+    length. Pattern is cacheable if it declares `period` (seconds) and
+    `CACHEABLE` (its frames depend only on its arguments and elapsed time)
+    and steps at fixed interval. Sequence which doesn't fit in the budget
+    is not cached and pattern is rendered live.
+    """
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.stats = FrameCacheStats()
+        self._sequences: OrderedDict[SequenceKey, FrameSequence] = OrderedDict()
+        # Patterns are built in worker threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(pattern: PatternBearer, pattern_kwargs: dict[str, t.Any]) -> SequenceKey:
+        return (
+            type(pattern),
+            json.dumps(pattern_kwargs, sort_keys=True, default=str),
+            pattern.length
+        )
+
+    def wrap(self, pattern: PatternBearer, pattern_kwargs: dict[str, t.Any]) -> PatternBearer:
+        """
+        Returns cached playback of given pattern if it's cacheable and its
+        sequence fits in the budget, the pattern itself otherwise. Renders
+        and caches missing sequence, so it should be called off the event
+        loop.
+
+        Params:
+            - pattern: Pattern, not stepped yet
+            - pattern_kwargs: Keyword arguments the pattern was built with
+
+        Returns:
+            Pattern to execute
+
+        """
+        if not pattern.CACHEABLE or not pattern.period or self.budget <= 0:
+            return pattern
+        with self._lock:
+            return self._wrap(pattern, self.key(pattern, pattern_kwargs))
+
+    def _wrap(self, pattern: PatternBearer, key: SequenceKey) -> PatternBearer:
+        sequence = self._sequences.get(key)
+        if sequence is not None:
+            self.stats.hits += 1
+            self._sequences.move_to_end(key)
+            return CachedPattern(pattern, sequence)
+
+        self.stats.misses += 1
+        interval = pattern.step(0.0)
+        if not interval:
+            return pattern
+        frames = max(round(pattern.period * 1000 / interval), 1)
+        size = FrameSequence.size_of(frames, pattern.length)
+        if size > self.budget:
+            self.stats.oversized += 1
+            _log.info(
+                "%s sequence of %d bytes exceeds frame cache budget, rendering live",
+                type(pattern).__name__,
+                size
+            )
+            return pattern
+
+        while self.stats.size + size > self.budget:
+            _, evicted = self._sequences.popitem(last=False)
+            self.stats.size -= evicted.size
+            self.stats.evictions += 1
+        sequence = FrameSequence(frames, pattern.length, interval)
+        sequence.store(0, pattern.frame)
+        for index in range(1, frames):
+            pattern.step(index * interval / 1000)
+            sequence.store(index, pattern.frame)
+        sequence.freeze()
+        self._sequences[key] = sequence
+        self.stats.size += size
+        self.stats.sequences = len(self._sequences)
+        return CachedPattern(pattern, sequence)
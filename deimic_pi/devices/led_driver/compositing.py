@@ -0,0 +1,406 @@
+"""
+Layered composition of LED patterns.
+
+`Compositor` is a pattern stacking other patterns in layers. Layers are
+blended bottom-up (by ascending index) into float accumulator over their
+LED ranges - whole range at once with NumPy ufuncs writing into preallocated
+buffers (plain loops over the bytes without NumPy) - and the result is
+rounded into compositor's frame. Layer replacing its pattern may crossfade
+from the outgoing one.
+"""
+import enum
+import math
+import threading
+import typing as t
+from collections import deque
+
+from deimic_pi.devices.led_driver.caching import CachedPattern
+from deimic_pi.devices.led_driver.patterns import PatternBearer
+from deimic_pi.devices.led_driver.rendering import Frame, PixelFrame, np
+from deimic_pi.devices.led_driver.settings import Settings
+from deimic_pi.log import get_logger
+
+_log = get_logger(__name__)
+
+# Tolerance of due times, so frames scheduled in whole milliseconds aren't
+# missed by rounding
+_DUE_TOLERANCE = 0.0005
+
+
+class BlendMode(str, enum.Enum):
+    OVER = 'over'
+    ADD = 'add'
+    MULTIPLY = 'multiply'
+    MAX = 'max'
+
+
+# Blends layer channel value `s` into accumulated value `d` at opacity `o`
+# (pure-Python fallback)
+_python_blends: dict[BlendMode, t.Callable[[float, float, float], float]] = {
+    BlendMode.OVER: lambda d, s, o: d + (s - d) * o,
+    BlendMode.ADD: lambda d, s, o: min(d + s * o, 255.0),
+    BlendMode.MULTIPLY: lambda d, s, o: d * (1.0 - o + o * s / 255.0),
+    BlendMode.MAX: lambda d, s, o: d + (max(d, s) - d) * o,
+}
+
+
+def _channels(frame: Frame) -> t.Sequence[int]:
+    return frame.buffer if isinstance(frame, PixelFrame) else frame
+
+
+class _Playback:
+    """
+    Pattern played in a layer, stepped on its own schedule.
+    """
+    __slots__ = ('pattern', 'started', 'due')
+
+    def __init__(self, pattern: PatternBearer, started: float):
+        self.pattern = pattern
+        self.started = started
+        # Elapsed time of the next step, None once finished
+        self.due: float | None = started
+
+    def advance(self, time_elapsed: float):
+        if self.due is None or time_elapsed < self.due - _DUE_TOLERANCE:
+            return
+        try:
+            to_next_step = self.pattern.step(time_elapsed - self.started)
+        except Exception:
+            _log.exception("Pattern %s failed", type(self.pattern).__name__)
+            to_next_step = 0
+        self.due = time_elapsed + to_next_step / 1000 if to_next_step else None
+
+
+class Layer:
+    """
+    Layer of the composite - pattern blended with `mode` at `opacity` into
+    layers below over LEDs from `start` to `stop`.
+
+    While crossfading, layer shows mix of outgoing and incoming pattern
+    (black if either is missing). Replacing pattern during crossfade drops
+    the outgoing one and fades from the incoming one.
+    """
+    def __init__(self, length: int):
+        self.length = length
+        self.opacity = 1.0
+        self.mode = BlendMode.OVER
+        self.start = 0
+        self.stop: int | None = None
+        self.playback: _Playback | None = None
+        self.outgoing: _Playback | None = None
+        self.fade_started = 0.0
+        self.fade = 0.0
+        self._mix = self._incoming = None
+
+    @property
+    def mask(self) -> slice:
+        return slice(*slice(self.start, self.stop).indices(self.length)[:2])
+
+    @property
+    def fading(self) -> bool:
+        return self.outgoing is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.playback is None and self.outgoing is None
+
+    @property
+    def due(self) -> float:
+        return min(
+            (
+                playback.due
+                for playback in (self.playback, self.outgoing)
+                if playback is not None and playback.due is not None
+            ),
+            default=math.inf
+        )
+
+    def set_pattern(self, pattern: PatternBearer | None, time_elapsed: float, fade: float):
+        """
+        Replaces layer's pattern (None clears the layer).
+
+        Params:
+            - pattern: Pattern, not stepped yet
+            - time_elapsed: Compositor's elapsed time
+            - fade: Seconds of crossfade from the current pattern, 0
+                replaces it at once
+
+        """
+        if self.outgoing is not None:
+            self.outgoing.pattern.close()
+            self.outgoing = None
+        if fade > 0 and self.playback is not None:
+            self.outgoing = self.playback
+            self.fade_started = time_elapsed
+            self.fade = fade
+        elif self.playback is not None:
+            self.playback.pattern.close()
+        self.playback = _Playback(pattern, time_elapsed) if pattern is not None else None
+
+    def configure(
+        self,
+        *,
+        opacity: float = None,
+        mode: str = None,
+        start: int = None,
+        stop: int = None
+    ):
+        """
+        Raises:
+            - ValueError: Invalid option value
+        """
+        if opacity is not None:
+            opacity = float(opacity)
+            if not 0.0 <= opacity <= 1.0:
+                raise ValueError(f"Opacity out of [0, 1]: {opacity}")
+            self.opacity = opacity
+        if mode is not None:
+            self.mode = BlendMode(mode)
+        if start is not None:
+            self.start = int(start)
+        if stop is not None:
+            self.stop = int(stop)
+
+    def render(self, time_elapsed: float) -> t.Any:
+        """
+        Steps layer's patterns which are due.
+
+        Returns:
+            Layer's frame to blend - pattern's frame or float mix of
+            crossfaded patterns - or None if layer is empty
+        """
+        progress = 1.0
+        if self.outgoing is not None:
+            progress = (time_elapsed - self.fade_started) / self.fade
+            if progress >= 1.0:
+                self.outgoing.pattern.close()
+                self.outgoing = None
+        for playback in (self.playback, self.outgoing):
+            if playback is not None:
+                playback.advance(time_elapsed)
+
+        if self.outgoing is None:
+            return self.playback.pattern.frame if self.playback is not None else None
+        return self._crossfade(
+            self.outgoing.pattern.frame,
+            self.playback.pattern.frame if self.playback is not None else None,
+            progress
+        )
+
+    def _crossfade(self, outgoing: Frame, incoming: Frame | None, progress: float) -> t.Any:
+        if np is None:
+            return [
+                value * (1.0 - progress)
+                for value in _channels(outgoing)
+            ] if incoming is None else [
+                value + (other - value) * progress
+                for value, other in zip(_channels(outgoing), _channels(incoming))
+            ]
+
+        if self._mix is None:
+            self._mix = np.empty((self.length, 3), dtype=np.float32)
+            self._incoming = np.empty((self.length, 3), dtype=np.float32)
+        np.multiply(outgoing, 1.0 - progress, out=self._mix)
+        if incoming is not None:
+            np.multiply(incoming, progress, out=self._incoming)
+            self._mix += self._incoming
+        return self._mix
+
+    def describe(self) -> dict[str, t.Any]:
+        pattern = self.playback.pattern if self.playback is not None else None
+        cached = isinstance(pattern, CachedPattern)
+        if cached:
+            pattern = pattern.pattern
+        mask = self.mask
+        return {
+            'pattern': type(pattern).__name__ if pattern is not None else None,
+            'cached': cached,
+            'opacity': self.opacity,
+            'mode': self.mode.value,
+            'start': mask.start,
+            'stop': mask.stop,
+            'fading': self.fading,
+        }
+
+    def close(self):
+        for playback in (self.playback, self.outgoing):
+            if playback is not None:
+                playback.pattern.close()
+        self.playback = self.outgoing = None
+
+
+class Compositor(PatternBearer):
+    """
+    Pattern compositing layers of other patterns.
+
+    Layers are changed by commands queued from other threads (appending to
+    and popping from `deque` are atomic) and applied on the render thread
+    at the start of the next frame, so the caller should refresh the
+    executor after queueing them. Compositor steps when any layer's pattern
+    is due and every `interval` while crossfading. Layers are described
+    under the same lock the render thread steps them under, so description
+    never sees layer changed halfway.
+    """
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self.interval = round(1000 / settings.led_driver.compositor_fps)
+        self.layers: dict[int, Layer] = dict()
+        self._order: list[Layer] = list()
+        self._commands: deque[t.Callable[[float], None]] = deque()
+        self._lock = threading.Lock()
+        if np is not None:
+            self._accumulator = np.zeros((self.length, 3), dtype=np.float32)
+            self._source = np.empty((self.length, 3), dtype=np.float32)
+        else:
+            self._accumulator = [0.0] * (self.length * 3)
+
+    def submit(self, command: t.Callable[[float], None]):
+        """
+        Queues command called with compositor's elapsed time on the render
+        thread.
+        """
+        self._commands.append(command)
+
+    def set_pattern(
+        self,
+        index: int,
+        pattern: PatternBearer | None,
+        *,
+        fade: float = 0.0,
+        **options
+    ):
+        """
+        Queues replacing pattern of given layer (created if missing) and
+        changing its options (see `Layer.configure`).
+
+        Raises:
+            - ValueError: Invalid option value
+        """
+        Layer(self.length).configure(**options)     # Validated up front
+        self.submit(lambda time_elapsed: self._set_pattern(index, pattern, fade, options, time_elapsed))
+
+    def configure(self, index: int, **options):
+        """
+        Queues changing options of given layer (see `Layer.configure`).
+
+        Raises:
+            - ValueError: Invalid option value
+        """
+        Layer(self.length).configure(**options)
+        self.submit(lambda time_elapsed: self._configure(index, options))
+
+    def _layer(self, index: int) -> Layer:
+        layer = self.layers.get(index)
+        if layer is None:
+            layer = self.layers[index] = Layer(self.length)
+            self._order = [self.layers[key] for key in sorted(self.layers)]
+        return layer
+
+    def _set_pattern(
+        self,
+        index: int,
+        pattern: PatternBearer | None,
+        fade: float,
+        options: dict[str, t.Any],
+        time_elapsed: float
+    ):
+        if pattern is None and index not in self.layers:
+            return
+        layer = self._layer(index)
+        layer.configure(**options)
+        layer.set_pattern(pattern, time_elapsed, fade)
+
+    def _configure(self, index: int, options: dict[str, t.Any]):
+        self._layer(index).configure(**options)
+
+    def describe(self) -> list[dict[str, t.Any]]:
+        with self._lock:
+            return [
+                {'index': index, **layer.describe()}
+                for index, layer in sorted(self.layers.items())
+            ]
+
+    def step(self, time_elapsed: float) -> int:
+        with self._lock:
+            due, fading = self._step(time_elapsed)
+        to_next_step = 0 if due == math.inf else max(round((due - time_elapsed) * 1000), 1)
+        if fading:
+            return min(to_next_step or self.interval, self.interval)
+        return to_next_step
+
+    def _step(self, time_elapsed: float) -> tuple[float, bool]:
+        while self._commands:
+            self._commands.popleft()(time_elapsed)
+
+        due = math.inf
+        fading = False
+        self._reset()
+        for layer in self._order:
+            source = layer.render(time_elapsed)
+            if source is not None and layer.opacity > 0:
+                self._blend(layer, source)
+            due = min(due, layer.due)
+            fading = fading or layer.fading
+        self._finish()
+
+        if any(layer.finished for layer in self._order):
+            for index, layer in list(self.layers.items()):
+                if layer.finished:
+                    del self.layers[index]
+            self._order = [self.layers[key] for key in sorted(self.layers)]
+        return due, fading
+
+    def _reset(self):
+        if np is not None:
+            self._accumulator.fill(0.0)
+        else:
+            self._accumulator[:] = [0.0] * len(self._accumulator)
+
+    def _blend(self, layer: Layer, source: t.Any):
+        mask = layer.mask
+        opacity = layer.opacity
+        if np is None:
+            blend = _python_blends[layer.mode]
+            start, stop = mask.start * 3, mask.stop * 3
+            channels = _channels(source)
+            self._accumulator[start:stop] = [
+                blend(value, channel, opacity)
+                for value, channel in zip(self._accumulator[start:stop], channels[start:stop])
+            ]
+            return
+
+        accumulated = self._accumulator[mask]
+        blended = self._source[:len(accumulated)]
+        np.copyto(blended, source[mask])
+        match layer.mode:
+            case BlendMode.OVER:
+                blended -= accumulated
+                blended *= opacity
+                accumulated += blended
+            case BlendMode.ADD:
+                blended *= opacity
+                accumulated += blended
+                np.minimum(accumulated, 255.0, out=accumulated)
+            case BlendMode.MULTIPLY:
+                blended *= opacity / 255.0
+                blended += 1.0 - opacity
+                accumulated *= blended
+            case BlendMode.MAX:
+                np.maximum(blended, accumulated, out=blended)
+                blended -= accumulated
+                blended *= opacity
+                accumulated += blended
+
+    def _finish(self):
+        if np is None:
+            self.frame.buffer[:] = bytes(int(value + 0.5) for value in self._accumulator)
+            return
+        self._accumulator += 0.5
+        np.copyto(self.frame, self._accumulator, casting='unsafe')
+
+    def close(self):
+        with self._lock:
+            for layer in self._order:
+                layer.close()
+            self.layers.clear()
+            self._order = list()
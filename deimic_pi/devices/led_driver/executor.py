@@ -0,0 +1,132 @@
+from collections import deque
+from threading import Event, Lock, Thread
+
+from deimic_pi.devices.led_driver.patterns import PatternBearer
+from deimic_pi.devices.led_driver.rendering import RenderEngine
+from deimic_pi.devices.led_driver.scheduling import FrameScheduler, RenderStats
+from deimic_pi.log import get_logger
+
+_log = get_logger(__name__)
+
+
+class PatternExecutor:
+    """
+    Runs LED patterns on a single long-lived render thread.
+
+    New pattern is handed over through one-slot mailbox (appending to and
+    popping from `deque` are atomic) and wakes the thread, which switches to
+    it at the next frame boundary - callers never wait for the current
+    pattern. Every pattern gets its own frame schedule starting from zero
+    and is closed when replaced, also one replaced in the mailbox before it
+    was displayed. Cleared `run_controller` pauses rendering.
+    """
+    def __init__(self, engine: RenderEngine, stats: RenderStats = None):
+        self.engine = engine
+        self.stats = stats if stats is not None else RenderStats()
+        self.pattern: PatternBearer | None = None
+        self.run_controller = Event()
+        self.swaps = 0
+        self._mailbox: deque[PatternBearer | None] = deque(maxlen=1)
+        # Serializes swapping callers, so none of them drops the other's
+        # pattern unclosed
+        self._swap_lock = Lock()
+        self._wake = Event()
+        self._refresh = False
+        self._closed = False
+        self._thread: Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.run_controller.is_set()
+
+    def swap(self, pattern: PatternBearer | None):
+        """
+        Schedules given pattern (None stops rendering) to replace the
+        current one. Returns immediately, only the latest of patterns swapped
+        in before the next frame boundary is displayed.
+        """
+        with self._swap_lock:
+            try:
+                # Render thread may take it meanwhile
+                replaced = self._mailbox.popleft()
+            except IndexError:
+                replaced = None
+            self._mailbox.append(pattern)
+        if replaced is not None:
+            replaced.close()
+        self._wake.set()
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='deimic_pi-leds', daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        """
+        Makes the current pattern render a frame right away (e.g. after its
+        state was changed), even if it has finished. While paused, the frame
+        is rendered once resumed.
+        """
+        self._refresh = True
+        self._wake.set()
+
+    def resume(self):
+        self.run_controller.set()
+        if self._refresh:
+            self._wake.set()
+
+    def pause(self):
+        self.run_controller.clear()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        scheduler: FrameScheduler | None = None
+        to_next_step = 0
+        while not self._closed:
+            # Cleared before checking the mailbox, so no swap is missed
+            self._wake.clear()
+            if self._mailbox:
+                incoming = self._mailbox.pop()
+                self._retire()
+                self.pattern = incoming
+                self.swaps += 1
+                self._refresh = False
+                if incoming is None:
+                    continue
+                scheduler = FrameScheduler(self.stats)
+                scheduler.start()
+                to_next_step = self._render(0.0)
+                continue
+
+            if self._refresh and self.pattern is not None and self.running:
+                self._refresh = False
+                to_next_step = self._render(scheduler.frame_now())
+                continue
+            if self.pattern is None or not to_next_step:
+                self._wake.wait()   # Idle or pattern finished
+                continue
+            time_elapsed = scheduler.wait(to_next_step / 1000, self._wake, self.run_controller)
+            if time_elapsed is not None:
+                to_next_step = self._render(time_elapsed)
+        self._retire()
+        with self._swap_lock:
+            pending = self._mailbox.pop() if self._mailbox else None
+        if pending is not None:
+            pending.close()
+
+    def _render(self, time_elapsed: float) -> int:
+        try:
+            to_next_step = self.pattern.step(time_elapsed)
+            self.engine.show(self.pattern.frame)
+        except Exception:
+            _log.exception("Pattern %s failed", type(self.pattern).__name__)
+            return 0
+        return to_next_step
+
+    def _retire(self):
+        if self.pattern is not None:
+            self.pattern.close()
+            self.pattern = None
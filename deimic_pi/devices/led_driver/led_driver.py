@@ -1,36 +1,104 @@
-from threading import Thread, Event
+import asyncio
+import typing as t
 
 import zmq
+import zmq.asyncio as zmq_asyncio
 from zmq import Frame
 
+from deimic_pi.devices.led_driver.caching import FrameCache
+from deimic_pi.devices.led_driver.compositing import Compositor
+from deimic_pi.devices.led_driver.executor import PatternExecutor
 from deimic_pi.devices.led_driver.messages import LedDriverPoller
+from deimic_pi.devices.led_driver.patterns import PatternBearer
+from deimic_pi.devices.led_driver.rendering import BACKEND, RenderEngine
+from deimic_pi.devices.led_driver.scheduling import RenderStats
 from deimic_pi.devices.led_driver.settings import Settings
 from deimic_pi.devices import Device, DeviceType
+from deimic_pi.messages import MessagePartType, send_parts
 
 
 class LedDriver(Device):
     DEVICE_TYPE = DeviceType.LED_DRIVER
     POLLER_CLS = LedDriverPoller
 
-    def __init__(self, settings: Settings):
-        super().__init__(settings)
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        ctx: zmq_asyncio.Context = None
+    ):
+        super().__init__(settings, ctx=ctx)
 
         self.requests_socket = self.create_socket(zmq.SUB)
         self.requests_socket.connect(
-            self.settings.bridge_addr_form.format(
-                port=self.settings.inter_broadcaster_port
-            )
+            self.settings.bridge_addr(self.settings.inter_broadcaster_port)
         )
-        for signature in self.DEVICE_TYPE.get_familiar_signatures():
-            self.requests_socket.subscribe(str(signature))
+        self.requests_socket.subscribe(self.DEVICE_TYPE.topic)
 
         self.broadcaster = self.create_socket(zmq.PUB)
         self.broadcaster.connect(
-            self.settings.bridge_addr_form.format(
-                port=self.settings.inter_listener_port
-            )
+            self.settings.bridge_addr(self.settings.inter_listener_port)
         )
 
-        self.led_executor: Thread | None = None
-        self.executor_stop_controller: Event = Event()
-        self.executor_run_controller: Event = Event()
+        self.render_engine = RenderEngine(self.settings)
+        self.render_stats = RenderStats()
+        self.executor = PatternExecutor(self.render_engine, self.render_stats)
+        self.frame_cache = FrameCache(self.settings.led_driver.frame_cache_bytes)
+        # Patterns are displayed as compositor's layers, the executor runs
+        # only the compositor
+        self.compositor = Compositor(self.settings)
+        self.executor.swap(self.compositor)
+
+    def close(self):
+        if getattr(self, 'executor', None) is not None:
+            self.executor.close()
+        super().close()
+
+    async def execute(self):
+        await asyncio.gather(
+            super().execute(),
+            self.send_heartbeats(self.broadcaster)
+        )
+
+    def build_pattern(
+        self,
+        pattern_cls: t.Type[PatternBearer],
+        pattern_kwargs: dict[str, t.Any]
+    ) -> PatternBearer:
+        """
+        Builds pattern, replacing it with cached playback of its frames if
+        possible. May take long (precomputing frames), so it should be
+        called off the event loop.
+        """
+        return self.frame_cache.wrap(
+            pattern_cls(self.settings, **pattern_kwargs),
+            pattern_kwargs
+        )
+
+    def status(self) -> dict[str, t.Any]:
+        return {
+            'layers': self.compositor.describe(),
+            'running': self.executor.running,
+            'strip_length': self.settings.led_driver.strip_length,
+            'rendering': BACKEND,
+            'frames': self.render_engine.frames,
+            'render': vars(self.render_stats),
+            'frame_cache': vars(self.frame_cache.stats),
+        }
+
+    async def reply(self, request_id: bytes, result: t.Any):
+        """
+        Replies to the Bridge's internal request. Requests with empty id
+        don't expect reply.
+        """
+        if not request_id:
+            return
+        await send_parts(
+            socket=self.broadcaster,
+            parts=[
+                DeviceType.BRIDGE.topic,
+                request_id,
+                (MessagePartType.STRING, self.identity),
+                (MessagePartType.JSON, result)
+            ]
+        )
@@ -1,9 +1,9 @@
+import asyncio
 import enum
 import typing as t
-from threading import Thread
 
-from deimic_pi.devices.led_driver import LedDriver
 from deimic_pi.devices.led_driver.patterns import PatternBearer, get_pattern
+from deimic_pi.log import get_logger
 from deimic_pi.messages import (
     MessageHandler,
     Poller,
@@ -11,11 +11,19 @@ from deimic_pi.messages import (
     Handling
 )
 
+if t.TYPE_CHECKING:
+    from deimic_pi.devices.led_driver import LedDriver
+
+_log = get_logger(__name__)
+
 
 class RequestTypes(enum.IntEnum):
     OFF = enum.auto()
     ON = enum.auto()
     PATTERN = enum.auto()
+    STATUS = enum.auto()
+    LAYER = enum.auto()
+    LAYER_CLEAR = enum.auto()
 
 
 class RequestHandler(MessageHandler):
@@ -23,43 +31,107 @@ class RequestHandler(MessageHandler):
     async def handle(
         cls,
         *,
-        device: LedDriver,
+        device: 'LedDriver',
         handling: Handling,
         **kwargs
     ):
-        _ = await anext(handling)   # Request targets signature
-        request_type = await handling.asend(MessagePartType.STRING)
+        _ = await anext(handling)   # Targeted device type topic
+        request_id = await handling.asend(MessagePartType.RAW)
+        request_name = await handling.asend(MessagePartType.STRING)
+        try:
+            request_type = RequestTypes[request_name]
+        except KeyError:
+            _log.warning("Received request of unknown type: %s", request_name)
+            await device.reply(request_id, {'error': f"Unknown request type: {request_name}"})
+            return
+
         match request_type:
             case RequestTypes.OFF:
-                device.executor_run_controller.clear()
+                device.executor.pause()
             case RequestTypes.ON:
-                device.executor_run_controller.set()
+                device.executor.resume()
             case RequestTypes.PATTERN:
-                # TODO: Replace with selecting pattern by name
+                # Replaces pattern of the base layer
+                pattern = await cls._build_pattern(device, request_id, handling)
+                if pattern is None:
+                    return
+                device.compositor.set_pattern(0, pattern, fade=device.settings.led_driver.crossfade)
+                device.executor.refresh()
+            case RequestTypes.LAYER:
+                # Layer index, pattern (empty name keeps the current one),
+                # its arguments and layer options: opacity, mode, start,
+                # stop and fade (seconds of crossfade)
+                index = await handling.asend(MessagePartType.STRING)
                 pattern_name = await handling.asend(MessagePartType.STRING)
-                pattern_cls = get_pattern(pattern_name)
-
-                pattern_kwargs = await handling.asend(MessagePartType.JSON)
-
-                if device.led_executor is not None:
-                    device.executor_stop_controller.set()
-                    device.led_executor.join()
-                with pattern_cls(
-                    device.settings,
-                    **pattern_kwargs
-                ) as pattern:
-                    device.led_executor = Thread(
-                        daemon=True,
-                        target=pattern.execute,
-                        args=(
-                            device.executor_stop_controller,
-                            device.executor_run_controller
-                        )
-                    )
+                pattern = None
+                if pattern_name:
+                    pattern = await cls._build_pattern(device, request_id, handling, pattern_name)
+                    if pattern is None:
+                        return
+                else:
+                    _ = await handling.asend(MessagePartType.JSON)
+                options = await handling.asend(MessagePartType.JSON)
+                try:
+                    index = int(index)
+                    options = dict(options)
+                    fade = float(options.pop('fade', device.settings.led_driver.crossfade))
+                    if pattern is not None:
+                        device.compositor.set_pattern(index, pattern, fade=fade, **options)
+                    else:
+                        device.compositor.configure(index, **options)
+                except (TypeError, ValueError) as error:
+                    if pattern is not None:
+                        pattern.close()
+                    await device.reply(request_id, {'error': f"Invalid layer options: {error}"})
+                    return
+                device.executor.refresh()
+            case RequestTypes.LAYER_CLEAR:
+                index = await handling.asend(MessagePartType.STRING)
+                try:
+                    index = int(index)
+                except ValueError:
+                    await device.reply(request_id, {'error': f"Invalid layer index: {index}"})
+                    return
+                device.compositor.set_pattern(index, None, fade=device.settings.led_driver.crossfade)
+                device.executor.refresh()
+            case RequestTypes.STATUS:
+                await device.reply(request_id, device.status())
+                return
+        await device.reply(request_id, {'ok': True})
 
     @staticmethod
-    def _pattern_handle(self, payload) -> PatternBearer:
-        pass
+    async def _build_pattern(
+        device: 'LedDriver',
+        request_id: bytes,
+        handling: Handling,
+        pattern_name: str = None
+    ) -> PatternBearer | None:
+        """
+        Receives pattern name (unless given) and arguments and builds the
+        pattern. Replies with error if they are invalid.
+
+        Returns:
+            Built pattern or None if the request failed
+        """
+        if pattern_name is None:
+            pattern_name = await handling.asend(MessagePartType.STRING)
+        pattern_cls = get_pattern(pattern_name)
+        if pattern_cls is None:
+            await device.reply(request_id, {'error': f"Unknown pattern: {pattern_name}"})
+            return None
+
+        pattern_kwargs = await handling.asend(MessagePartType.JSON)
+        # Pattern may precompute in its constructor, so it's built off the
+        # event loop; the render thread takes it in at the next frame
+        try:
+            return await asyncio.to_thread(
+                device.build_pattern,
+                pattern_cls,
+                pattern_kwargs
+            )
+        except (TypeError, ValueError) as error:
+            await device.reply(request_id, {'error': f"Invalid pattern arguments: {error}"})
+            return None
 
     # async def _execute_leds(
     #         self,
@@ -109,7 +181,7 @@ class RequestHandler(MessageHandler):
 
 
 class LedDriverPoller(Poller):
-    def __init__(self, *, device: LedDriver):
+    def __init__(self, *, device: 'LedDriver'):
         super().__init__(device)
         self.register(device.requests_socket, RequestHandler)
 
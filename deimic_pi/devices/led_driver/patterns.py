@@ -1,12 +1,7 @@
 import abc
-import colorsys
-import time
 import typing as t
-from threading import Event
-
-import board
-from neopixel import NeoPixel
 
+from deimic_pi.devices.led_driver.rendering import hsv_to_rgb, new_frame, np
 from deimic_pi.devices.led_driver.settings import Settings
 
 
@@ -23,15 +18,25 @@ def get_pattern(name: str):
 
 
 class PatternBearer(abc.ABC):
+    """
+    LED pattern drawing whole frames into its `frame` buffer - `(n, 3)`
+    uint8 NumPy array of RGB colors (see `rendering`). Pattern doesn't
+    touch the strip, finished frames are displayed by `RenderEngine` on
+    `PatternExecutor`'s render thread.
+    """
+    # Frames depend only on pattern's arguments and elapsed time and repeat
+    # every `period` seconds, so they may be precomputed once and played
+    # back (see `FrameCache`)
+    CACHEABLE: bool = False
+    period: float | None = None
+
     def __init__(
         self,
         settings: Settings,
         **pattern_kwargs
     ):
-        self.led_strip = NeoPixel(
-            pin=settings.led_driver.data_pin,
-            n=settings.led_driver.strip_length
-        )
+        self.length = settings.led_driver.strip_length
+        self.frame = new_frame(self.length)
 
     def __del__(self):
         pass
@@ -39,7 +44,7 @@ class PatternBearer(abc.ABC):
     @abc.abstractmethod
     def step(self, time_elapsed: float) -> int:
         """
-        _summary_
+        Renders next frame into `frame` buffer.
 
         Params:
             - time_elapsed: Time elapsed since led pattern loop execution
@@ -51,16 +56,11 @@ class PatternBearer(abc.ABC):
         """
         ...
 
-    def execute(self, stop_controller: Event, run_controller: Event):
-        execute_time = time.time()
-        time_elapsed = 0
-        to_next_step = self.step(time_elapsed)
-        while not stop_controller.is_set() and to_next_step:
-            time.sleep(to_next_step/1000)
-            run_controller.wait()
-            time_elapsed = time.time() - execute_time
-            to_next_step = self.step(time_elapsed)
-        # TODO: Do not finish after last step
+    def close(self):
+        """
+        Called once the pattern is replaced and won't be stepped anymore.
+        """
+        pass
 
 
 @_pattern_class
@@ -69,14 +69,56 @@ class ConstColorPattern(PatternBearer):
         self,
         settings: Settings,
         *,
-        color: tuple[int, int, int]
+        color: tuple[float, float, float]
     ):
+        """
+        Params:
+            - color: HSV color, components in [0, 1]
+        """
         super().__init__(settings)
+        self.frame[:] = hsv_to_rgb(tuple(color))
+
+    def step(self, time_elapsed: float) -> int:
+        return 0
+
 
-        r, g, b = colorsys.hsv_to_rgb(*color)
-        color = int(r), int(g), int(b)
+@_pattern_class
+class RainbowPattern(PatternBearer):
+    CACHEABLE = True
 
-        self.led_strip.fill(color)
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        period: float = 5.0,
+        brightness: float = 1.0,
+        fps: float = 30.0
+    ):
+        """
+        Params:
+            - period: Seconds of one full cycle of hues along the strip
+            - brightness: HSV value of colors, in [0, 1]
+            - fps: Frames per second
+        """
+        super().__init__(settings)
+        self.period = period
+        self.interval = round(1000 / fps)
+        if np is not None:
+            self._hsv = np.empty((self.length, 3), dtype=np.float32)
+            self._hsv[:, 1] = 1.0
+            self._hsv[:, 2] = brightness
+            self._offsets = np.arange(self.length, dtype=np.float32) / max(self.length, 1)
+        else:
+            self._hsv = [[0.0, 1.0, brightness] for _ in range(self.length)]
+            self._offsets = [index / max(self.length, 1) for index in range(self.length)]
 
     def step(self, time_elapsed: float) -> int:
-        pass
+        shift = time_elapsed / self.period
+        if np is not None:
+            np.add(self._offsets, shift, out=self._hsv[:, 0])
+            np.mod(self._hsv[:, 0], 1.0, out=self._hsv[:, 0])
+        else:
+            for color, offset in zip(self._hsv, self._offsets):
+                color[0] = (offset + shift) % 1.0
+        self.frame[:] = hsv_to_rgb(self._hsv)
+        return self.interval
@@ -0,0 +1,204 @@
+"""
+Frame buffer rendering of LED patterns.
+
+Patterns draw whole frames into `(strip_length, 3)` RGB buffers - uint8
+NumPy arrays if NumPy is available, `PixelFrame` otherwise - and the
+`RenderEngine` writes finished frame to the strip in one bulk copy followed
+by single `show()`.
+"""
+import colorsys
+import typing as t
+
+from deimic_pi.log import get_logger
+
+try:
+    import numpy as np
+except ImportError:     # pragma: no cover - depends on the board
+    np = None
+
+try:
+    import board
+    from neopixel import NeoPixel
+except (ImportError, NotImplementedError, RuntimeError):
+    # Not on a board with NeoPixel support, frames are rendered anyway
+    board = NeoPixel = None
+
+if t.TYPE_CHECKING:
+    from deimic_pi.devices.led_driver.settings import Settings
+
+_log = get_logger(__name__)
+
+Color = tuple[int, int, int]
+
+BACKEND = 'numpy' if np is not None else 'python'
+
+
+class PixelFrame:
+    """
+    Pure-Python RGB frame buffer used when NumPy is unavailable.
+
+    Supports the subset of `(n, 3)` uint8 array interface patterns need:
+    indexing pixels, assigning single color or sequence of colors to pixel
+    or slice (e.g. `frame[:] = color`) and `tobytes()`.
+    """
+    __slots__ = ('buffer',)
+
+    def __init__(self, length: int):
+        self.buffer = bytearray(length * 3)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self), 3
+
+    def __len__(self) -> int:
+        return len(self.buffer) // 3
+
+    def __getitem__(self, index: int) -> Color:
+        offset = range(len(self))[index] * 3
+        return tuple(self.buffer[offset:offset + 3])
+
+    def __setitem__(self, index: int | slice, value: Color | t.Sequence[Color]):
+        if isinstance(index, slice):
+            start, stop, stride = index.indices(len(self))
+            count = len(range(start, stop, stride))
+            if value and isinstance(value[0], int):
+                data = bytes(value) * count
+            else:
+                data = b''.join(bytes(color) for color in value)
+            if stride == 1:
+                self.buffer[start * 3:stop * 3] = data
+            else:
+                for channel in range(3):
+                    self.buffer[start * 3 + channel:stop * 3:stride * 3] = data[channel::3]
+        else:
+            offset = range(len(self))[index] * 3
+            self.buffer[offset:offset + 3] = bytes(value)
+
+    def copy(self) -> 'PixelFrame':
+        frame = PixelFrame(0)
+        frame.buffer = bytearray(self.buffer)
+        return frame
+
+    def tobytes(self) -> bytes:
+        return bytes(self.buffer)
+
+
+Frame = t.Union['np.ndarray', PixelFrame]
+
+
+def new_frame(length: int) -> Frame:
+    """
+    Returns black frame buffer for strip of given length.
+    """
+    if np is not None:
+        return np.zeros((length, 3), dtype=np.uint8)
+    return PixelFrame(length)
+
+
+def hsv_to_rgb(hsv: t.Any) -> t.Any:
+    """
+    Converts HSV colors (components in [0, 1]) to 8-bit RGB.
+
+    Params:
+        - hsv: Single color tuple or `(n, 3)` array of colors
+
+    Returns:
+        Color tuple or `(n, 3)` uint8 array of colors respectively (list of
+        color tuples without NumPy)
+
+    """
+    if len(hsv) == 3 and not hasattr(hsv[0], '__len__'):
+        return tuple(round(channel * 255) for channel in colorsys.hsv_to_rgb(*hsv))
+    if np is None:
+        return [hsv_to_rgb(tuple(color)) for color in hsv]
+
+    hsv = np.asarray(hsv, dtype=np.float32)
+    h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+    sector = np.floor(h * 6.0)
+    f = h * 6.0 - sector
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    u = v * (1.0 - s * (1.0 - f))
+    sector = sector.astype(np.int8) % 6
+    # Channels of every hue sector, selected per pixel
+    choices = np.stack([
+        np.stack([v, u, p], axis=-1),
+        np.stack([q, v, p], axis=-1),
+        np.stack([p, v, u], axis=-1),
+        np.stack([p, q, v], axis=-1),
+        np.stack([u, p, v], axis=-1),
+        np.stack([v, p, q], axis=-1),
+    ])
+    rgb = choices[sector, np.arange(len(hsv))]
+    return np.rint(rgb * 255).astype(np.uint8)
+
+
+class RenderEngine:
+    """
+    Writes rendered frames to the LED strip.
+
+    Frame is reordered to the strip's pixel order at once and copied
+    straight into the strip's pixel buffer when it exposes one (single
+    slice assignment otherwise), then the strip is shown once per frame.
+    Without NeoPixel support frames are only counted.
+    """
+    def __init__(self, settings: 'Settings'):
+        self.length = settings.led_driver.strip_length
+        self.pixel_order = settings.led_driver.pixel_order.upper()
+        self._order = tuple('RGB'.index(channel) for channel in self.pixel_order)
+        self.frames = 0
+        self.strip = None
+        if NeoPixel is not None:
+            self.strip = NeoPixel(
+                getattr(board, f'D{settings.led_driver.data_pin}'),
+                self.length,
+                auto_write=False,
+                pixel_order=self.pixel_order
+            )
+        else:
+            _log.warning("NeoPixel is unavailable, LED frames won't be displayed")
+
+    def new_frame(self) -> Frame:
+        return new_frame(self.length)
+
+    def _strip_buffer(self) -> bytearray | None:
+        buffer = getattr(self.strip, 'buf', None)
+        if (
+            isinstance(buffer, bytearray)
+            and len(buffer) == self.length * 3
+            and getattr(self.strip, 'brightness', 1.0) == 1.0
+        ):
+            return buffer
+        return None
+
+    def _ordered(self, frame: Frame) -> bytes:
+        if np is not None and isinstance(frame, np.ndarray):
+            if self._order == (0, 1, 2):
+                return frame.tobytes()
+            return frame[:, self._order].tobytes()
+        data = frame.tobytes()
+        if self._order == (0, 1, 2):
+            return data
+        ordered = bytearray(len(data))
+        for position, channel in enumerate(self._order):
+            ordered[position::3] = data[channel::3]
+        return bytes(ordered)
+
+    def show(self, frame: Frame):
+        """
+        Displays given frame on the strip.
+        """
+        self.frames += 1
+        if self.strip is None:
+            return
+        buffer = self._strip_buffer()
+        if buffer is not None:
+            buffer[:] = self._ordered(frame)
+        elif np is not None and isinstance(frame, np.ndarray):
+            self.strip[:] = [tuple(pixel) for pixel in frame.tolist()]
+        else:
+            self.strip[:] = [frame[index] for index in range(len(frame))]
+        self.strip.show()
+
+    def clear(self):
+        self.show(self.new_frame())
@@ -0,0 +1,114 @@
+import time
+import typing as t
+from dataclasses import dataclass
+from threading import Event
+
+
+@dataclass
+class RenderStats:
+    frames: int = 0
+    # Frames dropped to catch up with the schedule
+    missed: int = 0
+    # Achieved frames per second and frame start lateness (ms), smoothed
+    fps: float = 0.0
+    jitter: float = 0.0
+    max_jitter: float = 0.0
+
+
+class FrameScheduler:
+    """
+    Fixed-rate frame scheduler of a pattern loop.
+
+    Frames are due at absolute deadlines on the monotonic clock, so time
+    spent rendering doesn't delay following frames. If rendering falls
+    behind by whole frames, they are skipped (and counted as missed) instead
+    of accumulating lag. Time spent paused is excluded from pattern's
+    elapsed time.
+    """
+    PAUSE_POLL = 0.1
+
+    def __init__(
+        self,
+        stats: RenderStats = None,
+        *,
+        smoothing: float = 0.1,
+        clock: t.Callable[[], float] = time.monotonic
+    ):
+        self.stats = stats if stats is not None else RenderStats()
+        self.smoothing = smoothing
+        self.clock = clock
+        self._origin = self._deadline = self._last_frame = None
+
+    def start(self):
+        self._origin = self._deadline = self._last_frame = self.clock()
+        self.stats.frames += 1
+
+    def frame_now(self) -> float:
+        """
+        Starts an unscheduled frame right away, following frames are due
+        relative to it.
+
+        Returns:
+            Elapsed time of the frame (seconds since start, excluding pauses)
+
+        """
+        now = self.clock()
+        self._deadline = now
+        self._frame_started(now)
+        return now - self._origin
+
+    def _frame_started(self, now: float):
+        stats = self.stats
+        stats.frames += 1
+        interval = now - self._last_frame
+        self._last_frame = now
+        if interval > 0:
+            stats.fps += self.smoothing * (1 / interval - stats.fps)
+        lateness = (now - self._deadline) * 1000
+        stats.jitter += self.smoothing * (lateness - stats.jitter)
+        stats.max_jitter = max(stats.max_jitter, lateness)
+
+    def wait(
+        self,
+        interval: float,
+        stop_controller: Event,
+        run_controller: Event
+    ) -> float | None:
+        """
+        Waits until the next frame is due.
+
+        Params:
+            - interval: Seconds between frames
+            - stop_controller: Event interrupting the wait when set
+            - run_controller: Event pausing the loop while cleared
+
+        Returns:
+            Elapsed time of the frame (seconds since start, excluding
+            pauses) or None if stopped
+
+        """
+        if not run_controller.is_set():
+            paused = self.clock()
+            while not run_controller.wait(self.PAUSE_POLL):
+                if stop_controller.is_set():
+                    return None
+            # Resumes the schedule where it was paused
+            pause = self.clock() - paused
+            self._origin += pause
+            self._deadline += pause
+            self._last_frame += pause
+
+        self._deadline += interval
+        now = self.clock()
+        if now > self._deadline + interval:
+            skipped = int((now - self._deadline) // interval)
+            self._deadline += skipped * interval
+            self.stats.missed += skipped
+        elif now < self._deadline:
+            if stop_controller.wait(self._deadline - now):
+                return None
+            now = self.clock()
+        if stop_controller.is_set():
+            return None
+        self._frame_started(now)
+        return self._deadline - self._origin
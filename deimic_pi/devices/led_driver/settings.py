@@ -5,6 +5,14 @@ from deimic_pi import settings as base
 class LedDriverSettings(BaseModel):
     strip_length: int = 0
     data_pin: int = 18
+    # Order of color channels expected by the strip
+    pixel_order: str = 'GRB'
+    # Bytes of precomputed frames of periodic patterns, 0 disables caching
+    frame_cache_bytes: int = 16 * 2**20
+    # Seconds of crossfade between patterns, 0 switches at once
+    crossfade: float = 0.5
+    # Frames per second of crossfades
+    compositor_fps: float = 60.0
 
 
 class Settings(base.Settings):
@@ -0,0 +1,5 @@
+from .host import Host
+from .settings import Settings
+
+
+__all__ = [Host, Settings]
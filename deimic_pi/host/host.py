@@ -0,0 +1,84 @@
+import asyncio
+import typing as t
+
+import zmq.asyncio as zmq_asyncio
+
+from deimic_pi.devices import Device
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.settings import Settings as BridgeModuleSettings
+from deimic_pi.devices.cli import CLITool
+from deimic_pi.devices.cli.settings import Settings as CLIModuleSettings
+from deimic_pi.host.settings import Settings
+
+
+class Host:
+    """
+    Runs the Bridge together with co-located devices (LedDrivers and headless
+    CLITool) in one asyncio loop.
+
+    All the devices share one context and co-located devices reach the Bridge
+    through inproc transport instead of TCP.
+    """
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.ctx = zmq_asyncio.Context(io_threads=settings.io_threads)
+
+        self.bridge = Bridge(
+            BridgeModuleSettings(
+                **self._common_settings(),
+                bridge=settings.bridge
+            ),
+            ctx=self.ctx
+        )
+        self.devices: list[Device] = [self.bridge]
+        self.devices.extend(self._create_led_drivers())
+        if settings.host.cli_tool is not None:
+            self.devices.append(self._create_cli_tool())
+
+    def _common_settings(self) -> dict[str, t.Any]:
+        return self.settings.dict(exclude={'bridge', 'host'})
+
+    def _colocated_settings(self) -> dict[str, t.Any]:
+        return {
+            **self._common_settings(),
+            'bridge_addr_form': self.settings.inproc_addr_form
+        }
+
+    def _create_led_drivers(self) -> list[Device]:
+        if not self.settings.host.led_drivers:
+            return []
+        # Imported only when needed, cause LedDriver requires board libraries
+        from deimic_pi.devices.led_driver import LedDriver
+        from deimic_pi.devices.led_driver.settings import Settings as LedDriverModuleSettings
+
+        return [
+            LedDriver(
+                LedDriverModuleSettings(
+                    **self._colocated_settings(),
+                    led_driver=led_driver_settings
+                ),
+                ctx=self.ctx
+            )
+            for led_driver_settings in self.settings.host.led_drivers
+        ]
+
+    def _create_cli_tool(self) -> Device:
+        return CLITool(
+            CLIModuleSettings(
+                **self._colocated_settings(),
+                cli_tool=self.settings.host.cli_tool
+            ),
+            ctx=self.ctx
+        )
+
+    async def execute(self):
+        await asyncio.gather(*(device.execute() for device in self.devices))
+
+    def close(self):
+        for device in self.devices:
+            device.close()
+        if not self.ctx.closed:
+            self.ctx.term()
+
+    def __del__(self):
+        self.close()
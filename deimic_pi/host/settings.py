@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from deimic_pi import settings as base
+from deimic_pi.devices.bridge.settings import BridgeSettings
+from deimic_pi.devices.cli.settings import CLIToolSettings
+from deimic_pi.devices.led_driver.settings import LedDriverSettings
+
+
+class HostSettings(BaseModel):
+    led_drivers: list[LedDriverSettings] = []
+    cli_tool: CLIToolSettings | None = None
+
+
+class Settings(base.Settings):
+    bridge: BridgeSettings = BridgeSettings()
+    host: HostSettings = HostSettings()
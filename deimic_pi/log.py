@@ -0,0 +1,162 @@
+"""
+Non-blocking logging of DeimicPi devices.
+
+Records are put on a queue unformatted and formatted and written by
+a background listener thread, so logging on the event loop costs only the
+level check when the level is off and enqueueing otherwise. Every message
+category (message template unless `category` extra is given) is rate limited
+and optionally sampled before being queued - number of suppressed records is
+reported with the next record of the category that gets through.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    from deimic_pi.settings import LogSettings
+
+
+ROOT = 'deimic_pi'
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns logger of given DeimicPi module (e.g. `__name__`).
+    """
+    return logging.getLogger(name if name.startswith(ROOT) else f'{ROOT}.{name}')
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket rate limit and every n-th record sampling per category.
+
+    Records of level WARNING and above are never sampled, only rate limited.
+    """
+    def __init__(self, *, rate: float | None, burst: int, sample: dict[str, int] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = sample or {}
+        # category -> [tokens, last refill time, seen, suppressed]
+        self._buckets: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def category(record: logging.LogRecord) -> str:
+        return getattr(record, 'category', None) or str(record.msg)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = self.category(record)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(category)
+            if bucket is None:
+                bucket = self._buckets[category] = [float(self.burst), now, 0, 0]
+            bucket[2] += 1
+            every = self.sample.get(category, 1)
+            if every > 1 and record.levelno < logging.WARNING and bucket[2] % every:
+                bucket[3] += 1
+                return False
+            if self.rate is not None:
+                bucket[0] = min(bucket[0] + (now - bucket[1]) * self.rate, self.burst)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    bucket[3] += 1
+                    return False
+                bucket[0] -= 1
+            record.suppressed, bucket[3] = bucket[3], 0
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler leaving formatting to the listener thread. Only exception
+    info is rendered in place, as traceback can't outlive its frames safely.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            line += f" [{record.suppressed} similar suppressed]"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as JSON lines.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'category', None):
+            entry['category'] = record.category
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(settings: 'LogSettings', *, handler: logging.Handler = None):
+    """
+    Routes DeimicPi loggers through rate limiting filter and queue to the
+    background listener writing to given handler (stderr by default).
+    Repeated calls replace previous setup.
+
+    Params:
+        - settings: Logging settings
+        - handler: Handler records are written to
+
+    """
+    stop_logging()
+    handler = handler or logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if settings.structured else TextFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(records)
+    queue_handler.addFilter(RateLimitFilter(
+        rate=settings.rate,
+        burst=settings.burst,
+        sample=settings.sample
+    ))
+
+    root = logging.getLogger(ROOT)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.level.upper())
+    root.propagate = False
+
+    global _listener
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+
+def stop_logging():
+    """
+    Writes queued records and stops the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
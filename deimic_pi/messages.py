@@ -1,18 +1,37 @@
 import abc
+import asyncio
 import enum
+import pickle
 import typing as t
+from dataclasses import dataclass
 
 import zmq
 import zmq.asyncio as zmq_asyncio
+from zmq.utils import jsonapi
+
+from deimic_pi.codecs import StateUpdate, StateUpdateCodec
+from deimic_pi.log import get_logger
 
 if t.TYPE_CHECKING:
     from deimic_pi.devices import Device
 
+_log = get_logger(__name__)
+
 
 class MessageType(str, enum.Enum):
     ERROR = 'ERROR'
     STATE_UPDATE = 'STATE_UPDATE'
+    SNAPSHOT = 'SNAPSHOT'
     REQUEST = 'REQUEST'
+    HEARTBEAT = 'HEARTBEAT'
+    PRESENCE = 'PRESENCE'
+
+
+class ReplyStatus(str, enum.Enum):
+    OK = 'OK'
+    ERROR = 'ERROR'
+    # Streamed part of reply, followed by more parts and final status
+    PART = 'PART'
 
 
 class MessagePartType(str, enum.Enum):
@@ -20,6 +39,8 @@ class MessagePartType(str, enum.Enum):
     PYOBJ = 'PYOBJ'
     STRING = 'STRING'
     JSON = 'JSON'
+    STATE = 'STATE'
+    STATES = 'STATES'
 
 
 PayloadPart = bytes | list | str | int | float | dict
@@ -27,29 +48,112 @@ Payload = list[PayloadPart]
 Handling = t.AsyncGenerator[PayloadPart, MessagePartType]
 
 
+MessageParts = list[tuple[MessagePartType, PayloadPart] | PayloadPart]
+Frames = list[bytes | memoryview | zmq.Frame]
+
+
+def encode_part(
+    part: tuple[MessagePartType, PayloadPart] | PayloadPart
+) -> bytes | memoryview | zmq.Frame:
+    """
+    Serializes single message part the same way corresponding
+    `socket.send_*` method would do it.
+
+    Params:
+        - part: Raw part or tuple of part type and part payload
+
+    Returns:
+        Frame ready to be sent with `send_multipart`
+
+    """
+    if isinstance(part, tuple):
+        part_type, part_payload = part
+    else:
+        part_type, part_payload = MessagePartType.RAW, part
+
+    match part_type or MessagePartType.RAW:
+        case MessagePartType.RAW:
+            return part_payload
+        case MessagePartType.PYOBJ:
+            return pickle.dumps(part_payload, pickle.DEFAULT_PROTOCOL)
+        case MessagePartType.STRING:
+            return part_payload.encode('utf-8')
+        case MessagePartType.JSON:
+            return jsonapi.dumps(part_payload)
+        case MessagePartType.STATE:
+            return StateUpdateCodec.encode(part_payload)
+        case MessagePartType.STATES:
+            return StateUpdateCodec.encode_many(part_payload)
+        case _:
+            raise ValueError(f"Invalid 'part_type' parameter value: {part_type}")
+
+
+class MessageEncoder:
+    """
+    Serializes all message parts up front, so the whole message can be pushed
+    with single `send_multipart` call.
+
+    Constant leading parts (like message type header) may be given via
+    `prefix` - they are encoded once and their frames are reused by every
+    encoded message.
+    """
+    def __init__(self, prefix: MessageParts = None):
+        self.prefix: tuple[bytes | memoryview | zmq.Frame, ...] = tuple(
+            encode_part(part) for part in prefix or ()
+        )
+
+    def encode(self, parts: MessageParts, envelope: Frames = None) -> Frames:
+        frames = list(envelope) if envelope else []
+        frames.extend(self.prefix)
+        frames.extend(encode_part(part) for part in parts)
+        return frames
+
+    async def send(
+        self,
+        *,
+        socket: zmq_asyncio.Socket,
+        parts: MessageParts,
+        envelope: Frames = None,
+        track: bool = False
+    ) -> zmq.MessageTracker | None:
+        """
+        Params:
+            - socket: Sending socket
+            - parts: Raw parts or tuples of part type and part payload
+            - envelope: Routing frames sent before the prefix (e.g. ROUTER
+                peer identity and empty delimiter)
+            - track: Whether to return `zmq.MessageTracker` of sent message
+
+        """
+        return await socket.send_multipart(
+            self.encode(parts, envelope),
+            copy=False,
+            track=track
+        )
+
+
+_default_encoder = MessageEncoder()
+
+
 async def send_parts(
     *,
     socket: zmq_asyncio.Socket,
-    parts: list[tuple[MessagePartType, PayloadPart] | PayloadPart],
-):
-    for i, part in enumerate(parts):
-        if isinstance(part, tuple):
-            part_type, part_payload = part
-        else:
-            part_type, part_payload = MessagePartType.RAW, part
-
-        match part_type or MessagePartType.RAW:
-            case MessagePartType.RAW:
-                send_method = socket.send
-            case MessagePartType.PYOBJ:
-                send_method = socket.send_pyobj
-            case MessagePartType.STRING:
-                send_method = socket.send_string
-            case MessagePartType.JSON:
-                send_method = socket.send_json
-            case _:
-                raise ValueError(f"Invalid 'part_type' parameter value: {part_type}")
-        await send_method(part_payload, zmq.SNDMORE if i < len(parts)-1 else 0)
+    parts: MessageParts,
+    track: bool = False
+) -> zmq.MessageTracker | None:
+    """
+    Sends given parts as one multipart message (see `MessageEncoder.send`).
+
+    Params:
+        - socket: Sending socket
+        - parts: Raw parts or tuples of part type and part payload
+        - track: Whether to return `zmq.MessageTracker` of sent message
+
+    Returns:
+        Message tracker if `track` is set, otherwise None
+
+    """
+    return await _default_encoder.send(socket=socket, parts=parts, track=track)
 
 
 T_ = t.TypeVar('T_')
@@ -76,15 +180,145 @@ class MessageBearer(abc.ABC):
         ...
 
 
+def decode_part(
+    frame: zmq.Frame,
+    part_type: MessagePartType = MessagePartType.RAW
+) -> PayloadPart:
+    """
+    Deserializes single received frame the same way corresponding
+    `socket.recv_*` method would do it.
+
+    Params:
+        - frame: Received frame
+        - part_type: Type of the part carried by the frame
+
+    Returns:
+        Decoded part
+
+    """
+    match part_type or MessagePartType.RAW:
+        case MessagePartType.RAW:
+            return frame.bytes
+        case MessagePartType.PYOBJ:
+            return pickle.loads(frame.buffer)
+        case MessagePartType.STRING:
+            return frame.bytes.decode('utf-8')
+        case MessagePartType.JSON:
+            return jsonapi.loads(frame.bytes)
+        case MessagePartType.STATE:
+            return StateUpdateCodec.decode(frame.buffer)
+        case MessagePartType.STATES:
+            return StateUpdateCodec.decode_many(frame.buffer)
+        case _:
+            raise ValueError(f"Invalid 'part_type' value: {part_type}")
+
+
+class MessageView:
+    """
+    Whole multipart message received with single `recv_multipart` call.
+
+    Frames are decoded only when accessed and decoded parts are cached, so
+    handlers pay only for the parts they actually read.
+    """
+    __slots__ = ('frames', '_decoded')
+
+    def __init__(self, frames: list[zmq.Frame]):
+        self.frames = frames
+        self._decoded: dict[tuple[int, MessagePartType], PayloadPart] | None = None
+
+    @classmethod
+    async def recv(cls, socket: zmq_asyncio.Socket) -> 'MessageView':
+        return cls(await socket.recv_multipart(copy=False))
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.frames[index].bytes
+
+    def get(
+        self,
+        index: int,
+        part_type: MessagePartType = MessagePartType.RAW
+    ) -> PayloadPart:
+        if part_type is MessagePartType.RAW or part_type is None:
+            return self.frames[index].bytes
+        if self._decoded is None:
+            self._decoded = {}
+        key = (index, part_type)
+        try:
+            return self._decoded[key]
+        except KeyError:
+            part = self._decoded[key] = decode_part(self.frames[index], part_type)
+            return part
+
+    def string(self, index: int) -> str:
+        return self.get(index, MessagePartType.STRING)
+
+    def json(self, index: int) -> t.Any:
+        return self.get(index, MessagePartType.JSON)
+
+    def pyobj(self, index: int) -> t.Any:
+        return self.get(index, MessagePartType.PYOBJ)
+
+    def state(self, index: int) -> StateUpdate:
+        return self.get(index, MessagePartType.STATE)
+
+    def states(self, index: int) -> list[StateUpdate]:
+        return self.get(index, MessagePartType.STATES)
+
+    async def handling(self) -> Handling:
+        """
+        Adapts the view to the `Handling` protocol used by handlers not
+        migrated to `MessageHandler.handle_message` yet.
+        """
+        part_type = yield
+        for index in range(len(self.frames)):
+            part_type = yield self.get(index, part_type)
+
+
+class OverflowPolicy(str, enum.Enum):
+    BLOCK = 'BLOCK'
+    DROP_OLDEST = 'DROP_OLDEST'
+    DROP_NEWEST = 'DROP_NEWEST'
+
+
 class MessageHandler(abc.ABC):
+    """
+    Handles messages received from the socket it is registered for.
+
+    Inheriting class must override either `handle_message`, which gets whole
+    received message as `MessageView`, or `handle`, which gets message
+    parts one by one through `Handling` protocol.
+
+    `CONCURRENCY`, `QUEUE_DEPTH` and `OVERFLOW` attributes configure the
+    handler's socket queue when poller works in concurrent dispatch mode.
+    Messages are handled in order only with `CONCURRENCY` equal to 1.
+    """
+    CONCURRENCY: int = 1
+    QUEUE_DEPTH: int = 64
+    OVERFLOW: OverflowPolicy = OverflowPolicy.BLOCK
+
     @classmethod
     async def handle_from_socket(cls, *, device: 'Device', socket: zmq_asyncio.Socket):
-        message = _handle_multipart(socket)
-        await anext(message)
-        await cls.handle(device=device, handling=message)
+        await cls.handle_message(
+            device=device,
+            message=await MessageView.recv(socket)
+        )
+
+    @classmethod
+    async def handle_message(
+        cls,
+        *,
+        device: 'Device',
+        message: MessageView,
+        **kwargs
+    ):
+        handling = message.handling()
+        await anext(handling)
+        await cls.handle(device=device, handling=handling, **kwargs)
 
     @classmethod
-    @abc.abstractmethod
     async def handle(
         cls,
         *,
@@ -92,49 +326,167 @@ class MessageHandler(abc.ABC):
         handling: Handling,
         **kwargs
     ):
-        ...
+        raise NotImplementedError()
 
 
-async def _handle_multipart(socket: zmq_asyncio.Socket) -> Handling:
-    part_type = yield
-    while True:
-        match part_type or MessagePartType.RAW:
-            case MessagePartType.RAW:
-                part_type = yield await socket.recv()
-            case MessagePartType.PYOBJ:
-                part_type = yield await socket.recv_pyobj()
-            case MessagePartType.STRING:
-                part_type = yield await socket.recv_string()
-            case MessagePartType.JSON:
-                part_type = yield await socket.recv_json()
-            case _:
-                raise ValueError(f"Invalid 'part_type' value: {part_type}")
-        if not socket.getsockopt(zmq.RCVMORE):
-            break
+@dataclass
+class DispatchStats:
+    """
+    Counters of single socket dispatcher. `queued` and `dropped` are totals,
+    `in_flight` and `depth` reflect current number of handled and waiting
+    messages.
+    """
+    queued: int = 0
+    dropped: int = 0
+    in_flight: int = 0
+    depth: int = 0
+
+
+class SocketDispatcher:
+    """
+    Bounded queue of messages received from single socket, together with
+    reader task filling it and worker tasks running the handler.
+    """
+    def __init__(
+        self,
+        *,
+        device: 'Device',
+        socket: zmq_asyncio.Socket,
+        handler: t.Type[MessageHandler],
+        concurrency: int = None,
+        queue_depth: int = None,
+        overflow: OverflowPolicy = None
+    ):
+        self.device = device
+        self.socket = socket
+        self.handler = handler
+        self.concurrency = concurrency or handler.CONCURRENCY
+        self.queue_depth = queue_depth or handler.QUEUE_DEPTH
+        self.overflow = OverflowPolicy(overflow or handler.OVERFLOW)
+
+        self.stats = DispatchStats()
+        self._queue: asyncio.Queue[MessageView] | None = None
+
+    async def put(self, message: MessageView):
+        queue = self._queue
+        if queue.full():
+            match self.overflow:
+                case OverflowPolicy.DROP_NEWEST:
+                    self.stats.dropped += 1
+                    return
+                case OverflowPolicy.DROP_OLDEST:
+                    queue.get_nowait()
+                    queue.task_done()
+                    self.stats.dropped += 1
+        # Blocking only the reader of this socket leaves messages in libzmq
+        # queue, so the other sockets are not affected.
+        await queue.put(message)
+        self.stats.queued += 1
+        self.stats.depth = queue.qsize()
+
+    async def execute(self):
+        self._queue = asyncio.Queue(self.queue_depth)
+        await asyncio.gather(
+            self._read(),
+            *(self._work() for _ in range(self.concurrency))
+        )
+
+    async def _read(self):
+        while True:
+            await self.put(await MessageView.recv(self.socket))
+
+    async def _work(self):
+        queue = self._queue
+        while True:
+            message = await queue.get()
+            self.stats.depth = queue.qsize()
+            self.stats.in_flight += 1
+            try:
+                await self.handler.handle_message(
+                    device=self.device,
+                    message=message
+                )
+            except Exception:
+                _log.exception("Handler %s failed", self.handler.__qualname__)
+            finally:
+                self.stats.in_flight -= 1
+                queue.task_done()
 
 
 class Poller:
-    _sockets: dict[zmq_asyncio.Socket, t.Type[MessageHandler]] = {}
+    """
+    Receives messages from registered sockets and passes them to their
+    handlers.
 
+    By default ready sockets are handled one after another. In concurrent
+    dispatch mode (`concurrent_dispatch` setting) each socket gets its own
+    `SocketDispatcher`, so slow handler doesn't stall the other sockets.
+    """
     def __init__(
         self,
-        device: 'Device'
+        device: 'Device',
+        *,
+        concurrent: bool = None
     ):
         self._poller = zmq_asyncio.Poller()
+        self._sockets: dict[zmq_asyncio.Socket, t.Type[MessageHandler]] = {}
         self.device = device
+        self.concurrent = (
+            concurrent
+            if concurrent is not None
+            else device.settings.concurrent_dispatch
+        )
+        self._dispatchers: dict[zmq_asyncio.Socket, SocketDispatcher] = {}
 
     def register(
         self,
         socket: zmq_asyncio.Socket,
-        handler: t.Type[MessageHandler]
+        handler: t.Type[MessageHandler],
+        **dispatch_options
     ):
+        """
+        Registers handler for messages received from given socket.
+
+        Params:
+            - socket: Receiving socket
+            - handler: Handler class
+            - dispatch_options: `SocketDispatcher` options overriding
+                handler's defaults (`concurrency`, `queue_depth`, `overflow`)
+
+        """
         self._poller.register(socket, zmq.POLLIN)
         self._sockets.update({socket: handler})
+        self._dispatchers.update({
+            socket: SocketDispatcher(
+                device=self.device,
+                socket=socket,
+                handler=handler,
+                **dispatch_options
+            )
+        })
+
+    @property
+    def stats(self) -> dict[str, DispatchStats]:
+        return {
+            dispatcher.handler.__name__: dispatcher.stats
+            for dispatcher in self._dispatchers.values()
+        }
 
     async def handle(self):
+        if self.concurrent:
+            await asyncio.gather(*(
+                dispatcher.execute()
+                for dispatcher in self._dispatchers.values()
+            ))
+            return True
+
         result = await self._poller.poll()
         if not result:
             return False
 
         for socket, _ in result:
-            await self._sockets.get(socket).handle_from_socket(device=self.device, socket=socket)
+            handler = self._sockets.get(socket)
+            try:
+                await handler.handle_from_socket(device=self.device, socket=socket)
+            except Exception:
+                _log.exception("Handler %s failed", handler.__name__)
@@ -2,9 +2,12 @@ import json
 from functools import lru_cache
 import os
 from pathlib import Path
+import tempfile
+from urllib.parse import urlsplit
 
-from pydantic import BaseSettings
+from pydantic import BaseModel, BaseSettings
 import yaml
+import zmq
 
 from .types import Port
 
@@ -13,9 +16,28 @@ from typing import Any
 
 ENV_PREFIX = 'deimicpi'
 
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1', '*'}
+
+
+class LogSettings(BaseModel):
+    level: str = 'INFO'
+    # JSON lines instead of plain text
+    structured: bool = False
+    # Records per second (with bursts up to `burst`) of single message
+    # category, None disables rate limiting
+    rate: float | None = 20.0
+    burst: int = 50
+    # Every n-th record kept of given categories (message templates)
+    sample: dict[str, int] = {}
+
 
 class Settings(BaseSettings):
+    # Identity of the device in replies, generated if not set
+    device_id: str | None = None
+
     bridge_addr_form: str = 'tcp://localhost:{port}'
+    inproc_addr_form: str = 'inproc://deimic_pi-{port}'
+    ipc_dir: Path | None = os.path.join(tempfile.gettempdir(), "deimic_pi")
 
     deimic_port: Port = 5555
 
@@ -25,12 +47,52 @@ class Settings(BaseSettings):
     extern_bcst_port: Port = 5558
     extern_req_port: Port = 5559
 
+    concurrent_dispatch: bool = False
+    io_threads: int = 1
+
+    # Seconds between heartbeats and number of missed heartbeats after
+    # which peer is considered dead
+    heartbeat_interval: float = 1.0
+    heartbeat_liveness: int = 3
+
+    log: LogSettings = LogSettings()
+
     class Config:
         env_prefix = f'{ENV_PREFIX}_'
         env_nested_delimiter = '__'
 
         case_sensitive = False
 
+    def ipc_addr(self, port: int) -> str | None:
+        """
+        Returns ipc endpoint corresponding with given Bridge's port or None
+        if ipc transport is disabled or not supported.
+        """
+        if self.ipc_dir is None or not zmq.has('ipc'):
+            return None
+        return f'ipc://{os.path.join(self.ipc_dir, str(port))}'
+
+    def bridge_addr(self, port: int) -> str:
+        """
+        Returns address of Bridge's socket bound on given port.
+
+        If the Bridge is reachable via TCP on local host and it has bound
+        corresponding ipc endpoint, the ipc endpoint is preferred.
+        """
+        address = self.bridge_addr_form.format(port=port)
+        ipc_addr = self.ipc_addr(port)
+        if ipc_addr is None:
+            return address
+
+        url = urlsplit(address)
+        if (
+            url.scheme == 'tcp'
+            and url.hostname in LOCAL_HOSTS
+            and os.path.exists(ipc_addr.removeprefix('ipc://'))
+        ):
+            return ipc_addr
+        return address
+
     @classmethod
     def from_file(cls, filename: Path | str = None, **override):
         if filename is None:
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import typing as t
+
+K = t.TypeVar('K', bound=t.Hashable)
+
+
+class TimerWheel(t.Generic[K]):
+    """
+    Hashed timer wheel of expiring keys (e.g. peers' liveness).
+
+    Key is placed in the slot of its deadline tick. Re-arming only updates
+    the key's deadline, the key stays where it is and is moved lazily when
+    its slot comes round, so arming, re-arming and cancelling are O(1) and
+    every tick touches only the keys of a single slot, no matter how many
+    keys are armed.
+    """
+    def __init__(self, *, tick: float, slots: int = 512, clock: t.Callable[[], float] = time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self._slots: list[set[K]] = [set() for _ in range(slots)]
+        self._deadlines: dict[K, int] = {}
+        self._current = self._tick_of(clock())
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._deadlines
+
+    def _tick_of(self, now: float) -> int:
+        return int(now // self.tick)
+
+    def touch(self, key: K, timeout: float) -> bool:
+        """
+        Arms or re-arms key to expire after given timeout (seconds).
+
+        Returns:
+            True if the key wasn't armed before
+
+        """
+        deadline = max(self._tick_of(self.clock() + timeout), self._current + 1)
+        new = key not in self._deadlines
+        if new or deadline < self._deadlines[key]:
+            self._slots[deadline % len(self._slots)].add(key)
+        self._deadlines[key] = deadline
+        return new
+
+    def cancel(self, key: K):
+        # Key left in its slot is dropped when the slot comes round
+        self._deadlines.pop(key, None)
+
+    def advance(self, now: float = None) -> list[K]:
+        """
+        Processes slots of ticks passed since the last call.
+
+        Returns:
+            Expired keys
+
+        """
+        target = self._tick_of(self.clock() if now is None else now)
+        expired = []
+        # Each slot is visited at most once, however long the wheel stalled
+        self._current = max(self._current, target - len(self._slots))
+        while self._current < target:
+            self._current += 1
+            slot = self._slots[self._current % len(self._slots)]
+            for key in list(slot):
+                deadline = self._deadlines.get(key)
+                if deadline is None:
+                    slot.discard(key)
+                elif deadline <= self._current:
+                    slot.discard(key)
+                    del self._deadlines[key]
+                    expired.append(key)
+                elif deadline % len(self._slots) != self._current % len(self._slots):
+                    # Re-armed since placed here
+                    slot.discard(key)
+                    self._slots[deadline % len(self._slots)].add(key)
+        return expired
+
+    async def execute(self, on_expired: t.Callable[[list[K]], t.Awaitable]):
+        """
+        Advances the wheel every tick and passes expired keys to given
+        coroutine function.
+        """
+        while True:
+            await asyncio.sleep(self.tick)
+            expired = self.advance()
+            if expired:
+                await on_expired(expired)
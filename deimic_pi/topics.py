@@ -0,0 +1,116 @@
+"""
+Fixed-width hierarchical topics of messages published by the Bridge to
+external subscribers.
+
+Topic levels:
+    - message type code: 1 byte (see `MESSAGE_TYPE_CODES`)
+    - component type: 1 byte (`DeimicComponentType` value)
+    - address: unsigned short (network byte order)
+    - number: unsigned short (network byte order)
+
+Subscribing to topic built with trailing levels omitted receives whole
+slice of components (e.g. all inputs at given address) and, thanks to fixed
+width of each level, nothing else - filtering is done by libzmq.
+"""
+import struct
+
+from deimic_pi.messages import MessageType
+from deimic_pi.types import DeimicComponentType
+
+
+MESSAGE_TYPE_CODES: dict[MessageType, bytes] = {
+    MessageType.ERROR: b'E',
+    MessageType.STATE_UPDATE: b'U',
+    MessageType.SNAPSHOT: b'S',
+    MessageType.REQUEST: b'R',
+    MessageType.PRESENCE: b'P',
+}
+_MESSAGE_TYPES = {code: message_type for message_type, code in MESSAGE_TYPE_CODES.items()}
+
+_LEVEL = struct.Struct('!H')
+
+ComponentFilter = tuple[DeimicComponentType | None, int | None, int | None]
+
+
+def state_topic(
+    component_type: DeimicComponentType | str = None,
+    address: int = None,
+    number: int = None,
+    *,
+    message_type: MessageType = MessageType.STATE_UPDATE
+) -> bytes:
+    """
+    Builds topic of components state message or its prefix if trailing
+    levels are omitted.
+
+    Params:
+        - component_type: Component type or None to match all
+        - address: Component address or None to match all
+        - number: Component number or None to match all
+        - message_type: Type of the message
+
+    Returns:
+        Topic
+
+    """
+    topic = MESSAGE_TYPE_CODES[MessageType(message_type)]
+    levels = (component_type, address, number)
+    if None in levels:
+        depth = levels.index(None)
+        if any(level is not None for level in levels[depth:]):
+            raise ValueError(f"Topic levels must be given in order: {levels}")
+    if component_type is None:
+        return topic
+    topic += DeimicComponentType(component_type).value.encode('ascii')
+    if address is None:
+        return topic
+    topic += _LEVEL.pack(address)
+    if number is None:
+        return topic
+    return topic + _LEVEL.pack(number)
+
+
+def parse_topic(topic: bytes) -> tuple[MessageType, ComponentFilter]:
+    """
+    Parses topic (or its prefix) built with `state_topic`. Incomplete
+    levels are treated as omitted.
+
+    Returns:
+        Tuple of message type and components filter
+
+    """
+    message_type = _MESSAGE_TYPES[topic[:1]]
+    component_type = address = number = None
+    if len(topic) >= 2:
+        component_type = DeimicComponentType(topic[1:2].decode('ascii'))
+    if len(topic) >= 4:
+        address, = _LEVEL.unpack(topic[2:4])
+    if len(topic) >= 6:
+        number, = _LEVEL.unpack(topic[4:6])
+    return message_type, (component_type, address, number)
+
+
+def parse_component_filter(value: str) -> ComponentFilter:
+    """
+    Parses components filter written as `<type>[-<address>[-<number>]]`
+    (e.g. `I`, `I-3` or `I-3-4`).
+    """
+    levels = value.split('-') if value else []
+    if len(levels) > 3:
+        raise ValueError(f"Invalid components filter: {value}")
+    component_type, address, number = [*levels, None, None, None][:3]
+    return (
+        DeimicComponentType(component_type) if component_type is not None else None,
+        int(address) if address is not None else None,
+        int(number) if number is not None else None,
+    )
+
+
+def matches(
+    component: tuple[DeimicComponentType, int, int],
+    components: ComponentFilter
+) -> bool:
+    return all(
+        level is None or level == value
+        for level, value in zip(components, component)
+    )
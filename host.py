@@ -0,0 +1,54 @@
+import asyncio
+
+import click
+
+from deimic_pi.devices.cli.settings import CLIToolSettings
+from deimic_pi.devices.led_driver.settings import LedDriverSettings
+from deimic_pi.host import Host
+from deimic_pi.host.settings import HostSettings, Settings
+from deimic_pi.log import setup_logging, stop_logging
+
+
+@click.command()
+@click.option(
+    '--io-threads',
+    '-t',
+    'io_threads',
+    default=Settings.get_default('io_threads'),
+    show_default=True,
+    type=int,
+    help="Number of ZMQ context I/O threads")
+@click.option(
+    '--strip-length',
+    '-L',
+    'strip_lengths',
+    multiple=True,
+    type=int,
+    help="Led strip length of co-located LedDriver (repeat for more drivers)")
+@click.option(
+    '--cli/--no-cli',
+    'cli_tool',
+    default=False,
+    show_default=True,
+    help="Run headless CLITool in the host process")
+def execute(io_threads: int, strip_lengths: tuple[int, ...], cli_tool: bool):
+    settings = Settings.from_file(
+        host=HostSettings(
+            led_drivers=[
+                LedDriverSettings(strip_length=strip_length)
+                for strip_length in strip_lengths
+            ],
+            cli_tool=CLIToolSettings() if cli_tool else None
+        ),
+        io_threads=io_threads
+    )
+    setup_logging(settings.log)
+    host = Host(settings)
+    try:
+        asyncio.run(host.execute())
+    finally:
+        stop_logging()
+
+
+if __name__ == '__main__':
+    execute()
@@ -6,6 +6,7 @@ import click
 
 from deimic_pi.devices.led_driver import LedDriver
 from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+from deimic_pi.log import setup_logging, stop_logging
 from deimic_pi.types import Port
 
 
@@ -52,8 +53,12 @@ def execute(
         inter_req_bcst_port=inter_req_bcst_port,
         inter_rep_recv_port=inter_rep_recv_port,
     )
+    setup_logging(settings.log)
     driver = LedDriver(settings)
-    asyncio.run(driver.execute())
+    try:
+        asyncio.run(driver.execute())
+    finally:
+        stop_logging()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+"""
+Shared fixtures of DeimicPi tests.
+
+Tests are plain functions driving their scenario with `asyncio.run`.
+Devices are bound on free local ports with ipc transport disabled.
+"""
+import asyncio
+import contextlib
+import itertools
+import random
+import socket
+import time
+import typing as t
+import uuid
+
+import pytest
+
+from deimic_pi.devices import Device
+from deimic_pi.devices.bridge.settings import BridgeSettings, Settings
+
+
+# Ports are handed out below the ephemeral range, so they can't be taken
+# meanwhile by local end of some connection
+_ports = itertools.count(random.randrange(20000, 30000, 1000))
+
+
+def free_port() -> int:
+    for port in _ports:
+        with socket.socket() as sock:
+            try:
+                sock.bind(('', port))
+            except OSError:
+                continue
+            return port
+
+
+def device_settings(settings_cls: t.Type[Settings] = Settings, **kwargs) -> Settings:
+    """
+    Returns settings of devices talking to each other over free ports.
+    """
+    kwargs.setdefault('ipc_dir', None)
+    kwargs.setdefault('inproc_addr_form', f'inproc://deimic_pi-{uuid.uuid4().hex[:8]}-{{port}}')
+    for field in (
+        'deimic_port',
+        'inter_broadcaster_port',
+        'inter_listener_port',
+        'extern_bcst_port',
+        'extern_req_port'
+    ):
+        kwargs.setdefault(field, free_port())
+    return settings_cls(**kwargs)
+
+
+@pytest.fixture
+def bridge_settings(tmp_path) -> Settings:
+    return device_settings(
+        bridge=BridgeSettings(
+            deimic_map_file=tmp_path / 'map.json',
+            deimic_map_reload_interval=None,
+            history_resolutions=[]
+        )
+    )
+
+
+@contextlib.asynccontextmanager
+async def running(device: Device, settle: float = 0.1):
+    """
+    Executes the device in background task for the duration of the block.
+    Fails if the device's task crashed meanwhile.
+    """
+    task = asyncio.create_task(device.execute())
+    await asyncio.sleep(settle)
+    try:
+        yield task
+        if task.done():
+            task.result()
+            pytest.fail("Device stopped executing")
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        device.close()
+
+
+async def eventually(predicate: t.Callable[[], t.Any], timeout: float = 2.0) -> t.Any:
+    """
+    Waits until predicate returns truthy value and returns it.
+    """
+    deadline = time.monotonic() + timeout
+    while not (result := predicate()):
+        if time.monotonic() > deadline:
+            pytest.fail("Condition not met in time")
+        await asyncio.sleep(0.01)
+    return result
+
+
+@contextlib.asynccontextmanager
+async def deimic_connection(settings: Settings):
+    """
+    Raw TCP connection of fake Deimic to the Bridge.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', settings.deimic_port)
+    try:
+        yield reader, writer
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
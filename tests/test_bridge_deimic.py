@@ -0,0 +1,35 @@
+import asyncio
+
+from conftest import deimic_connection, eventually, running
+
+from deimic_pi.client import BridgeClient
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.types import DeimicComponentType
+
+INPUT = DeimicComponentType.INPUT
+
+
+def test_out_of_range_update_is_skipped(bridge_settings):
+    bridge_settings.bridge.deimic_delimiter = '\n'
+
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            async with deimic_connection(bridge_settings) as (_, writer):
+                writer.write(b'I-70000-4-1\n')
+                await writer.drain()
+                await asyncio.sleep(0.05)
+                writer.write(b'I-3-4-1\n')
+                await writer.drain()
+                update = await eventually(lambda: bridge.state_cache.get((INPUT, 3, 4)))
+            assert update.state == 1
+            assert len(bridge.state_cache) == 1
+
+            client = BridgeClient.connect(bridge_settings)
+            try:
+                snapshot = (await client.request('SNAPSHOT', timeout=2.0)).states(0)
+            finally:
+                client.close()
+            assert snapshot == [(INPUT, 3, 4, 1)]
+
+    asyncio.run(scenario())
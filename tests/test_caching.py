@@ -0,0 +1,49 @@
+from deimic_pi.devices.led_driver.caching import CachedPattern, FrameCache
+from deimic_pi.devices.led_driver.patterns import ConstColorPattern, RainbowPattern
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+SETTINGS = Settings(ipc_dir=None, led_driver=LedDriverSettings(strip_length=2))
+# 10 frames of 2 LEDs
+SEQUENCE_SIZE = 60
+
+
+def rainbow(cache: FrameCache, brightness: float = 1.0):
+    kwargs = {'period': 1.0, 'brightness': brightness, 'fps': 10.0}
+    return cache.wrap(RainbowPattern(SETTINGS, **kwargs), kwargs)
+
+
+def test_cached_playback_matches_live_rendering():
+    cache = FrameCache(SEQUENCE_SIZE)
+    cached = rainbow(cache)
+    live = RainbowPattern(SETTINGS, period=1.0, fps=10.0)
+
+    assert isinstance(cached, CachedPattern)
+    for time_elapsed in (0.0, 0.3, 0.9, 1.3):
+        assert cached.step(time_elapsed) == live.step(time_elapsed) == 100
+        assert bytes(cached.frame.tobytes()) == bytes(live.frame.tobytes())
+
+
+def test_lru_eviction_within_budget():
+    cache = FrameCache(2 * SEQUENCE_SIZE)
+    rainbow(cache, 1.0)
+    rainbow(cache, 2.0 / 2)     # Same arguments - hit
+    rainbow(cache, 0.5)
+    rainbow(cache, 1.0)         # Refreshes the first sequence
+    rainbow(cache, 0.2)         # Evicts the least recently used (0.5)
+    assert isinstance(rainbow(cache, 1.0), CachedPattern)
+    rainbow(cache, 0.5)         # Rendered again, evicts 0.2
+
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (3, 4, 2)
+    assert stats.size <= cache.budget
+    assert stats.sequences == 2
+
+
+def test_oversized_and_uncacheable_patterns_render_live():
+    cache = FrameCache(SEQUENCE_SIZE - 1)
+    const = ConstColorPattern(SETTINGS, color=(0.0, 1.0, 1.0))
+
+    assert not isinstance(rainbow(cache), CachedPattern)
+    assert cache.wrap(const, {'color': (0.0, 1.0, 1.0)}) is const
+    assert (cache.stats.oversized, cache.stats.size) == (1, 0)
+    assert FrameCache(0).wrap(const, {}) is const
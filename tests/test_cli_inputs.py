@@ -0,0 +1,41 @@
+import functools
+import io
+import types
+
+import pytest
+from textual._context import active_app
+from textual.app import App
+
+from deimic_pi.devices.cli.app.widgets.inputs import TextInput
+
+
+class CountingInput(TextInput):
+    formatted = 0
+
+    def __str__(self) -> str:
+        type(self).formatted += 1
+        return 'input'
+
+
+@pytest.fixture
+def app():
+    # Stand-in of the running app with textual's own logging
+    app = types.SimpleNamespace(log_file=None, log_verbosity=1)
+    app.log = functools.partial(App.log, app)
+    token = active_app.set(app)
+    yield app
+    active_app.reset(token)
+
+
+def test_input_logs_are_formatted_only_when_written(app):
+    text_input = CountingInput()
+    text_input.title = "Name"
+    text_input.content = "abc"
+    assert CountingInput.formatted == 0
+
+    app.log_file = io.StringIO()
+    text_input.content = "abcd"
+    assert app.log_file.getvalue().splitlines() == [
+        "input - Content changed to: abcd",
+        "input - New display_content rendered: abcd",
+    ]
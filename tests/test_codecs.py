@@ -0,0 +1,74 @@
+import pytest
+
+from deimic_pi.codecs import (
+    StateUpdate,
+    StateUpdateCodec,
+    TimedStateUpdateCodec,
+    decode_state_updates,
+    decode_timed_state_updates
+)
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+from deimic_pi.types import DeimicComponentType
+
+UPDATE = StateUpdate(DeimicComponentType.INPUT, 3, 4, -1)
+
+
+def test_state_update_round_trip():
+    frame = StateUpdateCodec.encode(UPDATE)
+
+    assert len(frame) == StateUpdateCodec.SIZE
+    assert StateUpdateCodec.decode(frame) == UPDATE
+
+
+def test_state_updates_round_trip():
+    updates = [UPDATE, StateUpdate(DeimicComponentType.OUTPUT, 65535, 0, 2**31 - 1)]
+
+    assert decode_state_updates(StateUpdateCodec.encode_many(updates)) == updates
+
+
+def test_timed_state_updates_round_trip():
+    frame = TimedStateUpdateCodec.encode(123, UPDATE) + TimedStateUpdateCodec.encode(456, UPDATE)
+
+    assert decode_timed_state_updates(frame) == [(123, UPDATE), (456, UPDATE)]
+
+
+@pytest.mark.parametrize('update', [
+    StateUpdate(DeimicComponentType.INPUT, 70000, 4, 1),
+    StateUpdate(DeimicComponentType.INPUT, -1, 4, 1),
+    StateUpdate(DeimicComponentType.INPUT, 3, 65536, 1),
+    StateUpdate(DeimicComponentType.INPUT, 3, 4, 2**31),
+    StateUpdate('X', 3, 4, 1),
+])
+def test_out_of_range_update_is_rejected(update):
+    with pytest.raises(ValueError):
+        StateUpdateCodec.validate(update)
+    with pytest.raises(ValueError):
+        StateUpdateCodec.encode(update)
+
+
+def test_decode_rejects_invalid_frames():
+    frame = bytearray(StateUpdateCodec.encode(UPDATE))
+    frame[0] = StateUpdateCodec.VERSION + 1
+    with pytest.raises(ValueError):
+        StateUpdateCodec.decode(frame)
+    with pytest.raises(ValueError):
+        StateUpdateCodec.decode_many(bytes(StateUpdateCodec.SIZE + 1))
+
+
+def test_update_info_from_payload():
+    update = DeimicStateUpdateInfo.from_payload(received_from=b'id', payload=['I', '3', '4', '-1'])
+
+    assert update.update == UPDATE
+    assert update.received_from == b'id'
+
+
+@pytest.mark.parametrize('payload', [
+    ['I', '70000', '4', '1'],
+    ['I', '3', '4', str(2**31)],
+    ['I', '3', 'x', '1'],
+    ['X', '3', '4', '1'],
+    ['I', '3', '4'],
+])
+def test_update_info_rejects_invalid_payload(payload):
+    with pytest.raises(ValueError):
+        DeimicStateUpdateInfo.from_payload(received_from=b'id', payload=payload)
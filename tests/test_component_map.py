@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.component_map import ComponentMap, ComponentMapLoader
+from deimic_pi.types import DeimicComponentType
+
+COMPONENTS = {
+    'components': [
+        {'name': 'lamp', 'type': 'O', 'address': 3, 'number': 1, 'tags': ['hall']},
+        {'name': 'door', 'type': 'I', 'address': 3, 'number': 4, 'tags': ['hall', 'alarm']},
+    ]
+}
+
+
+def write_map(path, data):
+    path.write_text(json.dumps(data))
+
+
+def test_map_indexes_and_resolves():
+    component_map = ComponentMap.from_json(COMPONENTS)
+    door = (DeimicComponentType.INPUT, 3, 4)
+
+    assert len(component_map) == 2
+    assert component_map.get('door').key == door
+    assert component_map.name_of(door) == 'door'
+    assert [component.name for component in component_map.tagged('hall')] == ['lamp', 'door']
+    assert component_map.resolve('door') == door
+    assert component_map.resolve('O-7-2') == (DeimicComponentType.OUTPUT, 7, 2)
+    with pytest.raises(KeyError):
+        component_map.resolve('window')
+
+
+def test_compiled_map_round_trips():
+    component_map = ComponentMap.from_json(COMPONENTS)
+
+    assert ComponentMap.from_compiled(component_map.compile()).components == component_map.components
+
+
+def test_loader_uses_cache_and_reloads_changes(tmp_path, monkeypatch):
+    path = tmp_path / 'map.json'
+    write_map(path, COMPONENTS)
+    loader = ComponentMapLoader(path)
+
+    assert loader.reload_if_changed()
+    assert loader.compiled_path.exists()
+    assert not loader.reload_if_changed()
+
+    # Fresh loader reads the compiled cache of unchanged file
+    with monkeypatch.context() as patch:
+        patch.setattr(ComponentMap, 'from_json', None)
+        cached = ComponentMapLoader(path)
+        assert cached.reload_if_changed()
+        assert cached.map.get('lamp') is not None
+
+    write_map(path, {'components': COMPONENTS['components'][:1]})
+    assert loader.reload_if_changed()
+    assert loader.map.get('door') is None
+
+    path.unlink()
+    assert loader.reload_if_changed()
+    assert len(loader.map) == 0
+
+
+def test_invalid_map_keeps_current_one(tmp_path):
+    path = tmp_path / 'map.json'
+    write_map(path, COMPONENTS)
+    loader = ComponentMapLoader(path)
+    loader.reload_if_changed()
+
+    write_map(path, {'components': [{'name': 'lamp', 'type': 'X', 'address': 3, 'number': 1}]})
+    with pytest.raises(ValueError):
+        loader.reload_if_changed()
+    assert loader.map.get('lamp') is not None
+    # Reported once, until the file changes again
+    assert not loader.reload_if_changed()
+
+    path.write_text('{"components": [{"name": "lamp"')
+    with pytest.raises(ValueError):
+        loader.reload_if_changed()
+
+
+@pytest.mark.parametrize('content', [
+    '{"components": [{"name": "lamp", "address": 3, "number": 1}]}',
+    '{"components": [',
+])
+def test_bridge_starts_with_empty_map_on_invalid_file(bridge_settings, content):
+    bridge_settings.bridge.deimic_map_file.write_text(content)
+    bridge = Bridge(bridge_settings)
+    try:
+        assert len(bridge.component_map) == 0
+    finally:
+        bridge.close()
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from deimic_pi.devices.led_driver.compositing import BlendMode, Compositor
+from deimic_pi.devices.led_driver.patterns import ConstColorPattern
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+SETTINGS = Settings(ipc_dir=None, led_driver=LedDriverSettings(strip_length=4, frame_cache_bytes=0))
+RED, BLUE = (0.0, 1.0, 1.0), (2 / 3, 1.0, 1.0)
+
+
+def pixels(compositor: Compositor) -> list[tuple[int, int, int]]:
+    return [tuple(int(channel) for channel in compositor.frame[index]) for index in range(4)]
+
+
+@pytest.mark.parametrize('mode, blended', [
+    (BlendMode.OVER, (128, 0, 128)),
+    (BlendMode.ADD, (255, 0, 128)),
+    (BlendMode.MULTIPLY, (128, 0, 0)),
+    (BlendMode.MAX, (255, 0, 128)),
+])
+def test_blend_modes_within_layer_range(mode, blended):
+    compositor = Compositor(SETTINGS)
+    compositor.set_pattern(0, ConstColorPattern(SETTINGS, color=RED))
+    compositor.set_pattern(
+        1,
+        ConstColorPattern(SETTINGS, color=BLUE),
+        mode=mode.value,
+        opacity=0.5,
+        start=1,
+        stop=3
+    )
+
+    assert compositor.step(0.0) == 0
+    assert pixels(compositor) == [(255, 0, 0), blended, blended, (255, 0, 0)]
+
+
+def test_crossfade_to_new_pattern():
+    compositor = Compositor(SETTINGS)
+    compositor.set_pattern(0, ConstColorPattern(SETTINGS, color=RED))
+    compositor.step(0.0)
+    compositor.set_pattern(0, ConstColorPattern(SETTINGS, color=BLUE), fade=1.0)
+
+    assert compositor.step(1.0) == compositor.interval
+    assert pixels(compositor)[0] == (255, 0, 0)
+    assert compositor.describe()[0]['fading']
+    compositor.step(1.5)
+    assert pixels(compositor)[0] == (128, 0, 128)
+    assert compositor.step(2.0) == 0
+    assert pixels(compositor)[0] == (0, 0, 255)
+    assert not compositor.describe()[0]['fading']
+
+
+def test_invalid_options_are_rejected_up_front():
+    compositor = Compositor(SETTINGS)
+
+    with pytest.raises(ValueError):
+        compositor.set_pattern(0, None, opacity=2.0)
+    with pytest.raises(ValueError):
+        compositor.configure(0, mode='screen')
+
+
+class BlockingPattern(ConstColorPattern):
+    def __init__(self, settings: Settings, **kwargs):
+        super().__init__(settings, **kwargs)
+        self.stepping = threading.Event()
+        self.release = threading.Event()
+
+    def step(self, time_elapsed: float) -> int:
+        self.stepping.set()
+        self.release.wait(2.0)
+        return 0
+
+
+def test_describe_waits_for_frame_in_progress():
+    compositor = Compositor(SETTINGS)
+    pattern = BlockingPattern(SETTINGS, color=RED)
+    compositor.set_pattern(0, pattern)
+    render = threading.Thread(target=compositor.step, args=(0.0,))
+    render.start()
+    assert pattern.stepping.wait(2.0)
+
+    described = []
+    describe = threading.Thread(target=lambda: described.append(compositor.describe()))
+    describe.start()
+    describe.join(0.1)
+    # Layers aren't read while the render thread changes them
+    assert not described
+    pattern.release.set()
+    render.join()
+    describe.join()
+    assert described == [[{
+        'index': 0,
+        'pattern': 'BlockingPattern',
+        'cached': False,
+        'opacity': 1.0,
+        'mode': 'over',
+        'start': 0,
+        'stop': 4,
+        'fading': False,
+    }]]
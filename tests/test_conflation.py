@@ -0,0 +1,49 @@
+import json
+import os
+
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.conflation import Conflator
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+from deimic_pi.types import DeimicComponentType
+
+INPUT = DeimicComponentType.INPUT
+
+
+def test_conflator_keeps_latest_update_per_component():
+    conflator = Conflator(window=10.0, exempt=[(INPUT, 9, 9)])
+
+    assert conflator.push(DeimicStateUpdateInfo(INPUT, 1, 1, 0))
+    assert conflator.push(DeimicStateUpdateInfo(INPUT, 1, 1, 1))
+    assert conflator.push(DeimicStateUpdateInfo(INPUT, 1, 2, 0))
+    assert not conflator.push(DeimicStateUpdateInfo(INPUT, 9, 9, 1))
+
+    assert [(update.number, update.new_state) for update in conflator.drain()] == [(1, 1), (2, 0)]
+    assert conflator.drain() == []
+    assert (conflator.stats.received, conflator.stats.coalesced, conflator.stats.published) == (4, 1, 3)
+
+
+def test_exempt_components_follow_reloaded_map(bridge_settings):
+    map_file = bridge_settings.bridge.deimic_map_file
+    bridge_settings.bridge.conflation_window = 10.0
+    bridge_settings.bridge.conflation_exempt = ['door', 'I-9-9']
+
+    def write_map(address: int):
+        map_file.write_text(json.dumps({'components': [
+            {'name': 'door', 'type': 'I', 'address': address, 'number': 1}
+        ]}))
+        stat = os.stat(map_file)
+        os.utime(map_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    bridge = Bridge(bridge_settings)
+    try:
+        assert bridge.conflator.exempt == {(INPUT, 9, 9)}
+
+        write_map(1)
+        assert bridge.reload_component_map()
+        assert bridge.conflator.exempt == {(INPUT, 9, 9), (INPUT, 1, 1)}
+
+        write_map(2)
+        assert bridge.reload_component_map()
+        assert bridge.conflator.exempt == {(INPUT, 9, 9), (INPUT, 2, 1)}
+    finally:
+        bridge.close()
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+from conftest import deimic_connection, eventually, running
+
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.queues import DeimicRequest, DeimicRequestQueue
+
+
+def test_queue_drains_by_priority_then_arrival():
+    queue = DeimicRequestQueue()
+    queue.put(DeimicRequest(1, 1, 0))
+    queue.put(DeimicRequest(1, 2, 0), priority=5)
+    queue.put(DeimicRequest(1, 3, 0))
+
+    assert [request.number for request in queue.drain(2)] == [2, 1]
+    assert [request.number for request in queue.drain(2)] == [3]
+    assert queue.stats.delivered == 3
+
+
+def test_queue_keeps_latest_write_per_component():
+    queue = DeimicRequestQueue()
+    queue.put(DeimicRequest(1, 1, 0))
+    queue.put(DeimicRequest(1, 2, 0))
+    queue.put(DeimicRequest(1, 1, 7))
+    queue.put(DeimicRequest(1, 2, 8), priority=1)
+
+    assert queue.drain(16) == [DeimicRequest(1, 2, 8), DeimicRequest(1, 1, 7)]
+    assert queue.stats.deduplicated == 2
+    assert len(queue) == 0
+
+
+@pytest.mark.parametrize('delimiter, replies', [
+    ('\n', [b'O-1-1-1\nO-1-2-1\n']),
+    ('', [b'O-1-1-1', b'O-1-2-1', b'NO_REQUESTS']),
+])
+def test_ready_poll_gets_pending_requests(bridge_settings, delimiter, replies):
+    bridge_settings.bridge.deimic_delimiter = delimiter
+
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        received = []
+        async with running(bridge):
+            async with deimic_connection(bridge_settings) as (reader, writer):
+                await eventually(lambda: bridge.deimic_identities)
+                bridge.enqueue_deimic_request(DeimicRequest(1, 1, 1))
+                bridge.enqueue_deimic_request(DeimicRequest(1, 2, 1))
+                for _ in replies:
+                    writer.write(f'READY{delimiter}'.encode())
+                    await writer.drain()
+                    received.append(await asyncio.wait_for(reader.read(256), 2.0))
+        return received
+
+    assert asyncio.run(scenario()) == replies
@@ -0,0 +1,25 @@
+from deimic_pi.devices import DeviceType
+
+
+def test_topics_are_fixed_width_and_distinct():
+    device_types = [device_type for device_type in DeviceType if device_type.bit_count() == 1]
+    topics = [device_type.topic for device_type in device_types]
+
+    assert all(len(topic) == 1 for topic in topics)
+    assert len(set(topics)) == len(topics)
+
+
+def test_route_has_topic_per_targeted_device_type():
+    signature = DeviceType.build_signature([DeviceType.LED_DRIVER, DeviceType.CLI_TOOL])
+
+    assert DeviceType.route(signature) == (DeviceType.LED_DRIVER.topic, DeviceType.CLI_TOOL.topic)
+    assert DeviceType.route(DeviceType.UNKNOWN) == ()
+    assert len(DeviceType.route(DeviceType.ALL)) == 7
+
+
+def test_familiar_signatures():
+    signatures = DeviceType.LED_DRIVER.get_familiar_signatures()
+
+    assert DeviceType.ALL in signatures
+    assert DeviceType.LED_DRIVER | DeviceType.BRIDGE in signatures
+    assert DeviceType.BRIDGE not in signatures
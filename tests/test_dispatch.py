@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+
+import pytest
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+import deimic_pi.messages as base
+
+
+class RecordingHandler(base.MessageHandler):
+    release: asyncio.Event
+    handled: list[bytes]
+
+    @classmethod
+    async def handle_message(cls, *, device, message: base.MessageView, **kwargs):
+        if message[0] == b'fail':
+            raise RuntimeError("Handler failure")
+        await cls.release.wait()
+        cls.handled.append(message[0])
+
+
+async def dispatch(messages: list[bytes], **options) -> tuple[list[bytes], base.DispatchStats]:
+    RecordingHandler.release = asyncio.Event()
+    RecordingHandler.handled = []
+    ctx = zmq_asyncio.Context()
+    sender, receiver = ctx.socket(zmq.PAIR), ctx.socket(zmq.PAIR)
+    receiver.bind('inproc://test-dispatch')
+    sender.connect('inproc://test-dispatch')
+    dispatcher = base.SocketDispatcher(
+        device=None,
+        socket=receiver,
+        handler=RecordingHandler,
+        **options
+    )
+    task = asyncio.create_task(dispatcher.execute())
+    try:
+        for message in messages:
+            await sender.send(message)
+            await asyncio.sleep(0.01)
+        RecordingHandler.release.set()
+        await asyncio.sleep(0.05)
+        return RecordingHandler.handled, dispatcher.stats
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        sender.close(0)
+        receiver.close(0)
+        ctx.term()
+
+
+@pytest.mark.parametrize('overflow, handled', [
+    (base.OverflowPolicy.DROP_OLDEST, [b'0', b'3', b'4']),
+    (base.OverflowPolicy.DROP_NEWEST, [b'0', b'1', b'2']),
+    (base.OverflowPolicy.BLOCK, [b'0', b'1', b'2', b'3', b'4']),
+])
+def test_overflow_policy(overflow, handled):
+    messages = [str(index).encode() for index in range(5)]
+
+    result, stats = asyncio.run(dispatch(messages, concurrency=1, queue_depth=2, overflow=overflow))
+
+    assert result == handled
+    assert stats.dropped == len(messages) - len(handled)
+
+
+def test_concurrent_workers():
+    result, stats = asyncio.run(dispatch([b'a', b'b', b'c'], concurrency=3, queue_depth=1))
+
+    assert sorted(result) == [b'a', b'b', b'c']
+    assert stats.in_flight == 0
+
+
+def test_failing_handler_doesnt_stop_dispatcher():
+    result, _ = asyncio.run(dispatch([b'fail', b'ok'], concurrency=1))
+
+    assert result == [b'ok']
@@ -0,0 +1,49 @@
+import threading
+
+from deimic_pi.devices.led_driver.executor import PatternExecutor
+from deimic_pi.devices.led_driver.patterns import PatternBearer
+from deimic_pi.devices.led_driver.rendering import RenderEngine
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+
+class RecordingPattern(PatternBearer):
+    def __init__(self, settings: Settings, name: str, release: threading.Event = None):
+        super().__init__(settings)
+        self.name = name
+        self.release = release
+        self.stepped = threading.Event()
+        self.closed = 0
+
+    def step(self, time_elapsed: float) -> int:
+        self.stepped.set()
+        if self.release is not None:
+            self.release.wait(2.0)
+        return 0
+
+    def close(self):
+        self.closed += 1
+
+
+def test_patterns_replaced_in_mailbox_are_closed():
+    settings = Settings(ipc_dir=None, led_driver=LedDriverSettings(strip_length=3))
+    executor = PatternExecutor(RenderEngine(settings))
+    executor.run_controller.set()
+    release = threading.Event()
+    busy = RecordingPattern(settings, 'busy', release)
+    skipped, latest = RecordingPattern(settings, 'skipped'), RecordingPattern(settings, 'latest')
+
+    executor.swap(busy)
+    assert busy.stepped.wait(2.0)
+    # Render thread is busy, so the first pattern never leaves the mailbox
+    executor.swap(skipped)
+    executor.swap(latest)
+    assert skipped.closed == 1
+    release.set()
+    assert latest.stepped.wait(2.0)
+    # Closed whether displayed or still in the mailbox
+    executor.swap(pending := RecordingPattern(settings, 'pending'))
+    executor.close()
+
+    assert not skipped.stepped.is_set()
+    assert (busy.closed, skipped.closed, latest.closed, pending.closed) == (1, 1, 1, 1)
+    assert executor.pattern is None
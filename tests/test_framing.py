@@ -0,0 +1,79 @@
+import asyncio
+
+from conftest import deimic_connection, eventually, running
+
+from deimic_pi.codecs import decode_state_update
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.framing import DeimicFrameParser
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+from deimic_pi.types import DeimicComponentType
+
+INPUT = DeimicComponentType.INPUT
+
+
+def test_parser_joins_split_and_splits_merged_messages():
+    parser = DeimicFrameParser(delimiter='\n')
+
+    assert parser.feed(b'I-3-4') == []
+    assert parser.feed(b'-1\nO-1-2-0\nREA') == [['I', '3', '4', '1'], ['O', '1', '2', '0']]
+    assert parser.feed(b'DY\n') == [['READY']]
+
+
+def test_parser_custom_field_delimiter():
+    parser = DeimicFrameParser(delimiter='\n', field_delimiter='|')
+
+    assert parser.feed(b'I|3|4|1\n') == [['I', '3', '4', '1']]
+
+
+def test_parser_discards_unterminated_garbage():
+    parser = DeimicFrameParser(delimiter='\n', max_buffer=8)
+
+    assert parser.feed(b'x' * 9) == []
+    assert parser.discarded == 9
+    assert parser.feed(b'READY\n') == [['READY']]
+
+
+def test_parser_without_delimiter_takes_frame_as_message():
+    parser = DeimicFrameParser(delimiter='')
+
+    assert parser.feed(b'I-3-4-1') == [['I', '3', '4', '1']]
+    assert parser.feed(b'READY\r\n') == [['READY']]
+    assert parser.feed(b'') == []
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_multipart(self, frames, **kwargs):
+        self.sent.append(list(frames))
+
+
+def test_send_batch_publishes_each_update_under_its_topic():
+    updates = [
+        DeimicStateUpdateInfo(INPUT, 3, 4, 1),
+        DeimicStateUpdateInfo(INPUT, 3, 5, 0),
+    ]
+    socket = RecordingSocket()
+
+    asyncio.run(DeimicStateUpdateInfo.send_batch(updates, socket=socket, device=None))
+
+    assert [frames[0] for frames in socket.sent] == [update.topic for update in updates]
+    assert [decode_state_update(frames[1]) for frames in socket.sent] == [
+        update.update for update in updates
+    ]
+
+
+def test_unterminated_messages_by_default(bridge_settings):
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            async with deimic_connection(bridge_settings) as (reader, writer):
+                writer.write(b'I-3-4-1')
+                await writer.drain()
+                await eventually(lambda: bridge.state_cache.get((INPUT, 3, 4)))
+                writer.write(b'READY')
+                await writer.drain()
+                return await asyncio.wait_for(reader.read(64), 2.0)
+
+    assert asyncio.run(scenario()) == b'NO_REQUESTS'
@@ -0,0 +1,41 @@
+import asyncio
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+from conftest import eventually, running
+
+from deimic_pi.devices import DeviceType
+from deimic_pi.devices.bridge import Bridge
+
+
+def test_gathering_survives_malformed_replies(bridge_settings):
+    topic = DeviceType.BRIDGE.topic
+
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            device = zmq_asyncio.Context.instance().socket(zmq.PUB)
+            device.connect(f'tcp://localhost:{bridge_settings.inter_listener_port}')
+            try:
+                await asyncio.sleep(0.2)
+                request_id, gathering = bridge.gatherer.open(quorum=2)
+                for frames in (
+                    [topic, request_id, b'led-1', b'{not json'],
+                    [topic, request_id, b'\xff', b'{}'],
+                    [topic, b'', b'HEARTBEAT', b'led-1', b'LED_DRIVER', b'soon'],
+                    [topic, request_id, b'led-1', b'{"status": "ok"}'],
+                    [topic, request_id, b'led-2', b'[1, 2]'],
+                ):
+                    await device.send_multipart(frames)
+                replies, complete = await bridge.gatherer.wait(request_id, gathering, 2.0)
+
+                # Well-formed heartbeat still registers the device
+                await device.send_multipart([topic, b'', b'HEARTBEAT', b'led-1', b'LED_DRIVER', b'1.0'])
+                await eventually(lambda: bridge.presence.stats.joined == 1)
+            finally:
+                device.close(0)
+        return replies, complete
+
+    replies, complete = asyncio.run(scenario())
+    assert complete
+    assert replies == {'led-1': {'status': 'ok'}, 'led-2': [1, 2]}
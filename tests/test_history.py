@@ -0,0 +1,51 @@
+import pytest
+
+from deimic_pi.codecs import StateUpdate
+from deimic_pi.devices.bridge.history import HistorySeries, HistoryStore
+from deimic_pi.types import DeimicComponentType
+
+KEY = (DeimicComponentType.INPUT, 3, 4)
+
+
+def test_series_buckets_min_max_last_count():
+    series = HistorySeries(1.0, 10)
+    for timestamp, state in ((0.1, 5), (0.5, 2), (0.9, 7), (0.95, 4), (2.5, 1)):
+        series.add(timestamp, state)
+
+    assert series.buckets(0, 5) == [(0.0, 2, 7, 4, 4), (2.0, 1, 1, 1, 1)]
+    assert series.buckets(0, 5, merge=4) == [(0.0, 1, 7, 1, 5)]
+
+
+def test_series_overwrites_stale_slots():
+    series = HistorySeries(1.0, 4)
+    series.add(1.0, 1)
+    series.add(5.0, 2)      # Same slot as second 1
+
+    assert series.buckets(0, 5) == [(5.0, 2, 2, 2, 1)]
+    # Buckets older than the ring's span are never reported
+    assert series.buckets(0, 1) == []
+
+
+def test_store_picks_finest_covering_series():
+    store = HistoryStore([(60.0, 60), (1.0, 100)])
+    store.add([StateUpdate(*KEY, 10)], timestamp=1000.0)
+    store.add([StateUpdate(*KEY, 20)], timestamp=1030.5)
+
+    assert KEY in store and len(store) == 1
+    assert store.query(KEY, 1000.0, 1050.0) == (1.0, [(1000.0, 10, 10, 10, 1), (1030.0, 20, 20, 20, 1)])
+    resolution, buckets = store.query(KEY, 900.0, 1100.0)
+    assert resolution == 60.0
+    assert buckets == [(960.0, 10, 10, 10, 1), (1020.0, 20, 20, 20, 1)]
+
+
+def test_store_limits_points():
+    store = HistoryStore([(1.0, 1000)])
+    for second in range(1000, 1100):
+        store.add([StateUpdate(*KEY, second)], timestamp=float(second))
+
+    resolution, buckets = store.query(KEY, 1000.0, 1099.0, points=10)
+    assert len(buckets) <= 10
+    assert sum(bucket[4] for bucket in buckets) == 100
+    assert resolution == 11.0
+    with pytest.raises(KeyError):
+        store.query((DeimicComponentType.OUTPUT, 1, 1), 0.0)
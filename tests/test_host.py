@@ -0,0 +1,50 @@
+import asyncio
+
+from conftest import device_settings, running
+
+from deimic_pi.client import BridgeClient
+from deimic_pi.devices.bridge.settings import BridgeSettings
+from deimic_pi.devices.led_driver.settings import LedDriverSettings
+from deimic_pi.host import Host
+from deimic_pi.host.settings import HostSettings, Settings
+from deimic_pi.messages import Poller
+
+
+def test_pollers_keep_own_registries(bridge_settings):
+    class FakeDevice:
+        settings = bridge_settings
+
+    first, second = Poller(FakeDevice()), Poller(FakeDevice())
+    first._sockets[object()] = None
+
+    assert not second._sockets
+
+
+def test_host_runs_colocated_devices(tmp_path):
+    settings = device_settings(
+        Settings,
+        bridge=BridgeSettings(
+            deimic_map_file=tmp_path / 'map.json',
+            deimic_map_reload_interval=None,
+            history_resolutions=[]
+        ),
+        host=HostSettings(led_drivers=[LedDriverSettings(strip_length=4)])
+    )
+
+    async def scenario():
+        host = Host(settings)
+        assert all(device._ctx is host.ctx for device in host.devices)
+        async with running(host, settle=0.3):
+            client = BridgeClient.connect(settings)
+            try:
+                reply = await client.request('GATHER', {
+                    'signature': 1,
+                    'request': ['STATUS'],
+                    'quorum': 1
+                }, timeout=2.0)
+            finally:
+                client.close()
+        return reply.json(0)
+
+    [status] = asyncio.run(scenario())['replies'].values()
+    assert status['strip_length'] == 4
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+from conftest import running
+
+from deimic_pi.client import BridgeClient
+from deimic_pi.codecs import StateUpdate, TimedStateUpdateCodec
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.journal import Journal, JournalSegment
+from deimic_pi.types import DeimicComponentType
+
+OUTPUT = DeimicComponentType.OUTPUT
+
+
+def updates(count: int, state: int = 1) -> list[StateUpdate]:
+    return [StateUpdate(OUTPUT, 1, number, state) for number in range(count)]
+
+
+def written(journal: Journal) -> list:
+    return [
+        record
+        for chunk in journal.read()
+        for record in TimedStateUpdateCodec.decode_many(chunk)
+    ]
+
+
+def test_batch_overflowing_segments_rotates(tmp_path):
+    journal = Journal(tmp_path, segment_records=4)
+    journal._write_batch(100, updates(10))
+    # Clock stepping back stays in order and creates no colliding segment
+    journal._write_batch(50, updates(3, state=2))
+    journal.close()
+
+    paths = sorted(tmp_path.glob(f'*{JournalSegment.SUFFIX}'))
+    assert len(paths) == 4
+    records = written(journal := Journal(tmp_path, segment_records=4))
+    assert [record.update.state for record in records] == [1] * 10 + [2] * 3
+    assert {record.timestamp for record in records} == {100}
+    assert journal.stats.segments == 4
+    # Records of one time spread over segments are all found
+    assert len(list(journal.read(since=100))) == 4
+    journal.close()
+
+
+def test_reopened_journal_continues_last_segment(tmp_path):
+    journal = Journal(tmp_path, segment_records=4)
+    journal._write_batch(100, updates(2))
+    journal.close()
+
+    journal = Journal(tmp_path, segment_records=4)
+    journal._write_batch(200, updates(3))
+    journal.close()
+
+    journal = Journal(tmp_path, segment_records=4)
+    assert [record.timestamp for record in written(journal)] == [100] * 2 + [200] * 3
+    assert journal.stats.segments == 2
+    journal.close()
+
+
+def test_empty_segment_is_removed_on_open(tmp_path):
+    journal = Journal(tmp_path, segment_records=4)
+    journal._write_batch(100, updates(2))
+    journal.close()
+    empty = tmp_path / f'{200:020d}-{1:010d}{JournalSegment.SUFFIX}'
+    empty.touch()
+
+    journal = Journal(tmp_path, segment_records=4)
+    assert not empty.exists()
+    assert len(written(journal)) == 2
+    journal.close()
+
+
+def test_writer_survives_failed_batch(tmp_path):
+    journal = Journal(tmp_path, segment_records=4)
+    journal.start()
+    journal.append([StateUpdate(OUTPUT, 2**16, 1, 1)])
+    journal.append(updates(2))
+    journal.close()
+
+    assert journal.stats.failed == 1
+    assert journal.stats.written == 2
+
+
+def test_retention_keeps_segment_being_written(tmp_path):
+    journal = Journal(tmp_path, segment_records=4, max_bytes=4 * TimedStateUpdateCodec.SIZE)
+    journal._write_batch(100, updates(4))
+    journal._write_batch(200, updates(4))
+    journal._write_batch(300, updates(1))
+
+    assert journal.stats.segments == 1
+    assert [record.timestamp for record in written(journal)] == [300]
+    journal.close()
+
+
+def test_paced_replay_outlasts_request_timeout(bridge_settings, tmp_path):
+    bridge_settings.bridge.journal_dir = tmp_path / 'journal'
+    now = time.time_ns()
+    journal = Journal(bridge_settings.bridge.journal_dir, segment_records=16)
+    journal._write_batch(now, updates(1))
+    journal._write_batch(now + int(0.5e9), updates(1, state=2))
+    journal.close()
+
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            client = BridgeClient.connect(bridge_settings, timeout=0.2)
+            try:
+                return [record async for record in client.replay(speed=1.0)]
+            finally:
+                client.close()
+
+    records = asyncio.run(scenario())
+    assert [record.update.state for record in records] == [1, 2]
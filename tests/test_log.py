@@ -0,0 +1,60 @@
+import logging
+
+from deimic_pi.log import RateLimitFilter, get_logger, setup_logging, stop_logging
+from deimic_pi.settings import LogSettings
+
+
+def record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord('deimic_pi.test', level, __file__, 1, msg, (), None)
+
+
+def test_rate_limit_reports_suppressed_records():
+    limit = RateLimitFilter(rate=0.0, burst=2)
+    results = [limit.filter(record("Update %s")) for _ in range(5)]
+
+    assert results == [True, True, False, False, False]
+    # Other categories have their own bucket
+    assert limit.filter(record("Other %s"))
+
+    limit.rate = 1e9
+    passed = record("Update %s")
+    assert limit.filter(passed)
+    assert passed.suppressed == 3
+
+
+def test_sampling_spares_warnings():
+    limit = RateLimitFilter(rate=None, burst=1, sample={"Update %s": 3})
+
+    assert [limit.filter(record("Update %s")) for _ in range(6)] == [False, False, True] * 2
+    assert limit.filter(record("Update %s", logging.WARNING))
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.lines.append(self.format(record))
+
+
+def test_setup_logging_writes_formatted_records_on_stop(monkeypatch):
+    # Setup of the package's root logger is undone after the test
+    root = logging.getLogger('deimic_pi')
+    monkeypatch.setattr(root, 'handlers', list(root.handlers))
+    monkeypatch.setattr(root, 'propagate', root.propagate)
+    monkeypatch.setattr(root, 'level', root.level)
+    handler = ListHandler()
+    setup_logging(LogSettings(level='DEBUG', structured=True, rate=None), handler=handler)
+    try:
+        get_logger('test').debug("State %d", 1)
+        try:
+            raise RuntimeError("failure")
+        except RuntimeError:
+            get_logger('test').exception("Failed")
+    finally:
+        stop_logging()
+
+    assert '"message": "State 1"' in handler.lines[0]
+    assert '"logger": "deimic_pi.test"' in handler.lines[0]
+    assert 'RuntimeError: failure' in handler.lines[1]
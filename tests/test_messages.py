@@ -0,0 +1,100 @@
+import asyncio
+import pickle
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+
+import deimic_pi.messages as base
+from deimic_pi.codecs import StateUpdate
+from deimic_pi.devices.bridge.messages import DeimicStateUpdateInfo
+from deimic_pi.messages import MessagePartType
+from deimic_pi.types import DeimicComponentType
+
+UPDATE = StateUpdate(DeimicComponentType.OUTPUT, 1, 2, 3)
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_multipart(self, frames, **kwargs):
+        self.sent.append(list(frames))
+
+
+def test_send_parts_sends_whole_message_at_once():
+    socket = RecordingSocket()
+    asyncio.run(base.send_parts(socket=socket, parts=[
+        b'topic',
+        (MessagePartType.STRING, 'text'),
+        (MessagePartType.JSON, {'a': 1}),
+        (MessagePartType.PYOBJ, (1, 2)),
+        (MessagePartType.STATE, UPDATE),
+    ]))
+
+    [frames] = socket.sent
+    assert frames[:2] == [b'topic', b'text']
+    assert base.decode_part(zmq.Frame(frames[2]), MessagePartType.JSON) == {'a': 1}
+    assert pickle.loads(frames[3]) == (1, 2)
+    assert base.decode_part(zmq.Frame(frames[4]), MessagePartType.STATE) == UPDATE
+
+
+def test_encoder_reuses_prefix_and_prepends_envelope():
+    encoder = base.MessageEncoder(prefix=[(MessagePartType.STRING, 'HEAD')])
+
+    first = encoder.encode([b'a'], envelope=[b'peer', b''])
+    second = encoder.encode([b'b'])
+
+    assert first == [b'peer', b'', b'HEAD', b'a']
+    assert second == [b'HEAD', b'b']
+    assert first[2] is second[0]
+
+
+def test_send_parts_over_socket():
+    async def scenario():
+        ctx = zmq_asyncio.Context()
+        sender, receiver = ctx.socket(zmq.PAIR), ctx.socket(zmq.PAIR)
+        receiver.bind('inproc://test-send-parts')
+        sender.connect('inproc://test-send-parts')
+        try:
+            await base.send_parts(socket=sender, parts=[b'a', (MessagePartType.STRING, 'b')])
+            return await receiver.recv_multipart()
+        finally:
+            sender.close(0)
+            receiver.close(0)
+            ctx.term()
+
+    assert asyncio.run(scenario()) == [b'a', b'b']
+
+
+def frames_of(socket: RecordingSocket) -> list[zmq.Frame]:
+    [frames] = socket.sent
+    return [zmq.Frame(bytes(frame)) for frame in frames]
+
+
+def test_message_view_decodes_parts_lazily_once():
+    view = base.MessageView([zmq.Frame(b'raw'), zmq.Frame(b'{"a": 1}')])
+
+    assert view[0] == b'raw'
+    assert view._decoded is None
+    assert view.json(1) == {'a': 1}
+    assert view.json(1) is view.json(1)
+
+
+def test_message_view_handling():
+    async def scenario():
+        handling = base.MessageView([zmq.Frame(b'a'), zmq.Frame(b'b')]).handling()
+        await anext(handling)
+        return [await anext(handling), await handling.asend(MessagePartType.STRING)]
+
+    assert asyncio.run(scenario()) == [b'a', 'b']
+
+
+def test_state_update_info_from_handling():
+    async def scenario():
+        socket = RecordingSocket()
+        await DeimicStateUpdateInfo(*UPDATE).send(socket=socket, device=None)
+        handling = base.MessageView(frames_of(socket)).handling()
+        await anext(handling)
+        return await DeimicStateUpdateInfo.from_handling(handling)
+
+    assert asyncio.run(scenario()).update == UPDATE
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+import zmq
+import zmq.asyncio as zmq_asyncio
+from conftest import eventually, running
+
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge import requests
+from deimic_pi.devices.bridge.gathering import Gatherer
+from deimic_pi.devices.bridge.presence import PeerKind
+from deimic_pi.devices.bridge.queues import DeimicRequest
+from deimic_pi.timers import TimerWheel
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_wheel_expires_rearmed_and_cancelled_keys():
+    clock = Clock()
+    wheel = TimerWheel(tick=1.0, slots=4, clock=clock)
+    assert wheel.touch('a', 2.0)
+    assert wheel.touch('b', 2.0)
+    assert wheel.touch('c', 9.0)
+    assert not wheel.touch('a', 6.0)
+    wheel.cancel('b')
+
+    clock.now = 3.0
+    assert wheel.advance() == []
+    clock.now = 7.0
+    assert wheel.advance() == ['a']
+    # Stalled wheel visits every slot once
+    clock.now = 100.0
+    assert wheel.advance() == ['c']
+    assert len(wheel) == 0
+
+
+def test_gathering_stops_awaiting_evicted_devices():
+    async def scenario():
+        gatherer = Gatherer()
+        request_id, gathering = gatherer.open(quorum=2, awaited=['led-1', 'led-2'])
+        gatherer.collect(request_id, 'led-1', 'ok')
+        gatherer.abandon('led-3')
+        assert not gathering.done.is_set()
+        gatherer.abandon('led-2')
+        return await gatherer.wait(request_id, gathering, 2.0)
+
+    replies, complete = asyncio.run(scenario())
+    assert replies == {'led-1': 'ok'}
+    assert not complete
+
+
+def test_quiet_deimic_keeps_requests_while_connected(bridge_settings):
+    bridge = Bridge(bridge_settings)
+    try:
+        connected, disconnected = b'\x00\x01', b'\x00\x02'
+        bridge.deimic_connections.add(connected)
+        bridge.deimic_identities.update((connected, disconnected))
+        bridge.enqueue_deimic_request(DeimicRequest(3, 1, 1))
+
+        bridge.evict_peer(PeerKind.DEIMIC, connected.hex())
+        bridge.evict_peer(PeerKind.DEIMIC, disconnected.hex())
+
+        assert len(bridge.deimic_requests[connected]) == 1
+        assert disconnected not in bridge.deimic_requests
+        assert bridge.deimic_identities == {connected}
+    finally:
+        bridge.close()
+
+
+@pytest.fixture
+def sleep_command(monkeypatch):
+    async def sleep(context: requests.RequestContext):
+        await asyncio.sleep(context.args['seconds'])
+
+    monkeypatch.setitem(requests._commands, 'TEST_SLEEP', sleep)
+
+
+def test_evicted_client_requests_are_cancelled(bridge_settings, sleep_command):
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            client = zmq_asyncio.Context.instance().socket(zmq.DEALER)
+            client.identity = b'client-1'
+            client.connect(f'tcp://localhost:{bridge_settings.extern_req_port}')
+            try:
+                await client.send_multipart([b'', b'1', b'TEST_SLEEP', b'{"seconds": 5.0}'])
+                await eventually(lambda: bridge.request_engine.stats.in_flight)
+                bridge.evict_peer(PeerKind.CLIENT, client.identity.hex())
+                await eventually(lambda: not bridge.request_engine.stats.in_flight)
+                return await client.poll(100)
+            finally:
+                client.close(0)
+
+    assert asyncio.run(scenario()) == 0
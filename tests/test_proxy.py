@@ -0,0 +1,42 @@
+import asyncio
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+from conftest import eventually
+
+from deimic_pi.devices.bridge.proxy import InternalProxy
+
+
+def test_proxy_forwards_subscribed_topics_and_counts_capture():
+    async def scenario():
+        ctx = zmq_asyncio.Context()
+        proxy = InternalProxy(ctx, name='test-proxy', capture=True)
+        proxy.frontend.bind('inproc://test-proxy-frontend')
+        proxy.backend.bind('inproc://test-proxy-backend')
+        publisher, subscriber, capture = ctx.socket(zmq.PUB), ctx.socket(zmq.SUB), ctx.socket(zmq.SUB)
+        publisher.connect('inproc://test-proxy-frontend')
+        subscriber.connect('inproc://test-proxy-backend')
+        subscriber.subscribe(b'A')
+        capture.connect(proxy.capture_addr)
+        capture.subscribe(b'')
+        proxy.start()
+        observer = asyncio.create_task(proxy.observe(capture))
+        try:
+            await asyncio.sleep(0.1)
+            await publisher.send_multipart([b'B', b'skipped'])
+            await publisher.send_multipart([b'A', b'payload'])
+            received = await asyncio.wait_for(subscriber.recv_multipart(), 2.0)
+            await eventually(lambda: proxy.stats.messages)
+        finally:
+            observer.cancel()
+            proxy.close()
+            for socket in (publisher, subscriber, capture):
+                socket.close(0)
+            ctx.term()
+        return received, proxy.stats
+
+    received, stats = asyncio.run(scenario())
+    assert received == [b'A', b'payload']
+    # Unsubscribed topic isn't even sent by the publisher
+    assert (stats.messages, stats.bytes) == (1, 8)
+    assert stats.subscriptions == 1
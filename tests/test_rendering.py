@@ -0,0 +1,79 @@
+import colorsys
+
+import pytest
+
+from deimic_pi.devices.led_driver.patterns import ConstColorPattern, RainbowPattern
+from deimic_pi.devices.led_driver.rendering import PixelFrame, RenderEngine, hsv_to_rgb
+from deimic_pi.devices.led_driver.settings import LedDriverSettings, Settings
+
+
+def driver_settings(**kwargs) -> Settings:
+    return Settings(ipc_dir=None, led_driver=LedDriverSettings(**kwargs))
+
+
+def test_hsv_to_rgb_matches_colorsys():
+    colors = [
+        (hue / 12, saturation, value)
+        for hue in range(13)
+        for saturation in (0.0, 0.5, 1.0)
+        for value in (0.25, 1.0)
+    ]
+    expected = [
+        tuple(round(channel * 255) for channel in colorsys.hsv_to_rgb(*color))
+        for color in colors
+    ]
+
+    assert hsv_to_rgb((0.0, 1.0, 1.0)) == (255, 0, 0)
+    converted = [tuple(int(channel) for channel in color) for color in hsv_to_rgb(colors)]
+    for color, reference in zip(converted, expected):
+        assert color == pytest.approx(reference, abs=1)
+
+
+def test_pixel_frame_assignment():
+    frame = PixelFrame(4)
+    frame[:] = (1, 2, 3)
+    frame[1] = (4, 5, 6)
+    frame[2:4] = [(7, 8, 9), (10, 11, 12)]
+    frame[::2] = (0, 0, 0)
+
+    assert frame.shape == (4, 3)
+    assert [frame[index] for index in range(4)] == [(0, 0, 0), (4, 5, 6), (0, 0, 0), (10, 11, 12)]
+    assert frame[-1] == (10, 11, 12)
+    assert frame.copy().tobytes() == frame.tobytes()
+
+
+class FakeStrip:
+    def __init__(self, length: int):
+        self.buf = bytearray(length * 3)
+        self.brightness = 1.0
+        self.shown = 0
+
+    def show(self):
+        self.shown += 1
+
+
+def test_engine_reorders_frame_into_strip_buffer():
+    engine = RenderEngine(driver_settings(strip_length=2, pixel_order='GRB'))
+    engine.strip = FakeStrip(2)
+    frame = engine.new_frame()
+    frame[0] = (1, 2, 3)
+    frame[1] = (4, 5, 6)
+
+    engine.show(frame)
+    assert (engine.frames, engine.strip.shown) == (1, 1)
+    assert engine.strip.buf == bytearray([2, 1, 3, 5, 4, 6])
+
+
+def test_patterns_render_frames():
+    settings = driver_settings(strip_length=6)
+    const = ConstColorPattern(settings, color=(1 / 3, 1.0, 1.0))
+    rainbow = RainbowPattern(settings, period=1.0, fps=50.0)
+
+    assert const.step(0.0) == 0
+    assert tuple(int(channel) for channel in const.frame[5]) == (0, 255, 0)
+    assert rainbow.step(0.0) == 20
+    first = bytes(rainbow.frame.tobytes())
+    rainbow.step(0.5)
+    assert rainbow.frame.tobytes() != first
+    rainbow.step(1.0)
+    assert rainbow.frame.tobytes() == first
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+import zmq
+import zmq.asyncio as zmq_asyncio
+from conftest import running
+
+from deimic_pi.client import BridgeClient, BridgeRequestError
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge import requests
+from deimic_pi.messages import MessagePartType
+
+
+@pytest.fixture
+def sleep_command(monkeypatch):
+    async def sleep(context: requests.RequestContext):
+        await asyncio.sleep(context.args['seconds'])
+        return [(MessagePartType.JSON, context.args['seconds'])]
+
+    monkeypatch.setitem(requests._commands, 'TEST_SLEEP', sleep)
+
+
+def test_pipelined_requests_complete_independently(bridge_settings, sleep_command):
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            client = BridgeClient.connect(bridge_settings, timeout=2.0)
+            finished = []
+
+            async def request(seconds: float):
+                reply = await client.request('TEST_SLEEP', {'seconds': seconds})
+                finished.append(reply.json(0))
+
+            try:
+                await asyncio.gather(request(0.3), request(0.0), request(0.1))
+            finally:
+                client.close()
+        return finished, bridge.request_engine.stats
+
+    finished, stats = asyncio.run(scenario())
+    assert finished == [0.0, 0.1, 0.3]
+    assert (stats.completed, stats.in_flight) == (3, 0)
+
+
+def test_request_errors(bridge_settings, sleep_command):
+    bridge_settings.bridge.requests_timeout = 0.05
+
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        async with running(bridge):
+            client = BridgeClient.connect(bridge_settings, timeout=2.0)
+            try:
+                with pytest.raises(BridgeRequestError, match="Unknown command"):
+                    await client.request('NO_SUCH_COMMAND')
+            finally:
+                client.close()
+
+            # Request without own timeout falls back to `requests_timeout`
+            socket = zmq_asyncio.Context.instance().socket(zmq.DEALER)
+            socket.connect(f'tcp://localhost:{bridge_settings.extern_req_port}')
+            try:
+                await socket.send_multipart([b'', b'1', b'TEST_SLEEP', b'{"seconds": 1.0}'])
+                reply = await asyncio.wait_for(socket.recv_multipart(), 2.0)
+            finally:
+                socket.close(0)
+        return reply, bridge.request_engine.stats
+
+    reply, stats = asyncio.run(scenario())
+    assert reply == [b'', b'1', b'ERROR', b'Request timed out']
+    assert (stats.failed, stats.timed_out) == (1, 1)
@@ -0,0 +1,77 @@
+from deimic_pi.devices.led_driver.scheduling import FrameScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ClockEvent:
+    """
+    Event which passes time of the clock instead of blocking, optionally
+    getting set after given time.
+    """
+    def __init__(self, clock: Clock, is_set: bool = False, *, set_after: float = None):
+        self.clock = clock
+        self._set = is_set
+        self.set_after = set_after
+
+    def is_set(self) -> bool:
+        return self._set
+
+    def set(self):
+        self._set = True
+
+    def wait(self, timeout: float) -> bool:
+        if not self._set:
+            if self.set_after is not None:
+                self.clock.now += self.set_after
+                self._set = True
+            else:
+                self.clock.now += timeout
+        return self._set
+
+
+def test_frames_keep_fixed_rate_regardless_of_render_time():
+    clock = Clock()
+    scheduler = FrameScheduler(clock=clock)
+    stop, run = ClockEvent(clock), ClockEvent(clock, is_set=True)
+    scheduler.start()
+
+    elapsed = []
+    for render_time in (0.004, 0.008, 0.001):
+        clock.now += render_time
+        elapsed.append(scheduler.wait(0.01, stop, run))
+
+    assert [round(value, 6) for value in elapsed] == [0.01, 0.02, 0.03]
+    assert round(clock.now, 6) == 100.03
+    assert scheduler.stats.missed == 0
+
+
+def test_late_frames_are_skipped():
+    clock = Clock()
+    scheduler = FrameScheduler(clock=clock)
+    scheduler.start()
+
+    clock.now += 0.035
+    elapsed = scheduler.wait(0.01, ClockEvent(clock), ClockEvent(clock, is_set=True))
+
+    assert round(elapsed, 6) == 0.03
+    assert scheduler.stats.missed == 2
+    assert scheduler.stats.max_jitter > 0
+
+
+def test_paused_time_is_excluded_and_stop_interrupts():
+    clock = Clock()
+    scheduler = FrameScheduler(clock=clock)
+    stop = ClockEvent(clock)
+    scheduler.start()
+
+    # Resumed after being paused for a while
+    assert round(scheduler.wait(0.01, stop, ClockEvent(clock, set_after=5.0)), 6) == 0.01
+
+    stop.set()
+    assert scheduler.wait(0.01, stop, ClockEvent(clock, is_set=True)) is None
@@ -0,0 +1,25 @@
+import zmq
+import pytest
+
+from deimic_pi.settings import Settings
+
+pytestmark = pytest.mark.skipif(not zmq.has('ipc'), reason="ipc transport unsupported")
+
+
+def test_bridge_addr_prefers_bound_ipc_endpoint(tmp_path):
+    settings = Settings(ipc_dir=tmp_path)
+
+    assert settings.bridge_addr(5556) == 'tcp://localhost:5556'
+    (tmp_path / '5556').touch()
+    assert settings.bridge_addr(5556) == f'ipc://{tmp_path / "5556"}'
+
+
+def test_bridge_addr_keeps_remote_and_disabled_ipc(tmp_path):
+    (tmp_path / '5556').touch()
+
+    remote = Settings(ipc_dir=tmp_path, bridge_addr_form='tcp://192.0.2.1:{port}')
+    disabled = Settings(ipc_dir=None)
+
+    assert remote.bridge_addr(5556) == 'tcp://192.0.2.1:5556'
+    assert disabled.bridge_addr(5556) == 'tcp://localhost:5556'
+    assert disabled.ipc_addr(5556) is None
@@ -0,0 +1,78 @@
+import asyncio
+
+import zmq
+import zmq.asyncio as zmq_asyncio
+from conftest import running
+
+from deimic_pi import topics
+from deimic_pi.codecs import StateUpdate, decode_state_updates
+from deimic_pi.devices.bridge import Bridge
+from deimic_pi.devices.bridge.cache import StateCache
+from deimic_pi.devices.bridge.messages import DeimicStateSnapshot
+from deimic_pi.messages import MessageType, MessageView
+from deimic_pi.types import DeimicComponentType
+
+INPUT, OUTPUT = DeimicComponentType.INPUT, DeimicComponentType.OUTPUT
+
+
+def filled_cache() -> StateCache:
+    cache = StateCache()
+    cache.update(StateUpdate(INPUT, 1, 1, 0))
+    cache.update(StateUpdate(INPUT, 1, 2, 0))
+    cache.update(StateUpdate(OUTPUT, 2, 1, 5))
+    cache.update(StateUpdate(INPUT, 1, 1, 7))
+    return cache
+
+
+def test_cache_keeps_last_state_per_component():
+    cache = filled_cache()
+
+    assert len(cache) == 3
+    assert cache.get((INPUT, 1, 1)).state == 7
+    assert cache.get((INPUT, 9, 9)) is None
+
+
+def test_snapshot_filters_components():
+    cache = filled_cache()
+
+    assert len(decode_state_updates(cache.snapshot())) == 3
+    assert decode_state_updates(cache.snapshot((OUTPUT, None, None))) == [
+        StateUpdate(OUTPUT, 2, 1, 5)
+    ]
+    assert decode_state_updates(cache.snapshot_of([(INPUT, 1, 2), (INPUT, 9, 9)])) == [
+        StateUpdate(INPUT, 1, 2, 0)
+    ]
+
+
+def test_snapshot_from_handling():
+    states = filled_cache().snapshot()
+    topic = topics.state_topic(message_type=MessageType.SNAPSHOT)
+
+    async def scenario():
+        handling = MessageView([zmq.Frame(topic), zmq.Frame(states)]).handling()
+        await anext(handling)
+        return await DeimicStateSnapshot.from_handling(handling)
+
+    snapshot = asyncio.run(scenario())
+    assert (snapshot.topic, snapshot.states) == (topic, states)
+
+
+def test_subscriber_gets_snapshot_of_subscribed_components(bridge_settings):
+    async def scenario():
+        bridge = Bridge(bridge_settings)
+        cache = bridge.state_cache
+        cache.update(StateUpdate(INPUT, 1, 1, 1))
+        cache.update(StateUpdate(OUTPUT, 2, 1, 5))
+        ctx = zmq_asyncio.Context.instance()
+        subscriber = ctx.socket(zmq.SUB)
+        async with running(bridge):
+            subscriber.connect(f'tcp://localhost:{bridge_settings.extern_bcst_port}')
+            subscriber.subscribe(topics.state_topic(OUTPUT, message_type=MessageType.SNAPSHOT))
+            try:
+                return await asyncio.wait_for(subscriber.recv_multipart(), 2.0)
+            finally:
+                subscriber.close(0)
+
+    topic, states = asyncio.run(scenario())
+    assert topics.parse_topic(topic)[0] is MessageType.SNAPSHOT
+    assert decode_state_updates(states) == [StateUpdate(OUTPUT, 2, 1, 5)]
@@ -0,0 +1,43 @@
+import pytest
+
+from deimic_pi import topics
+from deimic_pi.messages import MessageType
+from deimic_pi.types import DeimicComponentType
+
+INPUT, OUTPUT = DeimicComponentType.INPUT, DeimicComponentType.OUTPUT
+
+
+def test_topic_levels_round_trip():
+    topic = topics.state_topic(INPUT, 3, 4)
+
+    assert len(topic) == 6
+    assert topics.parse_topic(topic) == (MessageType.STATE_UPDATE, (INPUT, 3, 4))
+    assert topics.parse_topic(topics.state_topic(OUTPUT, message_type=MessageType.SNAPSHOT)) == (
+        MessageType.SNAPSHOT,
+        (OUTPUT, None, None)
+    )
+
+
+def test_prefix_matches_only_its_slice():
+    prefix = topics.state_topic(INPUT, 1)
+
+    assert topics.state_topic(INPUT, 1, 500).startswith(prefix)
+    # Unlike textual `I-1`, fixed-width level doesn't prefix-match `I-10`
+    assert not topics.state_topic(INPUT, 10, 1).startswith(prefix)
+    assert not topics.state_topic(OUTPUT, 1, 1).startswith(prefix)
+
+
+def test_levels_must_be_given_in_order():
+    with pytest.raises(ValueError):
+        topics.state_topic(INPUT, None, 4)
+
+
+def test_component_filter():
+    components = topics.parse_component_filter('I-3')
+
+    assert components == (INPUT, 3, None)
+    assert topics.matches((INPUT, 3, 9), components)
+    assert not topics.matches((INPUT, 4, 9), components)
+    assert topics.parse_component_filter('') == (None, None, None)
+    with pytest.raises(ValueError):
+        topics.parse_component_filter('I-1-2-3')